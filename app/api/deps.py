@@ -3,12 +3,22 @@ from typing import Annotated
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db import get_db
-from app.repositories import PullRequestRepository, TeamRepository, UserRepository
-from app.services import PullRequestService, TeamService, UserService
+from app.core.config import settings
+from app.core.db import get_db, get_read_db
+from app.repositories import (
+    PullRequestRepository,
+    StatsRepository,
+    TeamRepository,
+    UserRepository,
+)
+from app.services import PullRequestService, StatsService, TeamService, UserService
 
 DatabaseDep = Annotated[AsyncSession, Depends(get_db)]
 
+# Для эндпоинтов, которые только читают: реплика, если она задана и не
+# отстаёт больше REPLICA_MAX_LAG, иначе основная БД
+ReadDatabaseDep = Annotated[AsyncSession, Depends(get_read_db)]
+
 
 # ===================== TEAM =====================
 
@@ -27,11 +37,21 @@ def get_team_service(repo: TeamRepositoryDep) -> TeamService:
 TeamServiceDep = Annotated[TeamService, Depends(get_team_service)]
 
 
+def get_team_read_service(session: ReadDatabaseDep) -> TeamService:
+    return TeamService(TeamRepository(session))
+
+
+TeamReadServiceDep = Annotated[TeamService, Depends(get_team_read_service)]
+
+
 # ===================== Pull Request =====================
 
 
 def get_pull_request_repository(session: DatabaseDep) -> PullRequestRepository:
-    return PullRequestRepository(session)
+    return PullRequestRepository(
+        session,
+        assignment_strategy=settings.REVIEWER_ASSIGNMENT_STRATEGY,
+    )
 
 
 PullRequestRepositoryDep = Annotated[
@@ -63,3 +83,34 @@ def get_user_service(
 
 
 UserServiceDep = Annotated[UserService, Depends(get_user_service)]
+
+
+def get_user_read_service(session: ReadDatabaseDep) -> UserService:
+    return UserService(
+        UserRepository(session),
+        PullRequestRepository(
+            session,
+            assignment_strategy=settings.REVIEWER_ASSIGNMENT_STRATEGY,
+        ),
+    )
+
+
+UserReadServiceDep = Annotated[UserService, Depends(get_user_read_service)]
+
+
+# ===================== STATS =====================
+
+
+# Дневные срезы только читаются: пересчёт идёт в фоновой задаче
+def get_stats_repository(session: ReadDatabaseDep) -> StatsRepository:
+    return StatsRepository(session)
+
+
+StatsRepositoryDep = Annotated[StatsRepository, Depends(get_stats_repository)]
+
+
+def get_stats_service(repo: StatsRepositoryDep) -> StatsService:
+    return StatsService(repo)
+
+
+StatsServiceDep = Annotated[StatsService, Depends(get_stats_service)]
@@ -0,0 +1,28 @@
+from fastapi import Response, status
+
+
+def make_etag(version: int) -> str:
+    # Слабый ETag: при той же версии данные те же, но порядок
+    # элементов в JSON не гарантирован
+    return f'W/"{version}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Сравнение для If-None-Match (слабое, RFC 9110): список тегов
+    через запятую или `*`.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return any(opaque(tag) == opaque(etag) for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -1,8 +1,16 @@
 from fastapi import APIRouter
 
-from app.api.routers import pull_request_router, team_router, user_router
+from app.api.routers import (
+    job_router,
+    metrics_router,
+    pull_request_router,
+    team_router,
+    user_router,
+)
 
 api_router = APIRouter()
 api_router.include_router(team_router.router)
 api_router.include_router(user_router.router)
 api_router.include_router(pull_request_router.router)
+api_router.include_router(job_router.router)
+api_router.include_router(metrics_router.router)
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from app.api.deps import PullRequestServiceDep
+from app.core.exceptions import NotFoundError
+from app.schemas import DeactivationJobInfo
+
+router = APIRouter(tags=["Jobs"])
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=DeactivationJobInfo,
+)
+async def get_job(
+    job_id: str,
+    service: PullRequestServiceDep,
+):
+    try:
+        return await service.get_deactivation_job(job_id)
+    except NotFoundError:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "error": {
+                    "code": "NOT_FOUND",
+                    "message": "job not found",
+                }
+            },
+        )
@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+
+from app.core.db.metrics import compiled_cache_stats
+from app.schemas import CompiledCacheMetrics, DbMetrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics/db", response_model=DbMetrics)
+async def get_db_metrics():
+    """
+    Кэш компиляции SQL этого воркера с его запуска: сколько запросов
+    выполнено без компиляции (hits), скомпилировано (misses) и
+    не кэшируется вовсе (uncached).
+    """
+    return DbMetrics(
+        compiled_cache=CompiledCacheMetrics(
+            hits=compiled_cache_stats.hits,
+            misses=compiled_cache_stats.misses,
+            uncached=compiled_cache_stats.uncached,
+            hit_rate=compiled_cache_stats.hit_rate,
+        )
+    )
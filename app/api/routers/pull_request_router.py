@@ -1,7 +1,8 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Query, status
 from fastapi.responses import JSONResponse
 
 from app.api.deps import PullRequestServiceDep
+from app.core.config import settings
 from app.core.exceptions import (
     AlreadyExistsError,
     NoReplacementCandidateError,
@@ -10,7 +11,12 @@ from app.core.exceptions import (
     ReviewerNotAssignedError,
 )
 from app.schemas import (
+    DeactivationJobInfo,
+    PullRequestBatchCreatePayload,
+    PullRequestBatchCreateResult,
     PullRequestCreatePayload,
+    PullRequestMergeBatchPayload,
+    PullRequestMergeBatchResult,
     PullRequestMergePayload,
     PullRequestReassignPayload,
     PullRequestReassignResponse,
@@ -18,6 +24,7 @@ from app.schemas import (
     TeamBulkDeactivatePayload,
     TeamBulkDeactivateResult,
 )
+from app.services.deactivation_job_worker import deactivation_job_worker
 
 router = APIRouter(tags=["PullRequests"])
 
@@ -59,6 +66,18 @@ async def create_pull_request(
     return {"pr": pr}
 
 
+@router.post(
+    "/pullRequest/createBatch",
+    response_model=PullRequestBatchCreateResult,
+)
+async def create_pull_requests_batch(
+    payload: PullRequestBatchCreatePayload,
+    service: PullRequestServiceDep,
+):
+    # Статус по каждому PR: CREATED / PR_EXISTS / NOT_FOUND
+    return await service.create_pull_requests_batch(payload)
+
+
 @router.post(
     "/pullRequest/merge",
     response_model=PullRequestResponse,
@@ -83,6 +102,18 @@ async def merge_pull_request(
     return {"pr": pr}
 
 
+@router.post(
+    "/pullRequest/mergeBatch",
+    response_model=PullRequestMergeBatchResult,
+)
+async def merge_pull_requests_batch(
+    payload: PullRequestMergeBatchPayload,
+    service: PullRequestServiceDep,
+):
+    # Уже смёрженные и ненайденные PR возвращаются отдельными списками
+    return await service.merge_pull_requests_batch(payload)
+
+
 @router.post(
     "/pullRequest/reassign",
     response_model=PullRequestReassignResponse,
@@ -140,13 +171,27 @@ async def reassign_reviewer(
 @router.post(
     "/team/deactivateUsers",
     response_model=TeamBulkDeactivateResult,
+    responses={status.HTTP_202_ACCEPTED: {"model": DeactivationJobInfo}},
 )
 async def bulk_deactivate_team_users(
     payload: TeamBulkDeactivatePayload,
     service: PullRequestServiceDep,
+    background: bool = False,
+    chunk_size: int | None = Query(default=None, ge=1),
 ):
+    """
+    С `background=true` пользователи деактивируются сразу, а замена
+    ревьюеров уходит в фоновое задание: ответ 202 с job_id,
+    прогресс — GET /jobs/{job_id}.
+    """
     try:
-        result = await service.bulk_deactivate_team_users_and_reassign(payload)
+        if background:
+            job = await service.start_bulk_deactivation_job(
+                payload,
+                chunk_size=chunk_size or settings.DEACTIVATION_JOB_CHUNK_SIZE,
+            )
+        else:
+            result = await service.bulk_deactivate_team_users_and_reassign(payload)
     except NotFoundError:
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -158,4 +203,11 @@ async def bulk_deactivate_team_users(
             },
         )
 
+    if background:
+        deactivation_job_worker.wake()
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=job.model_dump(mode="json"),
+        )
+
     return result
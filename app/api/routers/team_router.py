@@ -1,9 +1,17 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Header, Query, Request, Response, status
 from fastapi.responses import JSONResponse
 
-from app.api.deps import TeamServiceDep
-from app.core.exceptions import AlreadyExistsError, NotFoundError
-from app.schemas import TeamWithMembers, TeamWithMembersGen
+from app.api.deps import TeamReadServiceDep, TeamServiceDep
+from app.api.etag import etag_matches, make_etag, not_modified
+from app.core.exceptions import AlreadyExistsError, InvalidImportError, NotFoundError
+from app.schemas import (
+    TeamImportResult,
+    TeamMemberField,
+    TeamView,
+    TeamWithMembers,
+    TeamWithMembersGen,
+)
+from app.services.team_import import ImportFormat
 
 router = APIRouter(tags=["Teams"])
 
@@ -35,14 +43,54 @@ async def add_team(
 
 @router.get(
     "/team/get",
-    response_model=TeamWithMembers,
+    response_model=TeamView,
+    response_model_exclude_none=True,
 )
 async def get_team(
     team_name: str,
-    service: TeamServiceDep,
+    service: TeamReadServiceDep,
+    response: Response,
+    active_only: bool = False,
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    cursor: str | None = None,
+    fields: list[TeamMemberField] | None = Query(default=None),
+    summary: bool = False,
+    if_none_match: str | None = Header(default=None),
 ):
+    """
+    Команда с участниками. Отдаёт `ETag`; при совпадении `If-None-Match`
+    отвечает 304 после чтения одной версии, без загрузки участников.
+
+    - `active_only` — только активные участники;
+    - `limit` / `cursor` — страница по возрастанию user_id, следующая —
+      с `cursor` из `next_cursor` ответа;
+    - `fields` (можно повторять) — какие поля участников вернуть;
+    - `summary=true` — только `member_count`, без списка участников.
+
+    ETag общий для всех страниц и вариантов: это версия состава команды.
+    """
     try:
-        return await service.get_team_with_members(team_name)
+        # Версия читается до данных: если между ними прошла запись,
+        # клиент получит новые данные со старым ETag и просто
+        # перечитает их при следующем опросе
+        version = await service.get_team_version(team_name)
+        if version is None:
+            raise NotFoundError()
+
+        etag = make_etag(version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        if summary:
+            team = await service.get_team_summary(team_name, active_only=active_only)
+        else:
+            team = await service.get_team_view(
+                team_name,
+                active_only=active_only,
+                limit=limit,
+                cursor=cursor,
+                fields=fields,
+            )
     except NotFoundError:
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -53,3 +101,56 @@ async def get_team(
                 }
             },
         )
+
+    response.headers["ETag"] = etag
+    return team
+
+
+@router.post(
+    "/team/import",
+    response_model=TeamImportResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                ImportFormat.NDJSON.value: {"schema": {"type": "string"}},
+                ImportFormat.CSV.value: {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def import_teams(
+    request: Request,
+    service: TeamServiceDep,
+    content_type: str | None = Header(default=None),
+):
+    """
+    Массовый импорт команд и участников из NDJSON или CSV
+    (формат — в `app/services/team_import.py`). Тело читается потоком,
+    ошибочные строки пропускаются и перечисляются в `rejected`,
+    остальное применяется одной транзакцией.
+    """
+    fmt = ImportFormat.from_content_type(content_type)
+    if fmt is None:
+        return JSONResponse(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            content={
+                "error": {
+                    "code": "UNSUPPORTED_MEDIA_TYPE",
+                    "message": "expected application/x-ndjson or text/csv",
+                }
+            },
+        )
+
+    try:
+        return await service.import_teams(request.stream(), fmt)
+    except InvalidImportError as exc:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "error": {
+                    "code": "INVALID_IMPORT",
+                    "message": str(exc),
+                }
+            },
+        )
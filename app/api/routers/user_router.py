@@ -1,9 +1,19 @@
-from fastapi import APIRouter, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Header, Query, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
 
-from app.api.deps import UserServiceDep
+from app.api.deps import StatsServiceDep, UserReadServiceDep, UserServiceDep
+from app.api.etag import etag_matches, make_etag, not_modified
 from app.core.exceptions import NotFoundError
-from app.schemas import ReviewStats, SetIsActiveRequest, UserGen, UserReviewPRs
+from app.models.pull_requests import PRStatus
+from app.schemas import (
+    DailyStats,
+    ReviewStats,
+    SetIsActiveBatchRequest,
+    SetIsActiveBatchResult,
+    SetIsActiveRequest,
+    UserGen,
+    UserReviewPRs,
+)
 
 router = APIRouter()
 
@@ -37,13 +47,57 @@ async def set_is_active(
     return {"user": user}
 
 
+@router.post(
+    "/users/setIsActiveBatch",
+    response_model=SetIsActiveBatchResult,
+    tags=["Users"],
+)
+async def set_is_active_batch(
+    payload: SetIsActiveBatchRequest,
+    service: UserServiceDep,
+):
+    """
+    Пакет изменений is_active одной транзакцией. Статус по каждому
+    пользователю: UPDATED / UNCHANGED / NOT_FOUND. С
+    `reassign_open_reviews` открытые ревью деактивированных переходят
+    к активным участникам их команд, а где заменить некем — снимаются.
+    """
+    return await service.set_is_active_batch(payload)
+
+
 @router.get("/users/getReview", response_model=UserReviewPRs, tags=["Users"])
 async def get_user_review_prs(
     user_id: str,
-    service: UserServiceDep,
+    service: UserReadServiceDep,
+    response: Response,
+    pr_status: PRStatus | None = Query(default=None, alias="status"),
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    cursor: str | None = None,
+    if_none_match: str | None = Header(default=None),
 ):
+    """
+    PR на ревью у пользователя по возрастанию id PR. Без `limit` —
+    весь список одним ответом; с `limit` — постранично, следующая
+    страница — с `cursor` из `next_cursor` ответа.
+
+    ETag общий для всех страниц и фильтров: это версия списка PR
+    пользователя, при совпадении `If-None-Match` — 304 без чтения PR.
+    """
     try:
-        return await service.get_review_pull_requests(user_id)
+        version = await service.get_review_version(user_id)
+        if version is None:
+            raise NotFoundError()
+
+        etag = make_etag(version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        review = await service.get_review_pull_requests(
+            user_id,
+            status=pr_status,
+            limit=limit,
+            cursor=cursor,
+        )
     except NotFoundError:
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -55,13 +109,63 @@ async def get_user_review_prs(
             },
         )
 
+    response.headers["ETag"] = etag
+    return review
+
+
+NDJSON = "application/x-ndjson"
+
 
 @router.get(
     "/stats/review",
     response_model=ReviewStats,
     tags=["Stats"],
+    responses={200: {"content": {NDJSON: {}}}},
 )
 async def get_review_stats(
-    service: UserServiceDep,
+    service: UserReadServiceDep,
+    response: Response,
+    accept: str | None = Header(default=None),
+    cache_control: str | None = Header(default=None),
+):
+    """
+    Статистика назначений. С `Accept: application/x-ndjson` отдаётся
+    потоком, по объекту на строку, без сборки всего ответа в памяти.
+
+    JSON отдаётся из кэша (STATS_CACHE_TTL / STATS_CACHE_MAX_STALE),
+    возраст снимка — в заголовке `Age`. `Cache-Control: no-cache`
+    дожидается пересчёта.
+    """
+    if accept and NDJSON in accept:
+        return StreamingResponse(service.stream_review_stats(), media_type=NDJSON)
+
+    refresh = cache_control is not None and "no-cache" in cache_control
+    stats, age = await service.get_cached_review_stats(refresh=refresh)
+    response.headers["Age"] = str(int(age))
+    return stats
+
+
+@router.get("/stats/daily", response_model=DailyStats, tags=["Stats"])
+async def get_daily_stats(
+    team_name: str,
+    service: StatsServiceDep,
+    days: int = Query(default=90, ge=1, le=366),
 ):
-    return await service.get_review_stats()
+    """
+    Дневные срезы команды за последние `days` дней (UTC): открытые и
+    смёрженные PR, перцентили времени до merge, назначения по ревьюерам.
+    Срезы пересчитываются в фоне раз в STATS_ROLLUP_INTERVAL секунд,
+    поэтому данные текущего дня отстают на этот интервал.
+    """
+    try:
+        return await service.get_daily_stats(team_name, days)
+    except NotFoundError:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "error": {
+                    "code": "NOT_FOUND",
+                    "message": "team not found",
+                }
+            },
+        )
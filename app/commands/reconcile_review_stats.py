@@ -0,0 +1,55 @@
+"""
+Пересчёт счётчиков статистики ревью с нуля и отчёт о расхождениях.
+
+Счётчики (users.reviews_assigned, users.open_reviews,
+pull_requests.reviewers_count) поддерживаются репозиторием в тех же
+транзакциях, что и назначения. Команда сверяет их с pr_reviewers и
+исправляет расхождения; с --dry-run — только отчёт.
+
+На время пересчёта запись в pr_reviewers и pull_requests блокируется.
+
+Код возврата 1, если расхождения найдены.
+
+    poetry run python -m app.commands.reconcile_review_stats [--dry-run]
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.core.db.connect import async_engine, async_session
+from app.repositories import PullRequestRepository
+
+
+async def main(args: argparse.Namespace) -> int:
+    async with async_session() as session:
+        drift = await PullRequestRepository(session).reconcile_review_counters(
+            fix=not args.dry_run
+        )
+    await async_engine.dispose()
+
+    action = "found" if args.dry_run else "fixed"
+    for counter, rows in drift.items():
+        print(f"{counter}: {len(rows)} {action}")
+        for row_id, stored, actual in rows[: args.show]:
+            print(f"  {row_id}: {stored} -> {actual}")
+        if len(rows) > args.show:
+            print(f"  ... and {len(rows) - args.show} more")
+
+    return 1 if any(drift.values()) else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="only report drift, do not fix counters",
+    )
+    parser.add_argument(
+        "--show",
+        type=int,
+        default=20,
+        help="how many drifted rows to print per counter",
+    )
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Generic, Iterable, TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.cache")
+
+T = TypeVar("T")
+
+
+class TeamRosterCache:
+    """
+    Кэш активных участников команд в рамках одного воркера.
+
+    Хранит для каждой команды кортеж id активных пользователей вместе
+    с `teams.version`, при которой он прочитан; ограничен по размеру и
+    вытесняет давно не использованные команды (LRU).
+
+    Версия команды растёт в той же транзакции, что и изменение состава,
+    поэтому `get` с текущей версией из БД не отдаст состав, устаревший
+    из-за записи в другом воркере или процессе. Версию берут до чтения
+    состава: если состав успел измениться, запись окажется старше
+    версии в БД и при следующем `get` будет перечитана.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._rosters: OrderedDict[str, tuple[int, tuple[str, ...]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._rosters)
+
+    def get(self, team_name: str, version: int) -> tuple[str, ...] | None:
+        entry = self._rosters.get(team_name)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._rosters.move_to_end(team_name)
+        return entry[1]
+
+    def put(self, team_name: str, member_ids: Iterable[str], version: int) -> None:
+        if self._max_size <= 0:
+            return
+
+        self._rosters[team_name] = (version, tuple(member_ids))
+        self._rosters.move_to_end(team_name)
+
+        while len(self._rosters) > self._max_size:
+            self._rosters.popitem(last=False)
+
+    def invalidate(self, *team_names: str | None) -> None:
+        # Свои записи не ждут сравнения версий: освобождаем место сразу
+        for team_name in team_names:
+            if team_name is not None:
+                self._rosters.pop(team_name, None)
+
+    def clear(self) -> None:
+        self._rosters.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+team_roster_cache = TeamRosterCache(max_size=settings.TEAM_ROSTER_CACHE_SIZE)
+
+
+class StaleWhileRevalidateCache(Generic[T]):
+    """
+    Кэш одного значения в рамках воркера (stale-while-revalidate).
+
+    Моложе `ttl` секунд значение отдаётся как есть. До `ttl + max_stale`
+    отдаётся устаревший снимок, а пересчёт запускается в фоне. Дальше —
+    или если значения ещё нет — запрос ждёт пересчёта.
+
+    Одновременно идёт не больше одного пересчёта: все промахи ждут одну
+    и ту же задачу. `load` должен сам открывать сессию БД — фоновый
+    пересчёт переживает запрос, который его запустил.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_stale: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl = ttl
+        self._max_stale = max_stale
+        self._clock = clock
+        self._value: T | None = None
+        self._stored_at: float | None = None
+        self._refresh_task: asyncio.Task | None = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    async def get(
+        self, load: Callable[[], Awaitable[T]], refresh: bool = False
+    ) -> tuple[T, float]:
+        """
+        Возвращает (значение, возраст в секундах). С `refresh=True`
+        снимок не используется: запрос ждёт пересчёта (общего, если он
+        уже идёт).
+        """
+        if self._stored_at is not None and not refresh:
+            age = self._clock() - self._stored_at
+            if age <= self._ttl:
+                self.hits += 1
+                return self._value, age
+            if age <= self._ttl + self._max_stale:
+                self.stale_hits += 1
+                self._start_refresh(load)
+                return self._value, age
+
+        self.misses += 1
+        # shield: отмена одного запроса не отменяет общий пересчёт
+        await asyncio.shield(self._start_refresh(load))
+        return self._value, self._clock() - self._stored_at
+
+    def _start_refresh(self, load: Callable[[], Awaitable[T]]) -> asyncio.Task:
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh(load))
+            self._refresh_task.add_done_callback(self._on_refresh_done)
+        return self._refresh_task
+
+    async def _refresh(self, load: Callable[[], Awaitable[T]]) -> None:
+        self.loads += 1
+        value = await load()
+        self._value = value
+        self._stored_at = self._clock()
+
+    def _on_refresh_done(self, task: asyncio.Task) -> None:
+        self._refresh_task = None
+        if not task.cancelled() and task.exception() is not None:
+            # Ждущие промахи получат исключение сами; для фонового
+            # пересчёта это единственное место, где ошибка видна
+            logger.error("cache refresh failed", exc_info=task.exception())
+
+    def clear(self) -> None:
+        self._value = None
+        self._stored_at = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.loads = 0
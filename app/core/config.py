@@ -1,7 +1,8 @@
 import logging
 import secrets
+from enum import Enum
 
-from pydantic import computed_field, model_validator
+from pydantic import Field, computed_field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from sqlalchemy import URL
 from typing_extensions import Self
@@ -9,6 +10,28 @@ from typing_extensions import Self
 logger = logging.getLogger("app")
 
 
+class AssignmentStrategy(str, Enum):
+    RANDOM = "random"
+    LEAST_LOADED = "least_loaded"
+
+
+class DatabaseProfile(str, Enum):
+    # Приложение ходит в Postgres напрямую и держит свой пул соединений
+    DIRECT = "direct"
+    # Через PgBouncer в transaction mode: пул держит PgBouncer, кэш
+    # подготовленных выражений на стороне сервера выключен
+    PGBOUNCER = "pgbouncer"
+
+
+POOL_FIELDS = (
+    "DB_POOL_SIZE",
+    "DB_MAX_OVERFLOW",
+    "DB_POOL_TIMEOUT",
+    "DB_POOL_RECYCLE",
+    "DB_POOL_PRE_PING",
+)
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -30,12 +53,57 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str = ""
 
+    # Пул соединений и драйвер (и для основной БД, и для реплики).
+    # DB_POOL_* для профиля pgbouncer не используются: пул держит PgBouncer
+    DB_PROFILE: DatabaseProfile = DatabaseProfile.DIRECT
+    DB_POOL_SIZE: int = Field(default=20, ge=1)
+    DB_MAX_OVERFLOW: int = Field(default=10, ge=0)
+    DB_POOL_TIMEOUT: float = Field(default=10.0, gt=0)
+    # Соединение старше (сек) пересоздаётся; -1 — никогда
+    DB_POOL_RECYCLE: int = Field(default=1800, ge=-1)
+    DB_POOL_PRE_PING: bool = False
+    # Кэш подготовленных выражений на соединение (asyncpg и SQLAlchemy);
+    # для pgbouncer всегда 0
+    DB_STATEMENT_CACHE_SIZE: int = Field(default=100, ge=0)
+
+    # Реплика для чтения (GET /team/get, /users/getReview, /stats/*).
+    # Не задан сервер — все запросы идут в основную БД. Пользователь и
+    # пароль те же, что у основной; БД по умолчанию тоже.
+    POSTGRES_REPLICA_SERVER: str | None = None
+    POSTGRES_REPLICA_PORT: int = 5432
+    POSTGRES_REPLICA_DB: str | None = None
+
+    # Отставание реплики (сек), выше которого чтение идёт в основную БД,
+    # и как часто его проверять
+    REPLICA_MAX_LAG: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL: float = 1.0
+
     POSTGRES_SERVER_TEST: str
     POSTGRES_PORT_TEST: int = 5432
     POSTGRES_USER_TEST: str
     POSTGRES_PASSWORD_TEST: str = ""
     POSTGRES_DB_TEST: str = ""
 
+    TEAM_ROSTER_CACHE_SIZE: int = 1024
+
+    REVIEWER_ASSIGNMENT_STRATEGY: AssignmentStrategy = AssignmentStrategy.RANDOM
+
+    # Наибольший пакет в одном запросе (createBatch и т.п.): весь пакет —
+    # одна транзакция с блокировками всех затронутых строк
+    BATCH_MAX_ITEMS: int = Field(default=1000, ge=1)
+
+    DEACTIVATION_JOB_CHUNK_SIZE: int = 500
+    DEACTIVATION_JOB_POLL_INTERVAL: float = 5.0
+
+    STATS_STREAM_CHUNK_SIZE: int = 1000
+    STATS_ROLLUP_INTERVAL: float = 300.0
+
+    TEAM_IMPORT_BATCH_SIZE: int = 5000
+    TEAM_IMPORT_MAX_REJECTED: int = 1000
+
+    STATS_CACHE_TTL: float = 30.0
+    STATS_CACHE_MAX_STALE: float = 300.0
+
     @computed_field
     @property
     def get_async_database_uri(self) -> URL:
@@ -48,6 +116,20 @@ class Settings(BaseSettings):
             database=self.POSTGRES_DB,
         )
 
+    @computed_field
+    @property
+    def get_async_database_replica_uri(self) -> URL | None:
+        if not self.POSTGRES_REPLICA_SERVER:
+            return None
+        return URL.create(
+            drivername="postgresql+asyncpg",
+            username=self.POSTGRES_USER,
+            password=self.POSTGRES_PASSWORD,
+            host=self.POSTGRES_REPLICA_SERVER,
+            port=self.POSTGRES_REPLICA_PORT,
+            database=self.POSTGRES_REPLICA_DB or self.POSTGRES_DB,
+        )
+
     @computed_field
     def get_back_http_url(self) -> str:
         return f"http://{self.BACKEND_HOST}:{self.BACKEND_PORT}"
@@ -84,6 +166,29 @@ class Settings(BaseSettings):
             )
             logger.warning(message, stacklevel=1)
 
+    @model_validator(mode="after")
+    def _check_database_profile(self) -> Self:
+        if self.DB_PROFILE != DatabaseProfile.PGBOUNCER:
+            return self
+
+        # В transaction mode соседние запросы одного соединения приложения
+        # попадают на разные соединения сервера, и закэшированное
+        # подготовленное выражение там может не существовать
+        if "DB_STATEMENT_CACHE_SIZE" in self.model_fields_set:
+            if self.DB_STATEMENT_CACHE_SIZE != 0:
+                raise ValueError(
+                    "DB_STATEMENT_CACHE_SIZE must be 0 with DB_PROFILE=pgbouncer"
+                )
+        self.DB_STATEMENT_CACHE_SIZE = 0
+
+        ignored = [name for name in POOL_FIELDS if name in self.model_fields_set]
+        if ignored:
+            logger.warning(
+                "%s ignored with DB_PROFILE=pgbouncer", ", ".join(ignored), stacklevel=1
+            )
+
+        return self
+
     @model_validator(mode="after")
     def _enforce_non_default_secrets(self) -> Self:
         self._check_default_secret("SECRET_KEY", self.SECRET_KEY)
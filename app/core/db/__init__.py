@@ -1,4 +1,4 @@
 from app.core.db.base import Base
-from app.core.db.connect import get_db
+from app.core.db.connect import get_db, get_read_db
 
-__all__ = ["Base", "get_db"]
+__all__ = ["Base", "get_db", "get_read_db"]
@@ -1,13 +1,59 @@
 import logging
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
+from uuid import uuid4
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
-from app.core.config import settings
+from app.core.config import DatabaseProfile, Settings, settings
+from app.core.db.metrics import compiled_cache_stats
+from app.core.db.replica import ReplicaLagMonitor
 
 logger = logging.getLogger("app.db")
 
-async_engine = create_async_engine(settings.get_async_database_uri)
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid4().hex}__"
+
+
+def engine_options(config: Settings = settings) -> dict[str, Any]:
+    """
+    Параметры create_async_engine по DB_PROFILE.
+
+    direct — свой пул (DB_POOL_*) и кэш подготовленных выражений на
+    соединение размером DB_STATEMENT_CACHE_SIZE.
+
+    pgbouncer (transaction mode) — соединения к PgBouncer не держим
+    (NullPool, пул у PgBouncer), кэши asyncpg и SQLAlchemy выключены, а
+    подготовленные выражения получают уникальные имена: иначе
+    `__asyncpg_stmt_N__` с разных клиентов сталкиваются на одном
+    соединении сервера.
+    """
+    if config.DB_PROFILE == DatabaseProfile.PGBOUNCER:
+        return {
+            "poolclass": NullPool,
+            "connect_args": {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": _unique_statement_name,
+            },
+        }
+
+    return {
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        "connect_args": {
+            "statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+        },
+    }
+
+
+async_engine = create_async_engine(settings.get_async_database_uri, **engine_options())
+compiled_cache_stats.track(async_engine)
 
 async_session = async_sessionmaker(
     async_engine,
@@ -23,3 +69,57 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         except Exception:
             await session.rollback()
             raise
+
+
+replica_engine = (
+    create_async_engine(settings.get_async_database_replica_uri, **engine_options())
+    if settings.get_async_database_replica_uri is not None
+    else None
+)
+
+if replica_engine is not None:
+    compiled_cache_stats.track(replica_engine)
+
+replica_session = (
+    async_sessionmaker(
+        replica_engine,
+        expire_on_commit=False,
+        autoflush=False,
+    )
+    if replica_engine is not None
+    else None
+)
+
+replica_monitor = (
+    ReplicaLagMonitor(
+        replica_engine,
+        max_lag=settings.REPLICA_MAX_LAG,
+        check_interval=settings.REPLICA_LAG_CHECK_INTERVAL,
+    )
+    if replica_engine is not None
+    else None
+)
+
+
+async def get_read_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """
+    Сессии для чтения: реплика, если она задана и отстаёт не больше
+    REPLICA_MAX_LAG секунд, иначе основная БД.
+    """
+    if replica_session is not None and await replica_monitor.is_fresh():
+        return replica_session
+    return async_session
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Сессия для эндпоинтов, которые только читают. Данные могут отставать
+    от записанных только что — не больше чем на REPLICA_MAX_LAG секунд.
+    """
+    session_maker = await get_read_sessionmaker()
+    async with session_maker() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
@@ -0,0 +1,47 @@
+from sqlalchemy import event
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class CompiledCacheStats:
+    """
+    Попадания в кэш компиляции SQLAlchemy по выполненным запросам
+    (на воркер, по всем движкам, переданным в `track`).
+
+    hits     -- SQL взят из кэша, компиляции не было;
+    misses   -- запрос скомпилирован и положен в кэш;
+    uncached -- запрос без ключа кэша (exec_driver_sql, DDL).
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+    @property
+    def hit_rate(self) -> float | None:
+        """
+        Доля попаданий среди всех запросов: некэшируемые считаются
+        промахами. None — запросов ещё не было.
+        """
+        total = self.hits + self.misses + self.uncached
+        return self.hits / total if total else None
+
+    def track(self, engine: AsyncEngine) -> None:
+        event.listen(engine.sync_engine, "after_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context.cache_hit is CacheStats.CACHE_HIT:
+            self.hits += 1
+        elif context.cache_hit is CacheStats.CACHE_MISS:
+            self.misses += 1
+        else:
+            self.uncached += 1
+
+    def clear(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+
+compiled_cache_stats = CompiledCacheStats()
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+from typing import Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger("app.db")
+
+# Отставание реплики в секундах. Реплика, догнавшая primary (receive и
+# replay LSN совпадают), отстаёт на 0, даже если primary давно ничего не
+# писал и pg_last_xact_replay_timestamp() старый. Не реплика
+# (pg_is_in_recovery() = false, например вторая БД локально) — тоже 0.
+REPLICATION_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """
+)
+
+
+class ReplicaLagMonitor:
+    """
+    Можно ли сейчас читать с реплики.
+
+    Отставание запрашивается у реплики не чаще раза в `check_interval`
+    секунд, между проверками используется последний результат, а
+    одновременные запросы ждут одну и ту же проверку. Реплика считается
+    пригодной, пока отставание не больше `max_lag` секунд; недоступная
+    (или не ответившая за `timeout` секунд) реплика непригодна до
+    следующей проверки.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        max_lag: float,
+        check_interval: float,
+        timeout: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._engine = engine
+        self._max_lag = max_lag
+        self._check_interval = check_interval
+        self._timeout = timeout
+        self._clock = clock
+        self._lag: float | None = None
+        self._checked_at: float | None = None
+        self._lock = asyncio.Lock()
+        self.checks = 0
+
+    @property
+    def lag(self) -> float | None:
+        """Последнее измеренное отставание; None — реплика недоступна."""
+        return self._lag
+
+    async def is_fresh(self) -> bool:
+        if not self._is_checked_recently():
+            async with self._lock:
+                # Пока ждали блокировку, проверку мог сделать другой запрос
+                if not self._is_checked_recently():
+                    await self._check()
+
+        return self._fresh
+
+    @property
+    def _fresh(self) -> bool:
+        return self._lag is not None and self._lag <= self._max_lag
+
+    def _is_checked_recently(self) -> bool:
+        return (
+            self._checked_at is not None
+            and self._clock() - self._checked_at < self._check_interval
+        )
+
+    async def _fetch_lag(self) -> float:
+        async with self._engine.connect() as conn:
+            return float(await conn.scalar(REPLICATION_LAG_SQL))
+
+    async def _check(self) -> None:
+        self.checks += 1
+        # До первой проверки считаем реплику пригодной: сообщаем только
+        # о переходах, а не о каждой проверке
+        was_fresh = self._fresh or self._checked_at is None
+        try:
+            # Зависшая реплика не должна держать запросы, ждущие проверку
+            self._lag = await asyncio.wait_for(self._fetch_lag(), self._timeout)
+        except Exception:
+            logger.warning("replica lag check failed", exc_info=True)
+            self._lag = None
+        self._checked_at = self._clock()
+
+        if was_fresh and not self._fresh and self._lag is not None:
+            logger.warning(
+                "replica lag %.1f s is above %.1f s, reading from primary",
+                self._lag,
+                self._max_lag,
+            )
+        elif self._fresh and not was_fresh:
+            logger.info("replica lag %.1f s, reading from replica again", self._lag)
@@ -21,3 +21,13 @@ class ReviewerNotAssignedError(Exception):
 class NoReplacementCandidateError(Exception):
     def __init__(self) -> None:
         super().__init__("no replacement candidate")
+
+
+class ConcurrentUpdateError(Exception):
+    def __init__(self) -> None:
+        super().__init__("concurrent update, retry later")
+
+
+class InvalidImportError(Exception):
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
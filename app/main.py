@@ -1,19 +1,52 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
 
 from app.api.routers import api_router
 from app.core.config import settings
+from app.core.exceptions import ConcurrentUpdateError
+from app.services.deactivation_job_worker import deactivation_job_worker
+from app.services.stats_rollup_task import stats_rollup_task
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
     return f"{route.tags[0]}-{route.name}"
 
 
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # Подбирает и незавершённые задания, оставшиеся после рестарта
+    deactivation_job_worker.start()
+    stats_rollup_task.start()
+    yield
+    await stats_rollup_task.stop()
+    await deactivation_job_worker.stop()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi",
     generate_unique_id_function=custom_generate_unique_id,
     redirect_slashes=False,
+    lifespan=lifespan,
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
+
+
+@app.exception_handler(ConcurrentUpdateError)
+async def concurrent_update_handler(_: Request, __: ConcurrentUpdateError):
+    # Конфликт блокировок не разошёлся за все повторы в репозитории
+    # (reassign, deactivateUsers, createBatch, setIsActiveBatch)
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"},
+        content={
+            "error": {
+                "code": "CONCURRENT_UPDATE",
+                "message": "concurrent update, retry later",
+            }
+        },
+    )
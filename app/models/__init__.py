@@ -1,6 +1,17 @@
+from app.models.daily_stats import DailyReviewerStats, DailyTeamStats, StatsRollupState
+from app.models.deactivation_jobs import DeactivationJob
 from app.models.pr_reviewers import PRReviewer
 from app.models.pull_requests import PullRequest
 from app.models.teams import Team
 from app.models.users import User
 
-__all__ = ["PRReviewer", "PullRequest", "Team", "User"]
+__all__ = [
+    "DailyReviewerStats",
+    "DailyTeamStats",
+    "DeactivationJob",
+    "PRReviewer",
+    "PullRequest",
+    "StatsRollupState",
+    "Team",
+    "User",
+]
@@ -0,0 +1,68 @@
+from datetime import date, datetime
+
+from sqlalchemy import Date, Float, ForeignKey, Index, Integer
+from sqlalchemy.dialects import postgresql as pg
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+
+
+class DailyTeamStats(Base):
+    """
+    Дневной срез по команде (команда автора PR / ревьюера), дни по UTC.
+    Заполняется фоновым пересчётом (StatsRepository.refresh_daily_stats).
+    """
+
+    __tablename__ = "daily_team_stats"
+
+    team_name: Mapped[str] = mapped_column(
+        ForeignKey("teams.name", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    prs_opened: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    prs_merged: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    # Время от создания до merge (сек) по PR, смёрженным в этот день
+    time_to_merge_p50: Mapped[float | None] = mapped_column(Float)
+    time_to_merge_p90: Mapped[float | None] = mapped_column(Float)
+
+    reviews_assigned: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+
+
+class DailyReviewerStats(Base):
+    """Назначения на ревью по ревьюеру за день (UTC)."""
+
+    __tablename__ = "daily_reviewer_stats"
+
+    __table_args__ = (
+        Index("ix_daily_reviewer_stats_team_name_day", "team_name", "day"),
+    )
+
+    reviewer_id: Mapped[str] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    team_name: Mapped[str] = mapped_column(
+        ForeignKey("teams.name", ondelete="CASCADE"), nullable=False
+    )
+    reviews_assigned: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+
+
+class StatsRollupState(Base):
+    """До какого момента пересчитаны дневные срезы."""
+
+    __tablename__ = "stats_rollup_state"
+
+    name: Mapped[str] = mapped_column(primary_key=True)
+    refreshed_at: Mapped[datetime] = mapped_column(
+        pg.TIMESTAMP(timezone=True), nullable=False
+    )
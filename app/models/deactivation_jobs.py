@@ -0,0 +1,56 @@
+from datetime import datetime
+from enum import Enum
+
+from sqlalchemy import Enum as SAEnum
+from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+
+
+class JobStatus(str, Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+class DeactivationJob(Base):
+    __tablename__ = "deactivation_jobs"
+
+    id: Mapped[str] = mapped_column(primary_key=True)
+
+    team_name: Mapped[str] = mapped_column(
+        ForeignKey("teams.name", ondelete="CASCADE"), nullable=False
+    )
+    user_ids: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False)
+
+    status: Mapped[JobStatus] = mapped_column(
+        SAEnum(JobStatus, name="job_status_enum"),
+        default=JobStatus.PENDING,
+        nullable=False,
+    )
+    chunk_size: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # Последний обработанный PR: после рестарта продолжаем со следующего
+    last_pr_id: Mapped[str | None]
+
+    deactivated_users: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    prs_scanned: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    reassigned_reviewers: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    removed_reviewers: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    affected_pull_requests: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+
+    error: Mapped[str | None]
+    finished_at: Mapped[datetime | None]
@@ -1,6 +1,6 @@
 # ruff: noqa: F821
 
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
@@ -9,7 +9,15 @@ from app.core.db import Base
 class PRReviewer(Base):
     __tablename__ = "pr_reviewers"
 
-    __table_args__ = (UniqueConstraint("pr_id", "reviewer_id", name="uq_pr_reviewer"),)
+    __table_args__ = (
+        UniqueConstraint("pr_id", "reviewer_id", name="uq_pr_reviewer"),
+        # Поиск PR по ревьюеру: /users/getReview, деактивация, статистика
+        Index("ix_pr_reviewers_reviewer_id_pr_id", "reviewer_id", "pr_id"),
+        # Дневные срезы: назначения по дню создания строки и строки,
+        # изменённые reassign'ом после прошлого пересчёта
+        Index("ix_pr_reviewers_created_at", "created_at"),
+        Index("ix_pr_reviewers_updated_at", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
 
@@ -4,7 +4,7 @@ from datetime import datetime
 from enum import Enum
 
 from sqlalchemy import Enum as SAEnum
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
@@ -18,6 +18,23 @@ class PRStatus(str, Enum):
 class PullRequest(Base):
     __tablename__ = "pull_requests"
 
+    # OPEN PR — малая и горячая часть таблицы, MERGED в индекс не попадают
+    __table_args__ = (
+        Index(
+            "ix_pull_requests_open",
+            "id",
+            postgresql_include=["author_id"],
+            postgresql_where=text("status = 'OPEN'"),
+        ),
+        # Дневные срезы пересчитываются по диапазону времени
+        Index("ix_pull_requests_created_at", "created_at"),
+        Index(
+            "ix_pull_requests_merged_at",
+            "merged_at",
+            postgresql_where=text("merged_at IS NOT NULL"),
+        ),
+    )
+
     id: Mapped[str] = mapped_column(primary_key=True)
 
     title: Mapped[str] = mapped_column(String(200), nullable=False)
@@ -31,6 +48,11 @@ class PullRequest(Base):
     )
     merged_at: Mapped[datetime | None]
 
+    # Число назначенных ревьюеров для /stats/review; поддерживается репозиторием
+    reviewers_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+
     author: Mapped["User"] = relationship(back_populates="authored_prs")
     reviewers: Mapped[list["PRReviewer"]] = relationship(
         back_populates="pr", cascade="all, delete-orphan"
@@ -1,5 +1,6 @@
 # ruff: noqa: F821
 
+from sqlalchemy import Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
@@ -10,6 +11,12 @@ class Team(Base):
 
     name: Mapped[str] = mapped_column(primary_key=True)
 
+    # Версия состава команды для ETag в /team/get; растёт при изменении
+    # участников (перевод, активность)
+    version: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+
     users: Mapped[list["User"]] = relationship(
         back_populates="team", cascade="all, delete-orphan"
     )
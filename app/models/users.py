@@ -1,6 +1,6 @@
 # ruff: noqa: F821
 
-from sqlalchemy import Boolean, ForeignKey, String
+from sqlalchemy import Boolean, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
@@ -9,10 +9,46 @@ from app.core.db import Base
 class User(Base):
     __tablename__ = "users"
 
+    # Выбор кандидатов в ревьюеры по команде. open_reviews в индекс не
+    # входит: счётчик меняется на каждом назначении и merge, и с ним
+    # в индексе эти UPDATE не могли бы быть HOT
+    __table_args__ = (
+        Index(
+            "ix_users_team_name_is_active",
+            "team_name",
+            "is_active",
+            postgresql_include=["id"],
+        ),
+        # Участники команды страницами по id (/team/get)
+        Index(
+            "ix_users_team_name_id",
+            "team_name",
+            "id",
+            postgresql_include=["username", "is_active"],
+        ),
+    )
+
     id: Mapped[str] = mapped_column(primary_key=True)
     username: Mapped[str] = mapped_column(String(100), nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
 
+    # Число назначений на ревью в OPEN PR; поддерживается репозиторием
+    open_reviews: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+
+    # Число всех назначений на ревью (включая MERGED PR) для /stats/review;
+    # поддерживается репозиторием
+    reviews_assigned: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+
+    # Версия списка PR на ревью для ETag в /users/getReview; растёт вместе
+    # с изменением open_reviews (назначение, снятие, merge)
+    review_version: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+
     team_name: Mapped[str | None] = mapped_column(
         ForeignKey("teams.name", ondelete="SET NULL"), nullable=True
     )
@@ -1,4 +1,5 @@
 from app.repositories.pull_request_repository import PullRequestRepository
+from app.repositories.stats_repository import StatsRepository
 from app.repositories.team_repository import TeamRepository
 from app.repositories.user_repository import UserRepository
 
@@ -6,4 +7,5 @@ __all__ = [
     "TeamRepository",
     "UserRepository",
     "PullRequestRepository",
+    "StatsRepository",
 ]
@@ -1,23 +1,126 @@
+import asyncio
 import random
+from functools import cache
+from typing import AsyncIterator
+from uuid import uuid4
 
-from sqlalchemy import func, select
+from sqlalchemy import (
+    ARRAY,
+    Boolean,
+    Integer,
+    Row,
+    Select,
+    String,
+    Update,
+    any_,
+    bindparam,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    text,
+    true,
+    union,
+    union_all,
+    update,
+)
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.cache import TeamRosterCache, team_roster_cache
+from app.core.config import AssignmentStrategy
 from app.core.exceptions import (
     AlreadyExistsError,
+    ConcurrentUpdateError,
     NoReplacementCandidateError,
     NotFoundError,
     PullRequestMergedError,
     ReviewerNotAssignedError,
 )
-from app.models import PRReviewer, PullRequest, Team, User
+from app.models import DeactivationJob, PRReviewer, PullRequest, Team, User
+from app.models.deactivation_jobs import JobStatus
 from app.models.pull_requests import PRStatus
+from app.schemas import PullRequestBatchItemStatus, PullRequestCreatePayload
+
+CONFLICT_MAX_ATTEMPTS = 5
+
+# Пауза перед повтором — случайная, до CONFLICT_BACKOFF * 2**(попытка - 1)
+# секунд: конкуренты расходятся, а не сталкиваются снова в тот же момент
+CONFLICT_BACKOFF = 0.02
+
+# Первая половина ключа pg_advisory_xact_lock(класс, hashtext(команда)):
+# замены ревьюеров в одной команде идут по очереди
+REPLACEMENT_LOCK_CLASS = 0x5EC0_0002
+
+# deadlock_detected, serialization_failure, unique_violation, lock_not_available
+_RETRYABLE_SQLSTATES = {"40P01", "40001", "23505", "55P03"}
+
+
+def is_retryable_error(exc: DBAPIError) -> bool:
+    return getattr(exc.orig, "sqlstate", None) in _RETRYABLE_SQLSTATES
+
+
+def _any_of(ids: list[str]):
+    """
+    `= ANY(:ids)` с одним параметром-массивом вместо IN (...) на каждый id.
+    """
+    return any_(literal(ids, ARRAY(String)))
+
+
+def _any_param(name: str):
+    """То же для заранее собранного запроса: массив id — параметр `name`."""
+    return any_(bindparam(name, type_=ARRAY(String)))
+
+
+def _locked_users(user_ids, name: str):
+    """
+    CTE: строки users с id из `user_ids` под FOR NO KEY UPDATE в порядке id.
+
+    Счётчики ревьюеров обновляются только через такую выборку: запросы,
+    задевающие общих пользователей, блокируют их в одном порядке и не
+    упираются друг в друга крест-накрест (40P01).
+
+    Проверка внешнего ключа на users (FOR KEY SHARE в конце запроса) ждёт
+    транзакцию, которая сейчас меняет эту строку, поэтому пользователи,
+    на которых ссылаются вставляемые строки (автор PR), блокируются в том
+    же наборе.
+    """
+    users = User.__table__
+    return (
+        select(users.c.id)
+        .where(users.c.id.in_(user_ids))
+        .order_by(users.c.id)
+        .with_for_update(key_share=True)
+        .cte(name)
+        .prefix_with("MATERIALIZED")
+    )
+
+
+def _candidate_order(strategy: AssignmentStrategy) -> tuple:
+    """
+    Порядок выбора кандидатов в SQL: случайный либо по возрастанию
+    числа открытых ревью (при равенстве — случайный).
+    """
+    if strategy == AssignmentStrategy.LEAST_LOADED:
+        return User.open_reviews, func.random()
+    return (func.random(),)
 
 
 class PullRequestRepository:
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        roster_cache: TeamRosterCache = team_roster_cache,
+        assignment_strategy: AssignmentStrategy = AssignmentStrategy.RANDOM,
+    ) -> None:
         self._session = session
+        self._roster_cache = roster_cache
+        self._assignment_strategy = assignment_strategy
 
     async def create_pull_request(
         self,
@@ -28,68 +131,513 @@ class PullRequestRepository:
         """
         Создать PR и автоматически назначить до двух активных ревьюеров
         из команды автора, исключая самого автора.
+
+        Проверка дубликата, поиск автора, выбор ревьюеров, обе
+        вставки и обновление счётчиков ревью выполняются одним
+        SQL-запросом (CTE), который сразу
+        возвращает созданный PR вместе с назначенными ревьюерами.
         """
-        # 409: PR уже существует
-        existing_pr = await self._session.get(PullRequest, pr_id)
-        if existing_pr is not None:
+        try:
+            row = (
+                await self._session.execute(
+                    self._build_create_pr_stmt(self._assignment_strategy),
+                    {"pr_id": pr_id, "title": title, "author_id": author_id},
+                )
+            ).one()
+        except DBAPIError as exc:
+            # 409: PR с таким id успели создать параллельно
+            # (NOT EXISTS не видит незакоммиченную вставку)
+            if getattr(exc.orig, "sqlstate", None) != "23505":
+                raise
+            await self._session.rollback()
+            raise AlreadyExistsError() from exc
+
+        # 409: PR уже существовал до запроса
+        if row.pr_exists:
             raise AlreadyExistsError()
 
         # 404: автор (и, по сути, его команда) не найден
-        author = await self._session.get(User, author_id)
-        if author is None:
+        if not row.author_exists:
             raise NotFoundError()
 
-        pr = PullRequest(id=pr_id, title=title, author_id=author_id)
-        self._session.add(pr)
+        await self._session.commit()
 
-        # Находим всех активных кандидатов из команды автора, кроме самого автора
-        candidate_ids: list[str] = []
-        if author.team_name is not None:
-            stmt = select(User.id).where(
-                User.team_name == author.team_name,
-                User.is_active.is_(True),
-                User.id != author_id,
+        return self._build_pr(row, row.reviewer_ids or [])
+
+    async def create_pull_requests_batch(
+        self,
+        items: list[PullRequestCreatePayload],
+    ) -> list[tuple[PullRequestBatchItemStatus, PullRequest | None]]:
+        """
+        Пакетное создание PR.
+
+        Существующие PR, авторы и составы команд читаются по одному запросу
+        на весь пакет, затем PR и назначения вставляются пачками
+        (insertmanyvalues) в одной транзакции.
+
+        Возвращает по элементу на каждый входной PR в исходном порядке:
+        CREATED + PR, PR_EXISTS или NOT_FOUND.
+
+        Если PR из пакета успели создать параллельно, пакет повторяется
+        целиком (см. _retry_conflicts): повтор увидит его как PR_EXISTS.
+        """
+        if not items:
+            return []
+
+        return await self._retry_conflicts(self._create_pull_requests_batch_once, items)
+
+    async def _create_pull_requests_batch_once(
+        self,
+        items: list[PullRequestCreatePayload],
+    ) -> list[tuple[PullRequestBatchItemStatus, PullRequest | None]]:
+        pr_ids = list({item.pull_request_id for item in items})
+        author_ids = list({item.author_id for item in items})
+
+        stmt_existing = select(PullRequest.id).where(PullRequest.id == _any_of(pr_ids))
+        existing_ids = set(await self._session.scalars(stmt_existing))
+
+        stmt_authors = select(User.id, User.team_name).where(
+            User.id == _any_of(author_ids)
+        )
+        author_teams = dict((await self._session.execute(stmt_authors)).tuples().all())
+
+        rosters = await self._get_active_members_by_team(
+            {team for team in author_teams.values() if team is not None}
+        )
+        loads = await self._get_open_reviews(
+            list({uid for roster in rosters.values() for uid in roster})
+        )
+
+        statuses: list[PullRequestBatchItemStatus] = []
+        pr_rows: list[dict] = []
+        reviewer_ids_by_pr: dict[str, list[str]] = {}
+
+        for item in items:
+            # 409 проверяется раньше 404, как и в одиночном создании
+            if item.pull_request_id in existing_ids:
+                statuses.append(PullRequestBatchItemStatus.PR_EXISTS)
+                continue
+
+            if item.author_id not in author_teams:
+                statuses.append(PullRequestBatchItemStatus.NOT_FOUND)
+                continue
+
+            existing_ids.add(item.pull_request_id)
+            statuses.append(PullRequestBatchItemStatus.CREATED)
+            pr_rows.append(
+                {
+                    "id": item.pull_request_id,
+                    "title": item.pull_request_name,
+                    "author_id": item.author_id,
+                }
             )
-            result = await self._session.scalars(stmt)
-            candidate_ids = list(result)
 
-        selected_ids = random.sample(candidate_ids, k=min(2, len(candidate_ids)))
+            team_name = author_teams[item.author_id]
+            candidate_ids = [
+                uid for uid in rosters.get(team_name, ()) if uid != item.author_id
+            ]
+            selected_ids: list[str] = []
+            for _ in range(min(2, len(candidate_ids))):
+                reviewer_id = self._choose_reviewer(candidate_ids, loads)
+                candidate_ids.remove(reviewer_id)
+                loads[reviewer_id] = loads.get(reviewer_id, 0) + 1
+                selected_ids.append(reviewer_id)
+            reviewer_ids_by_pr[item.pull_request_id] = selected_ids
+            pr_rows[-1]["reviewers_count"] = len(selected_ids)
 
-        for reviewer_id in selected_ids:
-            self._session.add(
-                PRReviewer(
-                    pr_id=pr.id,
-                    reviewer_id=reviewer_id,
-                )
+        created: dict[str, PullRequest] = {}
+        if pr_rows:
+            # Авторы и ревьюеры — под блокировкой в порядке id до вставок:
+            # проверки внешних ключей и счётчики ниже их уже не ждут
+            user_ids = {row["author_id"] for row in pr_rows}
+            for selected_ids in reviewer_ids_by_pr.values():
+                user_ids.update(selected_ids)
+            await self._session.execute(
+                _lock_users_stmt(), {"user_ids": sorted(user_ids)}
             )
 
+            pull_requests = PullRequest.__table__
+            stmt_insert = insert(pull_requests).returning(
+                pull_requests.c.id,
+                pull_requests.c.title,
+                pull_requests.c.author_id,
+                pull_requests.c.status,
+                pull_requests.c.merged_at,
+            )
+            result = await self._session.execute(stmt_insert, pr_rows)
+            for row in result.all():
+                created[row.id] = self._build_pr(row, reviewer_ids_by_pr[row.id])
+
+        reviewer_rows = [
+            {"pr_id": pr_id, "reviewer_id": reviewer_id}
+            for pr_id in created
+            for reviewer_id in reviewer_ids_by_pr[pr_id]
+        ]
+        if reviewer_rows:
+            await self._session.execute(insert(PRReviewer.__table__), reviewer_rows)
+
+            deltas: dict[str, int] = {}
+            for row in reviewer_rows:
+                reviewer_id = row["reviewer_id"]
+                deltas[reviewer_id] = deltas.get(reviewer_id, 0) + 1
+            await self._adjust_review_counters(deltas)
+
         await self._session.commit()
 
-        return await self._get_pr_with_reviewers(pr.id)
+        return [
+            (
+                status,
+                (
+                    created[item.pull_request_id]
+                    if status == PullRequestBatchItemStatus.CREATED
+                    else None
+                ),
+            )
+            for item, status in zip(items, statuses)
+        ]
+
+    @staticmethod
+    @cache
+    def _build_create_pr_stmt(strategy: AssignmentStrategy) -> Select:
+        """
+        Собирает запрос создания PR (один на стратегию, значения —
+        параметры pr_id, title, author_id):
+
+        author        -- автор и его команда;
+        picked        -- до двух активных участников команды автора
+                         (случайных или наименее загруженных);
+        new_pr        -- INSERT PR, если его ещё нет (NOT EXISTS), сразу
+                         с reviewers_count по picked;
+        new_reviewers -- INSERT назначений для вставленного PR;
+        locked        -- назначенные ревьюеры и автор под блокировкой
+                         в порядке id;
+        bumped        -- +1 к open_reviews и reviews_assigned назначенных
+                         ревьюеров.
+
+        Флаги pr_exists/author_exists вычисляются по снимку до вставки,
+        поэтому по ним можно восстановить исходные ответы 409/404.
+        Обычный INSERT ... SELECT вместо ON CONFLICT оставляет запрос
+        в кэше скомпилированных запросов; параллельный дубликат
+        завершится unique_violation.
+        """
+        pull_requests = PullRequest.__table__
+        pr_reviewers = PRReviewer.__table__
+        users = User.__table__
+
+        author = (
+            select(User.id, User.team_name)
+            .where(User.id == bindparam("author_id"))
+            .cte("author")
+        )
+
+        picked = (
+            select(User.id)
+            .join(author, User.team_name == author.c.team_name)
+            .where(
+                User.is_active.is_(True),
+                User.id != author.c.id,
+            )
+            .order_by(*_candidate_order(strategy))
+            .limit(2)
+            .cte("picked")
+        )
+
+        new_pr = (
+            insert(pull_requests)
+            .from_select(
+                ["id", "title", "author_id", "reviewers_count"],
+                select(
+                    bindparam("pr_id", type_=String),
+                    bindparam("title", type_=String),
+                    author.c.id,
+                    select(func.count()).select_from(picked).scalar_subquery(),
+                ).where(~exists().where(pull_requests.c.id == bindparam("pr_id"))),
+            )
+            .returning(
+                pull_requests.c.id,
+                pull_requests.c.title,
+                pull_requests.c.author_id,
+                pull_requests.c.status,
+                pull_requests.c.merged_at,
+            )
+            .cte("new_pr")
+        )
+
+        new_reviewers = (
+            insert(pr_reviewers)
+            .from_select(
+                ["pr_id", "reviewer_id"],
+                select(new_pr.c.id, picked.c.id).join_from(new_pr, picked, true()),
+            )
+            .returning(pr_reviewers.c.reviewer_id)
+            .cte("new_reviewers")
+        )
+
+        locked = _locked_users(
+            union(select(new_reviewers.c.reviewer_id), select(new_pr.c.author_id)),
+            "locked",
+        )
+
+        bumped = (
+            update(users)
+            .where(
+                users.c.id == locked.c.id,
+                users.c.id.in_(select(new_reviewers.c.reviewer_id)),
+            )
+            .values(
+                open_reviews=users.c.open_reviews + 1,
+                reviews_assigned=users.c.reviews_assigned + 1,
+                review_version=users.c.review_version + 1,
+            )
+            .returning(users.c.id)
+            .cte("bumped")
+        )
+
+        anchor = select(literal(1).label("one")).subquery("anchor")
+
+        return select(
+            exists().where(pull_requests.c.id == bindparam("pr_id")).label("pr_exists"),
+            exists(select(author.c.id)).label("author_exists"),
+            new_pr.c.id,
+            new_pr.c.title,
+            new_pr.c.author_id,
+            new_pr.c.status,
+            new_pr.c.merged_at,
+            select(func.array_agg(bumped.c.id)).scalar_subquery().label("reviewer_ids"),
+        ).select_from(anchor.outerjoin(new_pr, true()))
+
+    @staticmethod
+    def _build_pr(row: Row, reviewer_ids: list[str]) -> PullRequest:
+        """
+        Вспомогательный метод: собрать PR с ревьюверами из строки результата,
+        не перечитывая его из БД. Объекты не добавляются в сессию.
+        """
+        pr = PullRequest(
+            id=row.id,
+            title=row.title,
+            author_id=row.author_id,
+            status=row.status,
+            merged_at=row.merged_at,
+        )
+        pr.reviewers = [
+            PRReviewer(pr_id=row.id, reviewer_id=reviewer_id)
+            for reviewer_id in reviewer_ids
+        ]
+        return pr
 
     async def merge_pull_request(self, pr_id: str) -> PullRequest:
         """
         Идемпотентно помечает PR как MERGED.
         Повторный вызов возвращает актуальное состояние.
+
+        После блокировки строки PR обновление, уменьшение счётчиков
+        open_reviews и чтение PR с ревьюверами для ответа выполняются
+        одним запросом.
         """
-        pr = await self._session.get(PullRequest, pr_id)
-        if pr is None:
+        rows = await self._execute_merge([pr_id])
+        if not rows:
             raise NotFoundError()
 
-        if pr.status != PRStatus.MERGED:
-            pr.status = PRStatus.MERGED
-            pr.merged_at = func.now()
-            await self._session.commit()
+        await self._session.commit()
+
+        return self._build_pr(rows[0], rows[0].reviewer_ids)
+
+    async def merge_pull_requests_batch(
+        self,
+        pr_ids: list[str],
+    ) -> tuple[list[PullRequest], list[PullRequest], list[str]]:
+        """
+        Пакетный merge одним UPDATE ... WHERE id = ANY(...) AND status = 'OPEN'.
+
+        Возвращает (смёржены этим вызовом, были смёржены ранее, не найдены);
+        порядок — как во входном списке, повторы id схлопываются.
+        """
+        pr_ids = list(dict.fromkeys(pr_ids))
+        if not pr_ids:
+            return [], [], []
+
+        rows = {row.id: row for row in await self._execute_merge(pr_ids)}
+
+        await self._session.commit()
+
+        merged: list[PullRequest] = []
+        already_merged: list[PullRequest] = []
+        not_found: list[str] = []
+        for pr_id in pr_ids:
+            row = rows.get(pr_id)
+            if row is None:
+                not_found.append(pr_id)
+            elif row.merged_now:
+                merged.append(self._build_pr(row, row.reviewer_ids))
+            else:
+                already_merged.append(self._build_pr(row, row.reviewer_ids))
+
+        return merged, already_merged, not_found
+
+    async def _execute_merge(self, pr_ids: list[str]) -> list[Row]:
+        # Открытые PR блокируются в порядке id отдельным запросом до merge:
+        # пакеты с общими PR не сцепляются крест-накрест, а запрос merge
+        # берёт снимок уже после ожидания и видит ревьюеров, которых
+        # параллельно заменили (иначе уменьшил бы счётчики прежних)
+        await self._session.execute(_lock_open_prs_by_id_stmt(), {"pr_ids": pr_ids})
 
-        return await self._get_pr_with_reviewers(pr_id)
+        stmt = self._build_merge_stmt()
+        rows = list(await self._session.execute(stmt, {"pr_ids": pr_ids}))
+
+        # Параллельный merge закоммитился после снимка нашего запроса:
+        # UPDATE его уже не затронул, а SELECT видел OPEN. Повторяем запрос
+        # для таких PR — в READ COMMITTED он получит свежий снимок.
+        raced_ids = [row.id for row in rows if row.status != PRStatus.MERGED]
+        if raced_ids:
+            retried = {
+                row.id: row
+                for row in await self._session.execute(stmt, {"pr_ids": raced_ids})
+            }
+            rows = [retried.get(row.id, row) for row in rows]
+
+        return rows
+
+    @staticmethod
+    @cache
+    def _build_merge_stmt() -> Select:
+        """
+        Собирает запрос merge для набора PR (параметр pr_ids):
+
+        merged         -- UPDATE ... WHERE status = 'OPEN' (пусто при повторном merge);
+        closed_counts  -- число только что смёрженных PR у каждого ревьюера;
+        locked         -- эти ревьюеры под блокировкой в порядке id;
+        closed_reviews -- уменьшение их open_reviews на closed_counts.
+
+        Основной SELECT видит снимок до UPDATE, поэтому статус и merged_at
+        берутся из RETURNING, если PR был смёржен этим запросом. Списки
+        ревьюеров собираются агрегатом в том же запросе.
+        """
+        pull_requests = PullRequest.__table__
+        pr_reviewers = PRReviewer.__table__
+        users = User.__table__
+
+        merged = (
+            update(pull_requests)
+            .where(
+                pull_requests.c.id == _any_param("pr_ids"),
+                pull_requests.c.status == PRStatus.OPEN,
+            )
+            .values(status=PRStatus.MERGED, merged_at=func.now())
+            .returning(
+                pull_requests.c.id,
+                pull_requests.c.status,
+                pull_requests.c.merged_at,
+            )
+            .cte("merged")
+        )
+
+        closed_counts = (
+            select(
+                pr_reviewers.c.reviewer_id,
+                func.count().label("closed"),
+            )
+            .where(pr_reviewers.c.pr_id.in_(select(merged.c.id)))
+            .group_by(pr_reviewers.c.reviewer_id)
+            .cte("closed_counts")
+        )
+
+        locked = _locked_users(select(closed_counts.c.reviewer_id), "locked")
+
+        closed_reviews = (
+            update(users)
+            .where(
+                users.c.id == locked.c.id,
+                users.c.id == closed_counts.c.reviewer_id,
+            )
+            .values(
+                open_reviews=users.c.open_reviews - closed_counts.c.closed,
+                review_version=users.c.review_version + 1,
+            )
+            .returning(users.c.id)
+            .cte("closed_reviews")
+        )
+
+        reviewer_ids = func.array(
+            select(pr_reviewers.c.reviewer_id)
+            .where(pr_reviewers.c.pr_id == pull_requests.c.id)
+            .order_by(pr_reviewers.c.id)
+            .scalar_subquery()
+        )
+
+        return (
+            select(
+                pull_requests.c.id,
+                pull_requests.c.title,
+                pull_requests.c.author_id,
+                func.coalesce(merged.c.status, pull_requests.c.status).label("status"),
+                func.coalesce(merged.c.merged_at, pull_requests.c.merged_at).label(
+                    "merged_at"
+                ),
+                merged.c.id.is_not(None).label("merged_now"),
+                reviewer_ids.label("reviewer_ids"),
+                # Ссылка нужна, чтобы CTE closed_reviews попал в запрос
+                select(func.count())
+                .select_from(closed_reviews)
+                .scalar_subquery()
+                .label("closed_reviews"),
+            )
+            .outerjoin(merged, merged.c.id == pull_requests.c.id)
+            .where(pull_requests.c.id == _any_param("pr_ids"))
+        )
 
     async def reassign_reviewer(
         self,
         pr_id: str,
         old_reviewer_id: str,
+    ) -> tuple[PullRequest, str]:
+        """
+        Заменяет ревьюера PR на активного участника его команды.
+
+        Строка PR блокируется (SELECT ... FOR UPDATE), поэтому переназначения
+        одного PR выполняются по очереди, а разных PR — параллельно.
+        Оставшиеся гонки (deadlock на счётчиках, нарушение uq_pr_reviewer)
+        повторяются внутри метода ограниченное число раз.
+        """
+        return await self._retry_conflicts(
+            self._reassign_reviewer_once, pr_id, old_reviewer_id
+        )
+
+    async def _retry_conflicts(self, operation, *args):
+        """
+        Выполняет транзакцию `operation(*args)`, повторяя её после отката
+        и случайной паузы при deadlock, ошибке сериализации, нарушении
+        уникальности или занятой строке (NOWAIT) — не больше
+        CONFLICT_MAX_ATTEMPTS раз. Если конфликт не разошёлся,
+        поднимает ConcurrentUpdateError.
+        """
+        for attempt in range(1, CONFLICT_MAX_ATTEMPTS + 1):
+            try:
+                return await operation(*args)
+            except DBAPIError as exc:
+                await self._session.rollback()
+                if not is_retryable_error(exc):
+                    raise
+                if attempt == CONFLICT_MAX_ATTEMPTS:
+                    raise ConcurrentUpdateError() from exc
+
+            await asyncio.sleep(
+                random.uniform(0, CONFLICT_BACKOFF * 2 ** (attempt - 1))
+            )
+
+        raise AssertionError("unreachable")
+
+    async def _reassign_reviewer_once(
+        self,
+        pr_id: str,
+        old_reviewer_id: str,
     ) -> tuple[PullRequest, str]:
         # 404: PR не найден
-        pr = await self._session.get(PullRequest, pr_id)
+        pr = await self._session.get(
+            PullRequest,
+            pr_id,
+            with_for_update=True,
+            populate_existing=True,
+        )
         if pr is None:
             raise NotFoundError()
 
@@ -102,33 +650,30 @@ class PullRequestRepository:
         if pr.status == PRStatus.MERGED:
             raise PullRequestMergedError()
 
+        # Все назначения PR одним запросом: из них же собирается ответ
+        reviewers = list(
+            await self._session.scalars(_pr_reviewers_stmt(), {"pr_id": pr_id})
+        )
+
         # Проверяем, что пользователь действительно назначен ревьювером этого PR
-        stmt_assignment = select(PRReviewer).where(
-            PRReviewer.pr_id == pr_id,
-            PRReviewer.reviewer_id == old_reviewer_id,
+        assignment = next(
+            (r for r in reviewers if r.reviewer_id == old_reviewer_id),
+            None,
         )
 
         # 409: NOT_ASSIGNED
-        assignment = await self._session.scalar(stmt_assignment)
         if assignment is None:
             raise ReviewerNotAssignedError()
 
-        # Собираем id других ревьюверов, чтобы не назначить дубль
-        stmt_other = select(PRReviewer.reviewer_id).where(
-            PRReviewer.pr_id == pr_id,
-            PRReviewer.reviewer_id != old_reviewer_id,
-        )
-        other_reviewer_ids = set(await self._session.scalars(stmt_other))
+        # id других ревьюверов, чтобы не назначить дубль
+        other_reviewer_ids = {
+            r.reviewer_id for r in reviewers if r.reviewer_id != old_reviewer_id
+        }
 
         # Кандидаты: активные пользователи из команды old_reviewer
         candidate_ids: list[str] = []
         if old_reviewer.team_name is not None:
-            stmt_candidates = select(User.id).where(
-                User.team_name == old_reviewer.team_name,
-                User.is_active.is_(True),
-            )
-            result = await self._session.scalars(stmt_candidates)
-            all_team_ids = list(result)
+            all_team_ids = await self._get_active_member_ids(old_reviewer.team_name)
 
             candidate_ids = [
                 uid
@@ -142,40 +687,45 @@ class PullRequestRepository:
         if not candidate_ids:
             raise NoReplacementCandidateError()
 
-        new_reviewer_id = random.choice(candidate_ids)
+        loads = await self._get_open_reviews(candidate_ids)
+        new_reviewer_id = self._choose_reviewer(candidate_ids, loads)
 
         assignment.reviewer_id = new_reviewer_id
+        await self._adjust_review_counters({old_reviewer_id: -1, new_reviewer_id: 1})
 
         await self._session.commit()
 
-        pr_with_reviewers = await self._get_pr_with_reviewers(pr_id)
-        return pr_with_reviewers, new_reviewer_id
+        # Ответ собирается из объектов сессии, без повторного чтения PR
+        set_committed_value(pr, "reviewers", reviewers)
+        return pr, new_reviewer_id
 
     async def get_review_stats_by_pr(
         self,
     ) -> list[tuple[str, int]]:
-        stmt = select(
-            PRReviewer.pr_id,
-            func.count(PRReviewer.reviewer_id),
-        ).group_by(PRReviewer.pr_id)
+        result = await self._session.execute(self._review_stats_stmt())
+        return list(result.tuples())
 
-        result = await self._session.execute(stmt)
-        return [(row[0], row[1]) for row in result.all()]
+    async def iter_review_stats_by_pr(
+        self, chunk_size: int
+    ) -> AsyncIterator[list[tuple[str, int]]]:
+        """
+        То же порциями по `chunk_size` строк через серверный курсор:
+        в памяти одновременно только одна порция.
+        """
+        stmt = self._review_stats_stmt().execution_options(yield_per=chunk_size)
+        result = await self._session.stream(stmt)
+        async for rows in result.tuples().partitions():
+            yield rows
 
-    async def _get_pr_with_reviewers(self, pr_id: str) -> PullRequest:
+    @staticmethod
+    def _review_stats_stmt() -> Select:
         """
-        Вспомогательный метод: получить PR с загруженными ревьюверами.
-        Используется для формирования ответа после операций.
+        Число ревьюеров по PR из счётчика pull_requests.reviewers_count,
+        без GROUP BY по pr_reviewers. PR без ревьюеров не попадают.
         """
-        stmt = (
-            select(PullRequest)
-            .where(PullRequest.id == pr_id)
-            .options(selectinload(PullRequest.reviewers))
+        return select(PullRequest.id, PullRequest.reviewers_count).where(
+            PullRequest.reviewers_count > 0
         )
-        pr = await self._session.scalar(stmt)
-        if pr is None:
-            raise NotFoundError()
-        return pr
 
     async def bulk_deactivate_team_users_and_reassign(
         self,
@@ -190,95 +740,1062 @@ class PullRequestRepository:
         (кол-во деактивированных пользователей,
          кол-во переназначенных ревьюеров,
          кол-во затронутых PR).
+
+        PR, созданный параллельно уже после блокировки открытых PR (см.
+        _lock_replacement_rows), может замкнуть deadlock с merge — тогда
+        транзакция повторяется.
         """
         if not user_ids:
             return 0, 0, 0
 
+        return await self._retry_conflicts(
+            self._bulk_deactivate_once, team_name, user_ids
+        )
+
+    async def _bulk_deactivate_once(
+        self,
+        team_name: str,
+        user_ids: list[str],
+    ) -> tuple[int, int, int]:
+        await self._lock_replacement_rows(user_ids)
+        deactivated_ids, deactivated_count = await self._deactivate_team_users(
+            team_name, user_ids
+        )
+
+        reassigned_count, _, affected_prs = await self._replace_inactive_reviewers(
+            deactivated_ids
+        )
+
+        await self._session.commit()
+        self._roster_cache.invalidate(team_name)
+
+        return deactivated_count, reassigned_count, affected_prs
+
+    async def set_is_active_batch(
+        self,
+        changes: dict[str, bool],
+        reassign: bool = False,
+    ) -> tuple[list[Row], dict[str, tuple[int, int]]]:
+        """
+        Применяет `changes` (user_id -> is_active) одним UPDATE и, если
+        `reassign`, тем же запросом замены, что и массовая деактивация,
+        переназначает открытые ревью всех только что деактивированных
+        пользователей сразу по всем их командам. Всё — одной транзакцией.
+
+        Возвращает (строки (id, username, team_name, is_active, changed)
+        найденных пользователей, {user_id: (переназначено, снято без замены)}).
+        Конфликты блокировок повторяются, как в массовой деактивации.
+        """
+        if not changes:
+            return [], {}
+
+        return await self._retry_conflicts(
+            self._set_is_active_batch_once, changes, reassign
+        )
+
+    async def _set_is_active_batch_once(
+        self,
+        changes: dict[str, bool],
+        reassign: bool,
+    ) -> tuple[list[Row], dict[str, tuple[int, int]]]:
+        if reassign:
+            await self._lock_replacement_rows(
+                [user_id for user_id, is_active in changes.items() if not is_active]
+            )
+
+        users_rows = (
+            await self._session.execute(
+                self._build_set_is_active_batch_stmt(),
+                {"user_ids": list(changes), "is_active": list(changes.values())},
+            )
+        ).all()
+
+        deactivated_ids = [
+            row.id for row in users_rows if row.changed and not row.is_active
+        ]
+        reviews: dict[str, tuple[int, int]] = {}
+        if reassign and deactivated_ids:
+            stmt = self._build_replace_reviewers_stmt(
+                self._assignment_strategy, by_pr=False, by_reviewer=True
+            )
+            params = {"reviewer_ids": deactivated_ids}
+            for row in await self._session.execute(stmt, params):
+                reviews[row.reviewer_id] = (row.reassigned, row.removed)
+
+        await self._session.commit()
+        self._session.expire_all()
+        self._roster_cache.invalidate(
+            *{row.team_name for row in users_rows if row.changed}
+        )
+
+        return users_rows, reviews
+
+    @staticmethod
+    @cache
+    def _build_set_is_active_batch_stmt() -> Select:
+        """
+        Параметры: user_ids и is_active — изменения поэлементно.
+
+        target  -- пользователи под FOR UPDATE в порядке id
+                   (параллельные пакеты не блокируют друг друга крест-накрест)
+                   и их прежний is_active;
+        updated -- UPDATE is_active, changed = значение изменилось;
+        bumped  -- версия команд, где значение изменилось.
+        """
+        users = User.__table__
+        teams = Team.__table__
+
+        requested = (
+            func.unnest(
+                bindparam("user_ids", type_=ARRAY(String)),
+                bindparam("is_active", type_=ARRAY(Boolean)),
+            )
+            .table_valued("user_id", "is_active")
+            .render_derived(name="requested")
+        )
+
+        target = (
+            select(
+                users.c.id,
+                users.c.is_active.label("was_active"),
+                requested.c.is_active.label("new_active"),
+            )
+            .join(requested, requested.c.user_id == users.c.id)
+            .order_by(users.c.id)
+            .with_for_update(of=users)
+            .cte("target")
+        )
+
+        updated = (
+            update(users)
+            .where(users.c.id == target.c.id)
+            .values(is_active=target.c.new_active)
+            .returning(
+                users.c.id,
+                users.c.username,
+                users.c.team_name,
+                users.c.is_active,
+                (target.c.was_active != target.c.new_active).label("changed"),
+            )
+            .cte("updated")
+        )
+
+        bumped = (
+            update(teams)
+            .where(
+                teams.c.name.in_(select(updated.c.team_name).where(updated.c.changed))
+            )
+            .values(version=teams.c.version + 1)
+            .returning(teams.c.name)
+            .cte("bumped")
+        )
+
+        return select(
+            updated.c.id,
+            updated.c.username,
+            updated.c.team_name,
+            updated.c.is_active,
+            updated.c.changed,
+            # Ссылка нужна, чтобы bumped попал в запрос
+            select(func.count()).select_from(bumped).scalar_subquery().label("bumped"),
+        )
+
+    async def create_deactivation_job(
+        self,
+        team_name: str,
+        user_ids: list[str],
+        chunk_size: int,
+    ) -> DeactivationJob:
+        """
+        Фоновый вариант bulk_deactivate_team_users_and_reassign.
+
+        Пользователи деактивируются сразу, в одной транзакции с созданием
+        задания; замена ревьюеров выполняется потом порциями по
+        `chunk_size` PR (см. run_deactivation_job_chunk).
+        """
+        await self._session.execute(_lock_users_stmt(), {"user_ids": user_ids})
+        deactivated_ids, deactivated_count = await self._deactivate_team_users(
+            team_name, user_ids
+        )
+
+        job = DeactivationJob(
+            id=uuid4().hex,
+            team_name=team_name,
+            user_ids=deactivated_ids,
+            status=JobStatus.PENDING,
+            chunk_size=chunk_size,
+            deactivated_users=deactivated_count,
+        )
+        self._session.add(job)
+
+        await self._session.commit()
+        self._roster_cache.invalidate(team_name)
+
+        return job
+
+    async def get_deactivation_job(self, job_id: str) -> DeactivationJob:
+        job = await self._session.get(DeactivationJob, job_id)
+        if job is None:
+            raise NotFoundError()
+
+        return job
+
+    async def get_unfinished_deactivation_job_ids(self) -> list[str]:
+        stmt = (
+            select(DeactivationJob.id)
+            .where(DeactivationJob.status.in_([JobStatus.PENDING, JobStatus.RUNNING]))
+            .order_by(DeactivationJob.created_at)
+        )
+        return list(await self._session.scalars(stmt))
+
+    async def run_deactivation_job_chunk(self, job_id: str) -> DeactivationJob | None:
+        """
+        Обрабатывает следующую порцию PR задания и коммитит её вместе
+        с прогрессом, поэтому после рестарта задание продолжается
+        с первого необработанного PR.
+
+        Строка задания блокируется с SKIP LOCKED: если порцию уже
+        обрабатывает другой воркер, возвращается None.
+        """
+        job = await self._session.get(
+            DeactivationJob,
+            job_id,
+            with_for_update={"skip_locked": True},
+            populate_existing=True,
+        )
+        if job is None or job.status in (JobStatus.DONE, JobStatus.FAILED):
+            await self._session.rollback()
+            return None
+
+        await self._session.execute(_lock_teams_stmt(), {"user_ids": job.user_ids})
+
+        stmt = (
+            select(PullRequest.id)
+            .where(
+                PullRequest.status == PRStatus.OPEN,
+                select(PRReviewer.id)
+                .where(
+                    PRReviewer.pr_id == PullRequest.id,
+                    PRReviewer.reviewer_id == _any_of(job.user_ids),
+                )
+                .exists(),
+            )
+            .order_by(PullRequest.id)
+            .limit(job.chunk_size)
+            # Порция PR — под блокировкой в порядке id, как в merge
+            .with_for_update(of=PullRequest, key_share=True)
+        )
+        if job.last_pr_id is not None:
+            stmt = stmt.where(PullRequest.id > job.last_pr_id)
+        pr_ids = list(await self._session.scalars(stmt))
+
+        if not pr_ids:
+            job.status = JobStatus.DONE
+            job.finished_at = func.now()
+        else:
+            await self._session.execute(
+                _lock_teammates_stmt(), {"user_ids": job.user_ids}
+            )
+            reassigned, removed, affected = await self._replace_inactive_reviewers(
+                job.user_ids, pr_ids
+            )
+            job.status = JobStatus.RUNNING
+            job.last_pr_id = pr_ids[-1]
+            job.prs_scanned += len(pr_ids)
+            job.reassigned_reviewers += reassigned
+            job.removed_reviewers += removed
+            job.affected_pull_requests += affected
+
+        await self._session.commit()
+        if job.status == JobStatus.DONE:
+            await self._session.refresh(job)
+
+        return job
+
+    async def fail_deactivation_job(self, job_id: str, error: str) -> None:
+        stmt = (
+            update(DeactivationJob)
+            .where(DeactivationJob.id == job_id)
+            .values(status=JobStatus.FAILED, error=error, finished_at=func.now())
+        )
+        await self._session.execute(stmt)
+        await self._session.commit()
+
+    async def reconcile_review_counters(
+        self, fix: bool = True
+    ) -> dict[str, list[tuple[str, int, int]]]:
+        """
+        Пересчитывает счётчики ревью с нуля по pr_reviewers и сравнивает
+        с хранимыми: users.reviews_assigned, users.open_reviews и
+        pull_requests.reviewers_count.
+
+        На время пересчёта pr_reviewers и pull_requests закрыты для записи
+        (LOCK ... IN SHARE MODE), чтобы параллельные назначения и merge
+        не разошлись с пересчитанными значениями.
+
+        Возвращает расхождения по счётчикам: {счётчик: [(id, было, стало)]}.
+        При fix=False только отчёт, без исправления.
+        """
+        pull_requests = PullRequest.__table__
+        pr_reviewers = PRReviewer.__table__
+        users = User.__table__
+
+        await self._session.execute(
+            text("LOCK TABLE pr_reviewers, pull_requests IN SHARE MODE")
+        )
+
+        by_reviewer = (
+            select(
+                pr_reviewers.c.reviewer_id,
+                func.count().label("assigned"),
+                func.count()
+                .filter(pull_requests.c.status == PRStatus.OPEN)
+                .label("open"),
+            )
+            .join(pull_requests, pull_requests.c.id == pr_reviewers.c.pr_id)
+            .group_by(pr_reviewers.c.reviewer_id)
+            .subquery("by_reviewer")
+        )
+        by_pr = (
+            select(pr_reviewers.c.pr_id, func.count().label("reviewers"))
+            .group_by(pr_reviewers.c.pr_id)
+            .subquery("by_pr")
+        )
+
+        counters = (
+            (
+                users.c.reviews_assigned,
+                users.c.id,
+                by_reviewer,
+                by_reviewer.c.reviewer_id,
+                by_reviewer.c.assigned,
+            ),
+            (
+                users.c.open_reviews,
+                users.c.id,
+                by_reviewer,
+                by_reviewer.c.reviewer_id,
+                by_reviewer.c.open,
+            ),
+            (
+                pull_requests.c.reviewers_count,
+                pull_requests.c.id,
+                by_pr,
+                by_pr.c.pr_id,
+                by_pr.c.reviewers,
+            ),
+        )
+
+        drift: dict[str, list[tuple[str, int, int]]] = {}
+        for counter, id_column, source, source_id, source_count in counters:
+            table = counter.table
+            actual = func.coalesce(source_count, 0)
+            drifted = (
+                select(
+                    id_column.label("id"),
+                    counter.label("stored"),
+                    actual.label("actual"),
+                )
+                .select_from(table.outerjoin(source, source_id == id_column))
+                .where(counter != actual)
+                .subquery("drifted")
+            )
+
+            if fix:
+                stmt = (
+                    update(table)
+                    .where(id_column == drifted.c.id)
+                    .values({counter.name: drifted.c.actual})
+                    .returning(drifted.c.id, drifted.c.stored, drifted.c.actual)
+                )
+            else:
+                stmt = select(drifted.c.id, drifted.c.stored, drifted.c.actual)
+
+            result = await self._session.execute(stmt)
+            drift[f"{table.name}.{counter.name}"] = sorted(result.tuples().all())
+
+        if fix:
+            await self._session.commit()
+        else:
+            await self._session.rollback()
+
+        return drift
+
+    async def _deactivate_team_users(
+        self,
+        team_name: str,
+        user_ids: list[str],
+    ) -> tuple[list[str], int]:
+        """
+        Проверяет команду и пользователей и деактивирует их одним UPDATE.
+
+        Возвращает (id пользователей, кол-во реально деактивированных).
+        """
         # 404: команда не найдена
         team = await self._session.get(Team, team_name)
         if team is None:
             raise NotFoundError()
 
-        stmt_users = select(User).where(
-            User.id.in_(user_ids),
-            User.team_name == team_name,
+        found_ids = set(
+            await self._session.scalars(
+                _team_users_stmt(), {"user_ids": user_ids, "team_name": team_name}
+            )
         )
-        users = list(await self._session.scalars(stmt_users))
 
-        if not users:
+        if not found_ids or set(user_ids) - found_ids:
             raise NotFoundError()
 
-        found_ids = {u.id for u in users}
-        missing_ids = set(user_ids) - found_ids
-        if missing_ids:
-            raise NotFoundError()
+        deactivated_ids = list(found_ids)
+        deactivated_count = len(
+            (
+                await self._session.scalars(
+                    _deactivate_users_stmt(), {"user_ids": deactivated_ids}
+                )
+            ).all()
+        )
 
-        deactivated_count = 0
-        for u in users:
-            if u.is_active:
-                u.is_active = False
-                deactivated_count += 1
+        if deactivated_count:
+            await self._session.execute(
+                _bump_team_version_stmt(), {"team_name": team_name}
+            )
 
-        await self._session.flush()
+        return deactivated_ids, deactivated_count
 
-        deactivated_ids = {u.id for u in users}
+    async def _lock_replacement_rows(self, reviewer_ids: list[str]) -> None:
+        """
+        Блокирует до первой записи всё, что затронет замена ревьюеров
+        `reviewer_ids`: их открытые PR, затем их самих вместе с участниками
+        их команд (кандидатами на замену) — каждый набор в порядке id.
+        Замены в одной команде перед этим встают в очередь (advisory-
+        блокировка команды), а не перехватывают PR друг у друга.
 
-        if not deactivated_ids:
-            await self._session.commit()
-            return deactivated_count, 0, 0
+        Порядок тот же, что у merge (PR, потом пользователи) и создания PR,
+        поэтому деактивация не сцепляется с ними крест-накрест (40P01).
+
+        PR, созданный, пока ждали пользователей, уже мог заблокировать merge,
+        который теперь ждёт этих пользователей. Поэтому открытые PR
+        блокируются ещё раз с NOWAIT: такой конфликт сразу даёт 55P03,
+        и транзакция повторяется (см. _retry_conflicts), а не ждёт.
+        """
+        params = {"reviewer_ids": reviewer_ids}
+        await self._session.execute(_lock_teams_stmt(), {"user_ids": reviewer_ids})
+        await self._session.execute(_lock_open_prs_stmt(), params)
+        await self._session.execute(_lock_teammates_stmt(), {"user_ids": reviewer_ids})
+        await self._session.execute(_lock_open_prs_stmt(nowait=True), params)
+
+    async def _replace_inactive_reviewers(
+        self,
+        reviewer_ids: list[str],
+        pr_ids: list[str] | None = None,
+    ) -> tuple[int, int, int]:
+        """
+        Заменяет неактивных ревьюеров из `reviewer_ids` в OPEN PR
+        (при заданном `pr_ids` — только в этих PR) одним запросом.
 
-        # Кандидаты: все активные пользователи этой команды
-        stmt_candidates = select(User.id).where(
-            User.team_name == team_name,
-            User.is_active.is_(True),
+        Возвращает кортеж:
+        (кол-во переназначенных ревьюеров,
+         кол-во снятых без замены,
+         кол-во затронутых PR).
+        """
+        stmt = self._build_replace_reviewers_stmt(
+            self._assignment_strategy, by_pr=pr_ids is not None, by_reviewer=False
         )
-        candidate_ids = list(await self._session.scalars(stmt_candidates))
+        params = {"reviewer_ids": reviewer_ids, "pr_ids": pr_ids}
+        row = (await self._session.execute(stmt, params)).one()
+        return row.reassigned, row.removed, row.affected_prs
+
+    @staticmethod
+    @cache
+    def _build_replace_reviewers_stmt(
+        strategy: AssignmentStrategy, by_pr: bool, by_reviewer: bool
+    ) -> Select:
+        """
+        Собирает запрос замены неактивных ревьюеров из параметра
+        reviewer_ids (с `by_pr` — только в PR из параметра pr_ids):
+
+        slots        -- назначения на замену: номер внутри (PR, команда
+                        ревьюера) и сквозной номер внутри команды;
+        groups       -- (PR, команда): автор, число слотов и сдвиг;
+        candidates   -- активные участники затронутых команд в порядке
+                        стратегии (idx);
+        ranked       -- для каждой группы несколько позиций по кругу от
+                        сдвига, кроме автора и текущих ревьюеров PR;
+        plan         -- слот -> новый ревьюер (NULL, если заменить некем);
+        replaced     -- UPDATE назначений, для которых нашлась замена;
+        removed      -- DELETE остальных;
+        deltas       -- изменения счётчиков по RETURNING обоих запросов;
+        locked       -- затронутые ревьюеры под блокировкой в порядке id;
+        counters     -- счётчики ревьюеров;
+        pr_counts    -- reviewers_count PR, у которых ревьюер снят.
 
-        # Находим OPEN PR, где среди ревьюверов есть деактивируемые пользователи
-        stmt_prs = (
-            select(PullRequest)
-            .join(PRReviewer, PRReviewer.pr_id == PullRequest.id)
+        Сдвиг растёт вместе со сквозным номером слота, поэтому замены
+        расходятся по всей команде, а не достаются одним и тем же
+        первым кандидатам в каждом PR. UPDATE и DELETE дополнительно
+        сверяют старого ревьюера, чтобы не затереть параллельный reassign.
+
+        Итог — одна строка (reassigned, removed, affected_prs), а с
+        `by_reviewer` — строка (reviewer_id, reassigned, removed) на
+        каждого снятого ревьюера.
+        """
+        pull_requests = PullRequest.__table__
+        pr_reviewers = PRReviewer.__table__
+        users = User.__table__
+
+        slot_filters = [
+            pr_reviewers.c.reviewer_id == _any_param("reviewer_ids"),
+            pull_requests.c.status == PRStatus.OPEN,
+            users.c.is_active.is_(False),
+        ]
+        if by_pr:
+            slot_filters.append(pr_reviewers.c.pr_id == _any_param("pr_ids"))
+
+        slots = (
+            select(
+                pr_reviewers.c.id,
+                pr_reviewers.c.pr_id,
+                pr_reviewers.c.reviewer_id,
+                pull_requests.c.author_id,
+                users.c.team_name,
+                func.row_number()
+                .over(
+                    partition_by=(pr_reviewers.c.pr_id, users.c.team_name),
+                    order_by=pr_reviewers.c.id,
+                )
+                .label("slot_no"),
+                (
+                    func.row_number().over(
+                        partition_by=users.c.team_name,
+                        order_by=(pr_reviewers.c.pr_id, pr_reviewers.c.id),
+                    )
+                    - 1
+                ).label("team_seq"),
+            )
+            .join(pull_requests, pull_requests.c.id == pr_reviewers.c.pr_id)
+            .join(users, users.c.id == pr_reviewers.c.reviewer_id)
+            .where(*slot_filters)
+            .cte("slots")
+        )
+
+        groups = (
+            select(
+                slots.c.pr_id,
+                slots.c.team_name,
+                slots.c.author_id,
+                func.count().label("slot_count"),
+                func.min(slots.c.team_seq).label("shift"),
+                select(func.count())
+                .where(pr_reviewers.c.pr_id == slots.c.pr_id)
+                .scalar_subquery()
+                .label("reviewer_count"),
+            )
+            .group_by(slots.c.pr_id, slots.c.team_name, slots.c.author_id)
+            .cte("groups")
+        )
+
+        candidates = (
+            select(
+                users.c.id,
+                users.c.team_name,
+                (
+                    func.row_number().over(
+                        partition_by=users.c.team_name,
+                        order_by=_candidate_order(strategy),
+                    )
+                    - 1
+                ).label("idx"),
+            )
             .where(
-                PullRequest.status == PRStatus.OPEN,
-                PRReviewer.reviewer_id.in_(deactivated_ids),
-            )
-            .options(selectinload(PullRequest.reviewers))
-            .distinct()
-        )
-        open_prs = list(await self._session.scalars(stmt_prs))
-
-        reassigned_count = 0
-        affected_pr_ids: set[str] = set()
-
-        for pr in open_prs:
-            current_reviewer_ids = {r.reviewer_id for r in pr.reviewers}
-
-            for assignment in list(pr.reviewers):
-                if assignment.reviewer_id not in deactivated_ids:
-                    continue
-
-                # Кандидаты для конкретного PR:
-                #   - активные из команды
-                #   - не автор PR
-                #   - не уже назначены ревьюверами этого PR
-                available_candidates = [
-                    uid
-                    for uid in candidate_ids
-                    if uid != pr.author_id and uid not in current_reviewer_ids
-                ]
-
-                if available_candidates:
-                    new_reviewer_id = random.choice(available_candidates)
-                    current_reviewer_ids.remove(assignment.reviewer_id)
-                    current_reviewer_ids.add(new_reviewer_id)
-                    assignment.reviewer_id = new_reviewer_id
-                    reassigned_count += 1
-                    affected_pr_ids.add(pr.id)
-                else:
-                    current_reviewer_ids.remove(assignment.reviewer_id)
-                    await self._session.delete(assignment)
-                    affected_pr_ids.add(pr.id)
+                users.c.is_active.is_(True),
+                users.c.team_name.in_(select(slots.c.team_name)),
+            )
+            .cte("candidates")
+        )
+
+        team_sizes = (
+            select(candidates.c.team_name, func.count().label("size"))
+            .group_by(candidates.c.team_name)
+            .subquery("team_sizes")
+        )
+
+        # Кандидатов смотрим не больше, чем слотов плюс тех, кого придётся
+        # пропустить (автор и текущие ревьюеры PR)
+        series = (
+            func.generate_series(
+                0,
+                func.least(
+                    team_sizes.c.size,
+                    groups.c.slot_count + groups.c.reviewer_count + 1,
+                )
+                - 1,
+            )
+            .table_valued("pos")
+            .render_derived(name="series")
+        )
+
+        positions = (
+            select(
+                groups.c.pr_id,
+                groups.c.team_name,
+                groups.c.author_id,
+                series.c.pos,
+                ((groups.c.shift + series.c.pos) % team_sizes.c.size).label("idx"),
+            )
+            .join(team_sizes, team_sizes.c.team_name == groups.c.team_name)
+            .join(series, true())
+            .cte("positions")
+            # Без материализации планировщик сначала соединяет группы со всеми
+            # кандидатами команды и только потом фильтрует по idx
+            .prefix_with("MATERIALIZED")
+        )
+
+        ranked = (
+            select(
+                positions.c.pr_id,
+                positions.c.team_name,
+                candidates.c.id.label("new_reviewer_id"),
+                func.row_number()
+                .over(
+                    partition_by=(positions.c.pr_id, positions.c.team_name),
+                    order_by=positions.c.pos,
+                )
+                .label("rank"),
+            )
+            .join(
+                candidates,
+                (candidates.c.team_name == positions.c.team_name)
+                & (candidates.c.idx == positions.c.idx),
+            )
+            .where(
+                candidates.c.id != positions.c.author_id,
+                ~select(pr_reviewers.c.id)
+                .where(
+                    pr_reviewers.c.pr_id == positions.c.pr_id,
+                    pr_reviewers.c.reviewer_id == candidates.c.id,
+                )
+                .exists(),
+            )
+            .subquery("ranked")
+        )
+
+        plan = (
+            select(
+                slots.c.id,
+                slots.c.reviewer_id.label("old_reviewer_id"),
+                ranked.c.new_reviewer_id,
+            )
+            .outerjoin(
+                ranked,
+                (ranked.c.pr_id == slots.c.pr_id)
+                & (ranked.c.team_name == slots.c.team_name)
+                & (ranked.c.rank == slots.c.slot_no),
+            )
+            .cte("plan")
+        )
+
+        replaced = (
+            update(pr_reviewers)
+            .where(
+                pr_reviewers.c.id == plan.c.id,
+                pr_reviewers.c.reviewer_id == plan.c.old_reviewer_id,
+                plan.c.new_reviewer_id.is_not(None),
+            )
+            .values(reviewer_id=plan.c.new_reviewer_id)
+            .returning(
+                pr_reviewers.c.pr_id,
+                plan.c.old_reviewer_id,
+                pr_reviewers.c.reviewer_id.label("new_reviewer_id"),
+            )
+            .cte("replaced")
+        )
+
+        removed = (
+            delete(pr_reviewers)
+            .where(
+                pr_reviewers.c.id == plan.c.id,
+                pr_reviewers.c.reviewer_id == plan.c.old_reviewer_id,
+                plan.c.new_reviewer_id.is_(None),
+            )
+            .returning(
+                pr_reviewers.c.pr_id,
+                pr_reviewers.c.reviewer_id.label("old_reviewer_id"),
+            )
+            .cte("removed")
+        )
+
+        changes = union_all(
+            select(
+                replaced.c.old_reviewer_id.label("user_id"),
+                literal_column("-1").label("delta"),
+            ),
+            select(replaced.c.new_reviewer_id, literal_column("1")),
+            select(removed.c.old_reviewer_id, literal_column("-1")),
+        ).subquery("changes")
+
+        deltas = (
+            select(changes.c.user_id, func.sum(changes.c.delta).label("delta"))
+            .group_by(changes.c.user_id)
+            .cte("deltas")
+        )
+
+        locked = _locked_users(select(deltas.c.user_id), "locked")
+
+        counters = (
+            update(users)
+            .where(
+                users.c.id == locked.c.id,
+                users.c.id == deltas.c.user_id,
+            )
+            .values(
+                open_reviews=users.c.open_reviews + deltas.c.delta,
+                reviews_assigned=users.c.reviews_assigned + deltas.c.delta,
+                review_version=users.c.review_version + 1,
+            )
+            .returning(users.c.id)
+            .cte("counters")
+        )
+
+        removed_counts = (
+            select(removed.c.pr_id, func.count().label("removed"))
+            .group_by(removed.c.pr_id)
+            .subquery("removed_counts")
+        )
+
+        pr_counts = (
+            update(pull_requests)
+            .where(pull_requests.c.id == removed_counts.c.pr_id)
+            .values(
+                reviewers_count=pull_requests.c.reviewers_count
+                - removed_counts.c.removed
+            )
+            .returning(pull_requests.c.id)
+            .cte("pr_counts")
+        )
+
+        # Ссылки нужны, чтобы CTE со счётчиками попали в запрос
+        counter_refs = (
+            select(func.count())
+            .select_from(counters)
+            .scalar_subquery()
+            .label("counters"),
+            select(func.count())
+            .select_from(pr_counts)
+            .scalar_subquery()
+            .label("pr_counts"),
+        )
+
+        if by_reviewer:
+            per_reviewer = union_all(
+                select(
+                    replaced.c.old_reviewer_id.label("reviewer_id"),
+                    literal_column("1").label("reassigned"),
+                    literal_column("0").label("removed"),
+                ),
+                select(
+                    removed.c.old_reviewer_id,
+                    literal_column("0"),
+                    literal_column("1"),
+                ),
+            ).subquery("per_reviewer")
+            return select(
+                per_reviewer.c.reviewer_id,
+                func.sum(per_reviewer.c.reassigned).label("reassigned"),
+                func.sum(per_reviewer.c.removed).label("removed"),
+                *counter_refs,
+            ).group_by(per_reviewer.c.reviewer_id)
+
+        affected = union(
+            select(replaced.c.pr_id),
+            select(removed.c.pr_id),
+        ).subquery("affected")
+
+        return select(
+            select(func.count())
+            .select_from(replaced)
+            .scalar_subquery()
+            .label("reassigned"),
+            select(func.count())
+            .select_from(removed)
+            .scalar_subquery()
+            .label("removed"),
+            select(func.count())
+            .select_from(affected)
+            .scalar_subquery()
+            .label("affected_prs"),
+            *counter_refs,
+        )
+
+    async def _get_active_member_ids(self, team_name: str) -> tuple[str, ...]:
+        """
+        Активные участники команды: из кэша воркера,
+        а при промахе — из БД с последующим сохранением в кэш.
+        """
+        rosters = await self._get_active_members_by_team({team_name})
+        return rosters[team_name]
+
+    async def _get_active_members_by_team(
+        self, team_names: set[str]
+    ) -> dict[str, tuple[str, ...]]:
+        """
+        То же для нескольких команд. Текущие версии команд читаются одним
+        запросом (запись кэша с другой версией устарела), промахи кэша
+        дочитываются вторым.
+        """
+        versions = dict(
+            (
+                await self._session.execute(
+                    _team_versions_stmt(), {"team_names": list(team_names)}
+                )
+            )
+            .tuples()
+            .all()
+        )
+
+        rosters: dict[str, tuple[str, ...]] = {}
+        missing: list[str] = []
+        for team_name in team_names:
+            version = versions.get(team_name)
+            member_ids = (
+                None if version is None else self._roster_cache.get(team_name, version)
+            )
+            if member_ids is None:
+                missing.append(team_name)
+            else:
+                rosters[team_name] = member_ids
+
+        if not missing:
+            return rosters
+
+        result = await self._session.execute(
+            _active_members_stmt(), {"team_names": missing}
+        )
+        loaded: dict[str, list[str]] = {team_name: [] for team_name in missing}
+        for team_name, user_id in result.tuples():
+            loaded[team_name].append(user_id)
+
+        for team_name, member_ids in loaded.items():
+            rosters[team_name] = tuple(member_ids)
+            # Несуществующую команду не кэшируем: версии у неё нет
+            if team_name in versions:
+                self._roster_cache.put(team_name, member_ids, versions[team_name])
+
+        return rosters
+
+    async def _get_open_reviews(self, user_ids: list[str]) -> dict[str, int]:
+        """
+        Текущая загрузка кандидатов. Нужна только для режима least_loaded,
+        в случайном режиме запрос не выполняется.
+        """
+        if self._assignment_strategy != AssignmentStrategy.LEAST_LOADED:
+            return {}
+        if not user_ids:
+            return {}
+
+        result = await self._session.execute(
+            _open_reviews_stmt(), {"user_ids": user_ids}
+        )
+        return {user_id: open_reviews for user_id, open_reviews in result.all()}
+
+    def _choose_reviewer(self, candidate_ids: list[str], loads: dict[str, int]) -> str:
+        if self._assignment_strategy == AssignmentStrategy.LEAST_LOADED:
+            return min(
+                candidate_ids,
+                key=lambda uid: (loads.get(uid, 0), random.random()),
+            )
+        return random.choice(candidate_ids)
+
+    async def _adjust_review_counters(self, deltas: dict[str, int]) -> None:
+        """
+        Применяет изменения счётчиков ревьюеров одним UPDATE ... FROM unnest.
+
+        Назначения меняются только в OPEN PR, поэтому open_reviews и
+        reviews_assigned сдвигаются на одну и ту же величину. Вместе с ними
+        растёт review_version: у этих пользователей изменился список PR
+        на ревью.
+        """
+        deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        await self._session.execute(
+            _adjust_review_counters_stmt(),
+            {"user_ids": list(deltas), "deltas": list(deltas.values())},
+        )
+
+
+# Запросы горячих путей (reassign, деактивация) собираются один раз,
+# значения — в bindparam (см. app/repositories/user_repository.py).
+
+
+@cache
+def _pr_reviewers_stmt() -> Select:
+    return (
+        select(PRReviewer)
+        .where(PRReviewer.pr_id == bindparam("pr_id"))
+        .order_by(PRReviewer.id)
+        .execution_options(populate_existing=True)
+    )
+
+
+@cache
+def _lock_users_stmt() -> Select:
+    """Пользователи из параметра user_ids под FOR NO KEY UPDATE в порядке id."""
+    return (
+        select(User.id)
+        .where(User.id == _any_param("user_ids"))
+        .order_by(User.id)
+        .with_for_update(key_share=True)
+    )
+
+
+@cache
+def _lock_teams_stmt() -> Select:
+    """
+    Advisory-блокировки команд пользователей из параметра user_ids
+    (до конца транзакции) в порядке имени команды.
+    """
+    team_names = (
+        select(User.team_name)
+        .where(User.id == _any_param("user_ids"), User.team_name.is_not(None))
+        .distinct()
+        .order_by(User.team_name)
+        .subquery("team_names")
+    )
+    return select(
+        func.pg_advisory_xact_lock(
+            REPLACEMENT_LOCK_CLASS, func.hashtext(team_names.c.team_name)
+        )
+    )
+
+
+@cache
+def _lock_open_prs_by_id_stmt() -> Select:
+    """OPEN PR из параметра pr_ids под FOR NO KEY UPDATE в порядке id."""
+    return (
+        select(PullRequest.id)
+        .where(
+            PullRequest.id == _any_param("pr_ids"),
+            PullRequest.status == PRStatus.OPEN,
+        )
+        .order_by(PullRequest.id)
+        .with_for_update(key_share=True)
+    )
+
+
+@cache
+def _lock_open_prs_stmt(nowait: bool = False) -> Select:
+    """
+    OPEN PR с ревьюерами из параметра reviewer_ids под FOR NO KEY UPDATE
+    в порядке id (с `nowait` — без ожидания чужих блокировок).
+    """
+    return (
+        select(PullRequest.id)
+        .where(
+            PullRequest.status == PRStatus.OPEN,
+            select(PRReviewer.id)
+            .where(
+                PRReviewer.pr_id == PullRequest.id,
+                PRReviewer.reviewer_id == _any_param("reviewer_ids"),
+            )
+            .exists(),
+        )
+        .order_by(PullRequest.id)
+        .with_for_update(key_share=True, nowait=nowait)
+    )
+
+
+@cache
+def _lock_teammates_stmt() -> Select:
+    """
+    Пользователи из параметра user_ids и все участники их команд под
+    FOR NO KEY UPDATE в порядке id.
+    """
+    # Команды — массивом (InitPlan), чтобы обе части OR шли по индексам
+    team_names = func.array(
+        select(User.team_name)
+        .where(User.id == _any_param("user_ids"))
+        .scalar_subquery()
+    )
+    return (
+        select(User.id)
+        .where(
+            or_(User.id == _any_param("user_ids"), User.team_name == any_(team_names))
+        )
+        .order_by(User.id)
+        .with_for_update(key_share=True)
+    )
+
+
+@cache
+def _team_versions_stmt() -> Select:
+    return select(Team.name, Team.version).where(Team.name == _any_param("team_names"))
+
+
+@cache
+def _active_members_stmt() -> Select:
+    return select(User.team_name, User.id).where(
+        User.team_name == _any_param("team_names"),
+        User.is_active.is_(True),
+    )
+
+
+@cache
+def _open_reviews_stmt() -> Select:
+    return select(User.id, User.open_reviews).where(User.id == _any_param("user_ids"))
+
+
+@cache
+def _adjust_review_counters_stmt() -> Update:
+    """
+    Счётчики сдвигаются на delta, review_version растёт на 1. Параметры:
+    user_ids и deltas — поэлементно. Строки блокируются в порядке id
+    (см. _locked_users).
+    """
+    delta_values = (
+        func.unnest(
+            bindparam("user_ids", type_=ARRAY(String)),
+            bindparam("deltas", type_=ARRAY(Integer)),
+        )
+        .table_valued("user_id", "delta")
+        .render_derived(name="delta_values")
+    )
+    users = User.__table__
+    locked = _locked_users(select(delta_values.c.user_id), "locked")
+    return (
+        update(users)
+        .where(
+            users.c.id == locked.c.id,
+            users.c.id == delta_values.c.user_id,
+        )
+        .values(
+            open_reviews=users.c.open_reviews + delta_values.c.delta,
+            reviews_assigned=users.c.reviews_assigned + delta_values.c.delta,
+            review_version=users.c.review_version + 1,
+        )
+    )
+
+
+@cache
+def _team_users_stmt() -> Select:
+    return select(User.id).where(
+        User.id == _any_param("user_ids"),
+        User.team_name == bindparam("team_name"),
+    )
+
+
+@cache
+def _deactivate_users_stmt() -> Update:
+    return (
+        update(User)
+        .where(User.id == _any_param("user_ids"), User.is_active.is_(True))
+        .values(is_active=False)
+        .returning(User.id)
+    )
 
-        await self._session.commit()
 
-        return deactivated_count, reassigned_count, len(affected_pr_ids)
+@cache
+def _bump_team_version_stmt() -> Update:
+    return (
+        update(Team)
+        .where(Team.name == bindparam("team_name"))
+        .values(version=Team.version + 1)
+    )
@@ -0,0 +1,282 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import (
+    Float,
+    Row,
+    cast,
+    delete,
+    extract,
+    func,
+    insert,
+    literal,
+    literal_column,
+    null,
+    select,
+    union_all,
+)
+from sqlalchemy.dialects import postgresql as pg
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import NotFoundError
+from app.models import (
+    DailyReviewerStats,
+    DailyTeamStats,
+    PRReviewer,
+    PullRequest,
+    StatsRollupState,
+    Team,
+    User,
+)
+from app.models.pull_requests import PRStatus
+
+ROLLUP_NAME = "daily_stats"
+
+# Ключ pg_try_advisory_xact_lock: пересчёт идёт в одном процессе за раз
+ROLLUP_LOCK_KEY = 0x5EC0_0001
+
+# Запас на транзакции, начатые до прошлого пересчёта, а закоммиченные после
+ROLLUP_OVERLAP = timedelta(minutes=5)
+
+
+def _utc_day(ts):
+    # 'UTC' литералом: одинаковое выражение в SELECT и GROUP BY
+    return func.date(func.timezone(literal_column("'UTC'"), ts))
+
+
+class StatsRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def refresh_daily_stats(self) -> date | None:
+        """
+        Инкрементальный пересчёт дневных срезов.
+
+        Пересчитываются дни с момента прошлого пересчёта (с запасом
+        ROLLUP_OVERLAP) до сегодняшнего: строки этих дней удаляются и
+        собираются заново из pull_requests и pr_reviewers по индексам на
+        created_at / merged_at. Первый запуск собирает всю историю.
+
+        Назначение датируется днём создания строки pr_reviewers и
+        засчитывается её текущему ревьюеру. Если после прошлого пересчёта
+        reassign сменил ревьюера в более старой строке, окно расширяется
+        назад до дня её создания: итог совпадает с полной пересборкой.
+
+        Возвращает первый пересчитанный день; None, если пересчёт уже
+        идёт в другом процессе или PR ещё нет.
+        """
+        locked = await self._session.scalar(
+            select(func.pg_try_advisory_xact_lock(ROLLUP_LOCK_KEY))
+        )
+        if not locked:
+            await self._session.rollback()
+            return None
+
+        state = await self._session.get(StatsRollupState, ROLLUP_NAME)
+        if state is not None:
+            since = state.refreshed_at - ROLLUP_OVERLAP
+        else:
+            since = await self._session.scalar(select(func.min(PullRequest.created_at)))
+            if since is None:
+                await self._session.rollback()
+                return None
+
+        # Строки назначений, изменённые reassign'ом после прошлого пересчёта
+        reassigned_since = await self._session.scalar(
+            select(func.min(PRReviewer.created_at)).where(
+                PRReviewer.updated_at >= since
+            )
+        )
+        if reassigned_since is not None:
+            since = min(since, reassigned_since)
+
+        start_day = since.astimezone(timezone.utc).date()
+        range_start = datetime.combine(start_day, time.min, tzinfo=timezone.utc)
+
+        await self._session.execute(
+            delete(DailyTeamStats).where(DailyTeamStats.day >= start_day)
+        )
+        await self._session.execute(
+            delete(DailyReviewerStats).where(DailyReviewerStats.day >= start_day)
+        )
+        await self._session.execute(self._build_team_rollup_stmt(range_start))
+        await self._session.execute(self._build_reviewer_rollup_stmt(range_start))
+
+        stmt_state = pg_insert(StatsRollupState).values(
+            name=ROLLUP_NAME, refreshed_at=func.now()
+        )
+        stmt_state = stmt_state.on_conflict_do_update(
+            index_elements=[StatsRollupState.name],
+            set_={"refreshed_at": stmt_state.excluded.refreshed_at},
+        )
+        await self._session.execute(stmt_state)
+        await self._session.commit()
+
+        return start_day
+
+    @staticmethod
+    def _build_team_rollup_stmt(range_start: datetime):
+        """
+        INSERT срезов по командам начиная с `range_start`:
+        три части (открытые PR, смёрженные PR с перцентилями времени
+        до merge, назначения) складываются по (команда, день).
+        Команда PR — команда автора, назначения — команда ревьюера.
+        """
+        # merged_at хранится без часового пояса (now() в TimeZone сессии)
+        merged_at = cast(PullRequest.merged_at, pg.TIMESTAMP(timezone=True))
+        merged_since = func.timezone(
+            func.current_setting("TimeZone"),
+            literal(range_start, pg.TIMESTAMP(timezone=True)),
+        )
+        time_to_merge = extract("epoch", merged_at - PullRequest.created_at)
+        no_percentile = cast(null(), Float)
+        zero = literal_column("0")
+
+        created_day = _utc_day(PullRequest.created_at)
+        opened = (
+            select(
+                User.team_name.label("team_name"),
+                created_day.label("day"),
+                func.count().label("prs_opened"),
+                zero.label("prs_merged"),
+                no_percentile.label("p50"),
+                no_percentile.label("p90"),
+                zero.label("reviews_assigned"),
+            )
+            .join(User, User.id == PullRequest.author_id)
+            .where(
+                PullRequest.created_at >= range_start,
+                User.team_name.is_not(None),
+            )
+            .group_by(User.team_name, created_day)
+        )
+
+        merged_day = _utc_day(merged_at)
+        merged = (
+            select(
+                User.team_name,
+                merged_day,
+                zero,
+                func.count(),
+                func.percentile_cont(0.5).within_group(time_to_merge),
+                func.percentile_cont(0.9).within_group(time_to_merge),
+                zero,
+            )
+            .join(User, User.id == PullRequest.author_id)
+            .where(
+                PullRequest.merged_at >= merged_since,
+                PullRequest.status == PRStatus.MERGED,
+                User.team_name.is_not(None),
+            )
+            .group_by(User.team_name, merged_day)
+        )
+
+        assigned_day = _utc_day(PRReviewer.created_at)
+        assigned = (
+            select(
+                User.team_name,
+                assigned_day,
+                zero,
+                zero,
+                no_percentile,
+                no_percentile,
+                func.count(),
+            )
+            .join(User, User.id == PRReviewer.reviewer_id)
+            .where(
+                PRReviewer.created_at >= range_start,
+                User.team_name.is_not(None),
+            )
+            .group_by(User.team_name, assigned_day)
+        )
+
+        parts = union_all(opened, merged, assigned).subquery("parts")
+
+        return insert(DailyTeamStats).from_select(
+            [
+                "team_name",
+                "day",
+                "prs_opened",
+                "prs_merged",
+                "time_to_merge_p50",
+                "time_to_merge_p90",
+                "reviews_assigned",
+            ],
+            select(
+                parts.c.team_name,
+                parts.c.day,
+                func.sum(parts.c.prs_opened),
+                func.sum(parts.c.prs_merged),
+                func.max(parts.c.p50),
+                func.max(parts.c.p90),
+                func.sum(parts.c.reviews_assigned),
+            ).group_by(parts.c.team_name, parts.c.day),
+        )
+
+    @staticmethod
+    def _build_reviewer_rollup_stmt(range_start: datetime):
+        """
+        INSERT назначений по ревьюерам начиная с `range_start`. Время
+        назначения — created_at строки pr_reviewers: reassign его не
+        меняет, и назначение остаётся в своём дне за новым ревьюером.
+        """
+        assigned_day = _utc_day(PRReviewer.created_at)
+        return insert(DailyReviewerStats).from_select(
+            ["reviewer_id", "day", "team_name", "reviews_assigned"],
+            select(
+                PRReviewer.reviewer_id,
+                assigned_day,
+                User.team_name,
+                func.count(),
+            )
+            .join(User, User.id == PRReviewer.reviewer_id)
+            .where(
+                PRReviewer.created_at >= range_start,
+                User.team_name.is_not(None),
+            )
+            .group_by(PRReviewer.reviewer_id, assigned_day, User.team_name),
+        )
+
+    async def get_daily_stats(
+        self, team_name: str, since_day: date
+    ) -> tuple[list[Row], list[Row]]:
+        """
+        Срезы команды начиная с `since_day`: (по дням, по ревьюерам за день).
+        Читаются только таблицы срезов, по одной строке на день
+        (и на ревьюера в день).
+        """
+        team = await self._session.get(Team, team_name)
+        if team is None:
+            raise NotFoundError()
+
+        stmt_days = (
+            select(
+                DailyTeamStats.day,
+                DailyTeamStats.prs_opened,
+                DailyTeamStats.prs_merged,
+                DailyTeamStats.time_to_merge_p50,
+                DailyTeamStats.time_to_merge_p90,
+                DailyTeamStats.reviews_assigned,
+            )
+            .where(
+                DailyTeamStats.team_name == team_name,
+                DailyTeamStats.day >= since_day,
+            )
+            .order_by(DailyTeamStats.day)
+        )
+        stmt_reviewers = (
+            select(
+                DailyReviewerStats.day,
+                DailyReviewerStats.reviewer_id,
+                DailyReviewerStats.reviews_assigned,
+            )
+            .where(
+                DailyReviewerStats.team_name == team_name,
+                DailyReviewerStats.day >= since_day,
+            )
+            .order_by(DailyReviewerStats.day, DailyReviewerStats.reviewer_id)
+        )
+
+        days = (await self._session.execute(stmt_days)).all()
+        reviewers = (await self._session.execute(stmt_reviewers)).all()
+        return days, reviewers
@@ -1,49 +1,418 @@
-from sqlalchemy import select
+from functools import cache
+from typing import AsyncIterator, Iterable
+
+from sqlalchemy import (
+    ARRAY,
+    Boolean,
+    Column,
+    Insert,
+    Integer,
+    MetaData,
+    Row,
+    Select,
+    String,
+    Table,
+    TextClause,
+    and_,
+    any_,
+    bindparam,
+    exists,
+    func,
+    insert,
+    literal,
+    select,
+    text,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from app.core.cache import TeamRosterCache, team_roster_cache
 from app.core.exceptions import AlreadyExistsError, NotFoundError
 from app.models import Team, User
-from app.schemas import TeamWithMembers
+from app.schemas import TeamMemberField, TeamWithMembers
+
+# Staging для /team/import: временная, живёт до конца транзакции
+_import_staging = Table(
+    "team_import_staging",
+    MetaData(),
+    Column("line_no", Integer),
+    Column("team_name", String),
+    Column("user_id", String),
+    Column("username", String),
+    Column("is_active", Boolean),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+
+_MEMBER_COLUMNS = {
+    TeamMemberField.USER_ID: User.id,
+    TeamMemberField.USERNAME: User.username,
+    TeamMemberField.IS_ACTIVE: User.is_active,
+}
+
+
+class TeamMembers:
+    """
+    Команда для чтения: имя и строки участников (id, username, is_active
+    или их часть по `fields`). Повторяет атрибуты Team, нужные для
+    маппинга в схему.
+    """
+
+    __slots__ = ("name", "users")
+
+    def __init__(self, name: str, users: list[Row]) -> None:
+        self.name = name
+        self.users = users
 
 
 class TeamRepository:
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        roster_cache: TeamRosterCache = team_roster_cache,
+    ) -> None:
         self._session = session
+        self._roster_cache = roster_cache
 
-    async def create_team_with_members(self, team_in: TeamWithMembers) -> Team:
-        existing_team = await self._session.get(Team, team_in.team_name)
-        if existing_team is not None:
+    async def create_team_with_members(self, team_in: TeamWithMembers) -> TeamMembers:
+        """
+        Создаёт команду и переводит в неё участников тремя запросами
+        независимо от их числа: INSERT команды, SELECT прежних команд
+        участников по `id = ANY(...)` и пакетный upsert пользователей.
+        Участники в ответе — строки RETURNING upsert'а.
+        """
+        try:
+            inserted = await self._session.scalar(
+                _insert_team_stmt(), {"team_name": team_in.team_name}
+            )
+        except DBAPIError as exc:
+            # Команду с таким именем успели создать параллельно
+            if getattr(exc.orig, "sqlstate", None) != "23505":
+                raise
+            inserted = None
+        if inserted is None:
+            await self._session.rollback()
             raise AlreadyExistsError()
 
-        team = Team(name=team_in.team_name)
-        self._session.add(team)
-
-        for member_in in team_in.members:
-            user = await self._session.get(User, member_in.user_id)
+        # Повтор user_id в payload: побеждает последнее вхождение
+        # (ON CONFLICT DO UPDATE не может обновить строку дважды)
+        members = {member.user_id: member for member in team_in.members}
 
-            if user is None:
-                user = User(
-                    id=member_in.user_id,
-                    username=member_in.username,
-                    is_active=member_in.is_active,
-                    team_name=team_in.team_name,
+        users: list[Row] = []
+        moved_from: set[str] = set()
+        if members:
+            stmt_old_teams = (
+                select(User.team_name)
+                .where(
+                    User.id == any_(literal(list(members), ARRAY(String))),
+                    User.team_name.is_not(None),
                 )
-                self._session.add(user)
-            else:
-                user.username = member_in.username
-                user.is_active = member_in.is_active
-                user.team_name = team_in.team_name
+                .distinct()
+            )
+            moved_from = set(await self._session.scalars(stmt_old_teams))
+
+            result = await self._session.execute(
+                _upsert_members_stmt(),
+                {
+                    "team_name": team_in.team_name,
+                    "user_ids": list(members),
+                    "usernames": [member.username for member in members.values()],
+                    "is_active": [member.is_active for member in members.values()],
+                },
+            )
+            users = sorted(result.all(), key=lambda row: row.id)
+
+        # Новая команда начинает с version=0, прежние команды
+        # переведённых пользователей меняют состав
+        if moved_from:
+            await self._session.execute(
+                update(Team)
+                .where(Team.name.in_(moved_from))
+                .values(version=Team.version + 1)
+            )
 
         await self._session.commit()
+        # Upsert идёт мимо identity map: уже загруженные в сессию
+        # пользователи и команды устарели
+        self._session.expire_all()
+        self._roster_cache.invalidate(team_in.team_name, *moved_from)
+
+        return TeamMembers(team_in.team_name, users)
+
+    async def import_teams(
+        self, batches: AsyncIterator[Iterable[tuple]]
+    ) -> list[tuple[str, bool, int]]:
+        """
+        Импорт команд и участников одной транзакцией. Порции записей
+        (line_no, team_name, user_id, username, is_active) идут через COPY
+        во временную staging-таблицу по мере разбора тела запроса, затем
+        сливаются в teams и users несколькими запросами на весь импорт.
+
+        Существующие команды дополняются, существующие пользователи
+        переводятся и обновляются; при повторе user_id побеждает последняя
+        строка. Возвращает (team_name, created, members) по именам команд.
+        """
+        staging = _import_staging
+        try:
+            conn = await self._session.connection()
+            await conn.run_sync(staging.create)
+
+            raw = await conn.get_raw_connection()
+            columns = [column.name for column in staging.columns]
+            async for batch in batches:
+                await raw.driver_connection.copy_records_to_table(
+                    staging.name, records=batch, columns=columns
+                )
+            await self._session.execute(text(f"ANALYZE {staging.name}"))
+
+            latest = (
+                select(
+                    staging.c.user_id,
+                    staging.c.team_name,
+                    staging.c.username,
+                    staging.c.is_active,
+                )
+                .where(staging.c.user_id.is_not(None))
+                .distinct(staging.c.user_id)
+                .order_by(staging.c.user_id, staging.c.line_no.desc())
+                .subquery("latest")
+            )
+
+            team_names = select(staging.c.team_name).distinct().subquery("names")
+            member_counts = (
+                select(latest.c.team_name, func.count().label("members"))
+                .group_by(latest.c.team_name)
+                .subquery("counts")
+            )
+            stmt_teams = (
+                select(
+                    team_names.c.team_name,
+                    func.coalesce(member_counts.c.members, 0).label("members"),
+                )
+                .outerjoin(
+                    member_counts, member_counts.c.team_name == team_names.c.team_name
+                )
+                .order_by(team_names.c.team_name)
+            )
+            teams = (await self._session.execute(stmt_teams)).all()
+
+            teams_table = Team.__table__
+            stmt_new_teams = (
+                pg_insert(teams_table)
+                .from_select(["name"], select(team_names.c.team_name))
+                .on_conflict_do_nothing(index_elements=[teams_table.c.name])
+                .returning(teams_table.c.name)
+            )
+            created = set(await self._session.scalars(stmt_new_teams))
+
+            stmt_moved_from = (
+                select(User.team_name)
+                .join(latest, latest.c.user_id == User.id)
+                .where(
+                    User.team_name.is_not(None),
+                    User.team_name != latest.c.team_name,
+                )
+                .distinct()
+            )
+            moved_from = set(await self._session.scalars(stmt_moved_from))
+
+            users_table = User.__table__
+            stmt_upsert = pg_insert(users_table).from_select(
+                ["id", "team_name", "username", "is_active"], select(latest)
+            )
+            stmt_upsert = stmt_upsert.on_conflict_do_update(
+                index_elements=[users_table.c.id],
+                set_={
+                    "username": stmt_upsert.excluded.username,
+                    "is_active": stmt_upsert.excluded.is_active,
+                    "team_name": stmt_upsert.excluded.team_name,
+                    "updated_at": func.now(),
+                },
+            )
+            await self._session.execute(stmt_upsert)
+
+            # Состав меняется у дополненных команд и у прежних команд
+            # переведённых пользователей; новые начинают с version=0
+            changed = ({row.team_name for row in teams} - created) | moved_from
+            if changed:
+                await self._session.execute(
+                    update(Team)
+                    .where(Team.name == any_(literal(list(changed), ARRAY(String))))
+                    .values(version=Team.version + 1)
+                )
 
-        return team
+            await self._session.commit()
+        except Exception:
+            await self._session.rollback()
+            raise
 
-    async def get_team_with_members(self, team_name: str) -> Team:
-        stmt = (
-            select(Team).where(Team.name == team_name).options(selectinload(Team.users))
+        self._session.expire_all()
+        self._roster_cache.invalidate(*changed)
+
+        return [(row.team_name, row.team_name in created, row.members) for row in teams]
+
+    async def get_team_with_members(
+        self,
+        team_name: str,
+        active_only: bool = False,
+        limit: int | None = None,
+        after_user_id: str | None = None,
+        fields: Iterable[TeamMemberField] | None = None,
+    ) -> TeamMembers:
+        """
+        Команда и её участники одним запросом по колонкам, без сущностей:
+        teams LEFT JOIN LATERAL (участники) даёт хотя бы одну строку, если
+        команда есть, — пустая страница не выглядит как отсутствующая команда.
+
+        Страница — участники с id > `after_user_id` по возрастанию id;
+        фильтр, порядок и LIMIT стоят внутри LATERAL, поэтому страница
+        читается диапазоном ix_users_team_name_id, без сортировки всей
+        команды. `fields` ограничивает колонки (id читается всегда —
+        по нему курсор).
+        """
+        requested = set(fields or _MEMBER_COLUMNS)
+        stmt = _team_members_stmt(
+            # Порядок колонок не важен (строки читаются по имени), поэтому
+            # одинаковые наборы полей делят один вариант запроса
+            columns=tuple(field for field in _MEMBER_COLUMNS if field in requested),
+            active_only=active_only,
+            after=after_user_id is not None,
+            paged=limit is not None,
+        )
+        params = {
+            "team_name": team_name,
+            "after_user_id": after_user_id,
+            "limit": limit,
+        }
+        rows = (await self._session.execute(stmt, params)).all()
+        if not rows:
+            raise NotFoundError()
+
+        return TeamMembers(team_name, [row for row in rows if row.id is not None])
+
+    async def count_team_members(
+        self, team_name: str, active_only: bool = False
+    ) -> int:
+        """Число участников без чтения строк: index-only scan по команде."""
+        count = await self._session.scalar(
+            _count_team_members_stmt(active_only), {"team_name": team_name}
         )
-        team = await self._session.scalar(stmt)
-        if team is None:
+        if count is None:
             raise NotFoundError()
-        return team
+        return count
+
+    async def get_team_version(self, team_name: str) -> int | None:
+        """Версия состава команды (None — команды нет), один поиск по PK."""
+        return await self._session.scalar(
+            _team_version_stmt(), {"team_name": team_name}
+        )
+
+
+# Запросы чтения команды собираются один раз на вариант, значения — в
+# bindparam (см. app/repositories/user_repository.py).
+
+
+@cache
+def _team_members_stmt(
+    columns: tuple[TeamMemberField, ...], active_only: bool, after: bool, paged: bool
+) -> Select:
+    """teams LEFT JOIN LATERAL (страница участников), см. get_team_with_members."""
+    members = select(
+        User.id,
+        *(
+            _MEMBER_COLUMNS[field]
+            for field in columns
+            if field != TeamMemberField.USER_ID
+        ),
+    ).where(User.team_name == Team.name)
+    if active_only:
+        members = members.where(User.is_active.is_(True))
+    if after:
+        members = members.where(User.id > bindparam("after_user_id"))
+    members = members.order_by(User.id)
+    if paged:
+        members = members.limit(bindparam("limit"))
+    members = members.lateral("members")
+
+    return (
+        select(Team.name, members)
+        .outerjoin(members, true())
+        .where(Team.name == bindparam("team_name"))
+        .order_by(members.c.id)
+    )
+
+
+@cache
+def _insert_team_stmt() -> Insert:
+    """
+    INSERT команды, если её ещё нет. Обычный INSERT ... SELECT
+    (в отличие от ON CONFLICT) попадает в кэш скомпилированных запросов.
+    """
+    teams = Team.__table__
+    team_name = bindparam("team_name", type_=String)
+    return (
+        insert(teams)
+        .from_select(
+            [teams.c.name],
+            select(team_name).where(~exists().where(teams.c.name == team_name)),
+        )
+        .returning(teams.c.name)
+    )
+
+
+@cache
+def _upsert_members_stmt() -> TextClause:
+    """
+    Upsert участников команды одним запросом по массивам-параметрам.
+    ON CONFLICT в Core-конструкции не кэшируется, поэтому запрос —
+    text(), собранный один раз.
+    """
+    return (
+        text(
+            """
+            INSERT INTO users (id, username, is_active, team_name)
+            SELECT m.id, m.username, m.is_active, :team_name
+            FROM unnest(:user_ids, :usernames, :is_active)
+                AS m(id, username, is_active)
+            ON CONFLICT (id) DO UPDATE SET
+                username = excluded.username,
+                is_active = excluded.is_active,
+                team_name = excluded.team_name,
+                updated_at = now()
+            RETURNING users.id, users.username, users.is_active
+            """
+        )
+        .bindparams(
+            bindparam("team_name", type_=String),
+            bindparam("user_ids", type_=ARRAY(String)),
+            bindparam("usernames", type_=ARRAY(String)),
+            bindparam("is_active", type_=ARRAY(Boolean)),
+        )
+        .columns(
+            User.__table__.c.id, User.__table__.c.username, User.__table__.c.is_active
+        )
+    )
+
+
+@cache
+def _count_team_members_stmt(active_only: bool) -> Select:
+    join_on = [User.team_name == Team.name]
+    if active_only:
+        join_on.append(User.is_active.is_(True))
+
+    return (
+        select(func.count(User.id))
+        .select_from(Team)
+        .outerjoin(User, and_(*join_on))
+        .where(Team.name == bindparam("team_name"))
+        .group_by(Team.name)
+    )
+
+
+@cache
+def _team_version_stmt() -> Select:
+    return select(Team.version).where(Team.name == bindparam("team_name"))
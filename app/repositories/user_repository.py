@@ -1,47 +1,201 @@
-from typing import Type
+from functools import cache
+from typing import AsyncIterator
 
-from sqlalchemy import func, select
+from sqlalchemy import Row, Select, bindparam, func, select, true, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import TeamRosterCache, team_roster_cache
 from app.core.exceptions import NotFoundError
-from app.models import PRReviewer, PullRequest, User
+from app.models import PRReviewer, PullRequest, Team, User
+from app.models.pull_requests import PRStatus
 
 
 class UserRepository:
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        roster_cache: TeamRosterCache = team_roster_cache,
+    ) -> None:
         self._session = session
+        self._roster_cache = roster_cache
 
-    async def set_is_active(self, user_id: str, is_active: bool) -> Type[User]:
-        user = await self._session.get(User, user_id)
+    async def set_is_active(self, user_id: str, is_active: bool) -> Row:
+        """
+        Меняет is_active одним запросом и возвращает строку
+        (id, username, team_name, is_active) из RETURNING.
+
+        Прежнее значение берётся из той же строки под FOR UPDATE; версия
+        команды растёт, только если значение действительно изменилось.
+        """
+        user = (
+            await self._session.execute(
+                _set_is_active_stmt(), {"user_id": user_id, "active": is_active}
+            )
+        ).one_or_none()
         if user is None:
+            await self._session.rollback()
             raise NotFoundError()
 
-        user.is_active = is_active
-
         await self._session.commit()
-        await self._session.refresh(user)
+        # UPDATE идёт мимо identity map: загруженный ранее User устарел
+        self._session.expire_all()
+        if user.changed:
+            self._roster_cache.invalidate(user.team_name)
 
         return user
 
-    async def get_user_review_pull_requests(self, user_id: str) -> list[PullRequest]:
-        user = await self._session.get(User, user_id)
-        if user is None:
-            raise NotFoundError()
+    async def get_user_review_pull_requests(
+        self,
+        user_id: str,
+        status: PRStatus | None = None,
+        limit: int | None = None,
+        after_pr_id: str | None = None,
+    ) -> list[Row]:
+        """
+        PR, где пользователь назначен ревьюером, по возрастанию id PR.
+        Постраничное чтение — по ключу: `after_pr_id` это id последнего
+        PR предыдущей страницы.
+
+        Только чтение: возвращаются строки (id, title, author_id, status),
+        а не сущности PullRequest — без identity map и инструментирования.
 
-        stmt = (
-            select(PullRequest)
-            .join(PRReviewer, PRReviewer.pr_id == PullRequest.id)
-            .where(PRReviewer.reviewer_id == user_id)
+        Существование пользователя проверяется тем же запросом:
+        users LEFT JOIN LATERAL (PR пользователя) даёт хотя бы одну
+        строку, если пользователь есть.
+        """
+        stmt = _review_pull_requests_stmt(
+            by_status=status is not None,
+            after=after_pr_id is not None,
+            paged=limit is not None,
         )
+        params = {
+            "user_id": user_id,
+            "status": status,
+            "after_pr_id": after_pr_id,
+            "limit": limit,
+        }
+        rows = (await self._session.execute(stmt, params)).all()
+        if not rows:
+            raise NotFoundError()
+
+        # Пользователь без PR даёт одну строку из NULL
+        return [row for row in rows if row.id is not None]
 
-        result = await self._session.scalars(stmt)
-        return list(result)
+    async def get_review_version(self, user_id: str) -> int | None:
+        """Версия списка PR на ревью (None — пользователя нет), один поиск по PK."""
+        return await self._session.scalar(_review_version_stmt(), {"user_id": user_id})
 
     async def get_review_stats_by_user(self) -> list[tuple[str, int]]:
-        stmt = select(
-            PRReviewer.reviewer_id,
-            func.count(PRReviewer.pr_id),
-        ).group_by(PRReviewer.reviewer_id)
+        result = await self._session.execute(self._review_stats_stmt())
+        return list(result.tuples())
+
+    async def iter_review_stats_by_user(
+        self, chunk_size: int
+    ) -> AsyncIterator[list[tuple[str, int]]]:
+        """
+        То же порциями по `chunk_size` строк через серверный курсор:
+        в памяти одновременно только одна порция.
+        """
+        stmt = self._review_stats_stmt().execution_options(yield_per=chunk_size)
+        result = await self._session.stream(stmt)
+        async for rows in result.tuples().partitions():
+            yield rows
+
+    @staticmethod
+    def _review_stats_stmt() -> Select:
+        """
+        Число назначений по ревьюерам из счётчика users.reviews_assigned,
+        без GROUP BY по pr_reviewers. Пользователи без назначений не попадают.
+        """
+        return select(User.id, User.reviews_assigned).where(User.reviews_assigned > 0)
+
+
+# Запросы горячих путей собираются один раз (на вариант) со значениями в
+# bindparam: в запросе не тратится время на построение конструкции и её
+# ключ кэша компиляции — ключ запоминается в самом объекте.
+
+
+@cache
+def _set_is_active_stmt() -> Select:
+    """
+    target  -- строка пользователя под FOR UPDATE (прежнее значение);
+    updated -- UPDATE is_active с признаком, изменилось ли оно;
+    bumped  -- версия команды растёт, только если изменилось.
+    """
+    active = bindparam("active", type_=User.is_active.type)
+    target = (
+        select(User.id, User.is_active)
+        .where(User.id == bindparam("user_id"))
+        .with_for_update()
+        .cte("target")
+    )
+    updated = (
+        update(User)
+        .where(User.id == target.c.id)
+        .values(is_active=active)
+        .returning(
+            User.id,
+            User.username,
+            User.team_name,
+            User.is_active,
+            (target.c.is_active != active).label("changed"),
+        )
+        .cte("updated")
+    )
+    bumped = (
+        update(Team)
+        .where(Team.name == updated.c.team_name, updated.c.changed)
+        .values(version=Team.version + 1)
+        .returning(Team.name)
+        .cte("bumped")
+    )
+    return select(
+        updated.c.id,
+        updated.c.username,
+        updated.c.team_name,
+        updated.c.is_active,
+        updated.c.changed,
+        # bumped нужно сослать, иначе SQLAlchemy не выведет его в WITH
+        select(func.count()).select_from(bumped).scalar_subquery().label("bumped"),
+    )
+
+
+@cache
+def _review_pull_requests_stmt(by_status: bool, after: bool, paged: bool) -> Select:
+    """
+    users LEFT JOIN LATERAL (PR на ревью у пользователя). Фильтр по
+    статусу, курсор и LIMIT — отдельные варианты запроса, а не
+    `:param IS NULL OR ...`, чтобы у каждого был свой точный план.
+    """
+    prs = (
+        select(
+            PullRequest.id,
+            PullRequest.title,
+            PullRequest.author_id,
+            PullRequest.status,
+        )
+        .join(PRReviewer, PRReviewer.pr_id == PullRequest.id)
+        .where(PRReviewer.reviewer_id == User.id)
+        .order_by(PRReviewer.pr_id)
+    )
+    if by_status:
+        prs = prs.where(PullRequest.status == bindparam("status"))
+    if after:
+        prs = prs.where(PRReviewer.pr_id > bindparam("after_pr_id"))
+    if paged:
+        prs = prs.limit(bindparam("limit"))
+
+    prs = prs.lateral("prs")
+
+    return (
+        select(prs.c.id, prs.c.title, prs.c.author_id, prs.c.status)
+        .select_from(User)
+        .outerjoin(prs, true())
+        .where(User.id == bindparam("user_id"))
+        .order_by(prs.c.id)
+    )
+
 
-        result = await self._session.execute(stmt)
-        return [(row[0], row[1]) for row in result.all()]
+@cache
+def _review_version_stmt() -> Select:
+    return select(User.review_version).where(User.id == bindparam("user_id"))
@@ -1,6 +1,14 @@
+from app.schemas.metrics_shema import CompiledCacheMetrics, DbMetrics
 from app.schemas.pull_request_shema import (
+    DeactivationJobInfo,
+    PullRequestBatchCreatePayload,
+    PullRequestBatchCreateResult,
+    PullRequestBatchItemResult,
+    PullRequestBatchItemStatus,
     PullRequestCreatePayload,
     PullRequestFull,
+    PullRequestMergeBatchPayload,
+    PullRequestMergeBatchResult,
     PullRequestMergePayload,
     PullRequestReassignPayload,
     PullRequestReassignResponse,
@@ -9,10 +17,25 @@ from app.schemas.pull_request_shema import (
     TeamBulkDeactivatePayload,
     TeamBulkDeactivateResult,
 )
-from app.schemas.team_shema import TeamMember, TeamWithMembers, TeamWithMembersGen
+from app.schemas.stats_shema import DailyReviewerStat, DailyStats, DailyTeamStat
+from app.schemas.team_shema import (
+    TeamImportRejectedRow,
+    TeamImportResult,
+    TeamImportTeamResult,
+    TeamMember,
+    TeamMemberField,
+    TeamMemberView,
+    TeamView,
+    TeamWithMembers,
+    TeamWithMembersGen,
+)
 from app.schemas.user_shema import (
     PRReviewStat,
     ReviewStats,
+    SetIsActiveBatchItemResult,
+    SetIsActiveBatchItemStatus,
+    SetIsActiveBatchRequest,
+    SetIsActiveBatchResult,
     SetIsActiveRequest,
     UserFull,
     UserGen,
@@ -21,12 +44,24 @@ from app.schemas.user_shema import (
 )
 
 __all__ = [
+    "CompiledCacheMetrics",
+    "DbMetrics",
     "TeamWithMembersGen",
     "TeamWithMembers",
     "TeamMember",
+    "TeamMemberField",
+    "TeamMemberView",
+    "TeamView",
+    "TeamImportTeamResult",
+    "TeamImportRejectedRow",
+    "TeamImportResult",
     "UserFull",
     "UserGen",
     "SetIsActiveRequest",
+    "SetIsActiveBatchRequest",
+    "SetIsActiveBatchItemStatus",
+    "SetIsActiveBatchItemResult",
+    "SetIsActiveBatchResult",
     "PullRequestShort",
     "UserReviewPRs",
     "UserReviewStat",
@@ -34,10 +69,20 @@ __all__ = [
     "ReviewStats",
     "PullRequestFull",
     "PullRequestCreatePayload",
+    "PullRequestBatchCreatePayload",
+    "PullRequestBatchCreateResult",
+    "PullRequestBatchItemResult",
+    "PullRequestBatchItemStatus",
     "PullRequestMergePayload",
+    "PullRequestMergeBatchPayload",
+    "PullRequestMergeBatchResult",
     "PullRequestReassignPayload",
     "PullRequestResponse",
     "PullRequestReassignResponse",
     "TeamBulkDeactivatePayload",
     "TeamBulkDeactivateResult",
+    "DeactivationJobInfo",
+    "DailyTeamStat",
+    "DailyReviewerStat",
+    "DailyStats",
 ]
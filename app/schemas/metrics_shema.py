@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+
+class CompiledCacheMetrics(BaseModel):
+    hits: int
+    misses: int
+    # Запросы без ключа кэша: exec_driver_sql, DDL
+    uncached: int
+    # hits / (hits + misses + uncached); None — запросов ещё не было
+    hit_rate: float | None
+
+
+class DbMetrics(BaseModel):
+    compiled_cache: CompiledCacheMetrics
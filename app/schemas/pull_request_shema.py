@@ -1,7 +1,10 @@
 from datetime import datetime
+from enum import Enum
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
+from app.core.config import settings
+from app.models.deactivation_jobs import JobStatus
 from app.models.pull_requests import PRStatus
 
 
@@ -28,10 +31,44 @@ class PullRequestCreatePayload(BaseModel):
     author_id: str
 
 
+class PullRequestBatchCreatePayload(BaseModel):
+    items: list[PullRequestCreatePayload] = Field(
+        min_length=1, max_length=settings.BATCH_MAX_ITEMS
+    )
+
+
+class PullRequestBatchItemStatus(str, Enum):
+    CREATED = "CREATED"
+    PR_EXISTS = "PR_EXISTS"
+    NOT_FOUND = "NOT_FOUND"
+
+
+class PullRequestBatchItemResult(BaseModel):
+    pull_request_id: str
+    status: PullRequestBatchItemStatus
+    pr: PullRequestFull | None = None
+
+
+class PullRequestBatchCreateResult(BaseModel):
+    results: list[PullRequestBatchItemResult]
+
+
 class PullRequestMergePayload(BaseModel):
     pull_request_id: str
 
 
+class PullRequestMergeBatchPayload(BaseModel):
+    pull_request_ids: list[str] = Field(
+        min_length=1, max_length=settings.BATCH_MAX_ITEMS
+    )
+
+
+class PullRequestMergeBatchResult(BaseModel):
+    merged: list[PullRequestFull]
+    already_merged: list[PullRequestFull]
+    not_found: list[str]
+
+
 class PullRequestReassignPayload(BaseModel):
     pull_request_id: str
     old_user_id: str
@@ -56,3 +93,17 @@ class TeamBulkDeactivateResult(BaseModel):
     deactivated_users: int
     reassigned_reviewers: int
     affected_pull_requests: int
+
+
+class DeactivationJobInfo(BaseModel):
+    job_id: str
+    team_name: str
+    status: JobStatus
+    chunk_size: int
+    deactivated_users: int
+    prs_scanned: int
+    reassigned_reviewers: int
+    removed_reviewers: int
+    error: str | None = None
+    # Итог появляется, когда задание завершено (status=DONE)
+    result: TeamBulkDeactivateResult | None = None
@@ -0,0 +1,25 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class DailyTeamStat(BaseModel):
+    day: date
+    prs_opened: int
+    prs_merged: int
+    # Перцентили времени до merge (сек); None — в этот день merge не было
+    time_to_merge_p50_seconds: float | None
+    time_to_merge_p90_seconds: float | None
+    reviews_assigned: int
+
+
+class DailyReviewerStat(BaseModel):
+    day: date
+    user_id: str
+    reviews_assigned: int
+
+
+class DailyStats(BaseModel):
+    team_name: str
+    days: list[DailyTeamStat]
+    reviewers: list[DailyReviewerStat]
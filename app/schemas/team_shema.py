@@ -1,3 +1,5 @@
+from enum import Enum
+
 from pydantic import BaseModel
 
 
@@ -14,3 +16,48 @@ class TeamWithMembers(BaseModel):
 
 class TeamWithMembersGen(BaseModel):
     team: TeamWithMembers
+
+
+class TeamMemberField(str, Enum):
+    USER_ID = "user_id"
+    USERNAME = "username"
+    IS_ACTIVE = "is_active"
+
+
+class TeamMemberView(BaseModel):
+    # Поля, не запрошенные в `fields`, не попадают в ответ
+    user_id: str | None = None
+    username: str | None = None
+    is_active: bool | None = None
+
+
+class TeamView(BaseModel):
+    """
+    Ответ /team/get. Без параметров совпадает с TeamWithMembers;
+    `member_count` — только в режиме summary, `next_cursor` — при `limit`.
+    """
+
+    team_name: str
+    members: list[TeamMemberView] | None = None
+    member_count: int | None = None
+    next_cursor: str | None = None
+
+
+class TeamImportTeamResult(BaseModel):
+    team_name: str
+    # False — команда уже была и дополнена
+    created: bool
+    members: int
+
+
+class TeamImportRejectedRow(BaseModel):
+    line: int
+    error: str
+
+
+class TeamImportResult(BaseModel):
+    teams: list[TeamImportTeamResult]
+    users_imported: int
+    rejected_total: int
+    # Первые TEAM_IMPORT_MAX_REJECTED отклонённых строк
+    rejected: list[TeamImportRejectedRow]
@@ -1,5 +1,8 @@
-from pydantic import BaseModel
+from enum import Enum
 
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
 from app.schemas.pull_request_shema import PRReviewStat, PullRequestShort
 
 
@@ -19,9 +22,39 @@ class SetIsActiveRequest(BaseModel):
     is_active: bool
 
 
+class SetIsActiveBatchRequest(BaseModel):
+    items: list[SetIsActiveRequest] = Field(
+        min_length=1, max_length=settings.BATCH_MAX_ITEMS
+    )
+    # Переназначить открытые ревью деактивированных в этом пакете
+    reassign_open_reviews: bool = False
+
+
+class SetIsActiveBatchItemStatus(str, Enum):
+    UPDATED = "UPDATED"
+    UNCHANGED = "UNCHANGED"
+    NOT_FOUND = "NOT_FOUND"
+
+
+class SetIsActiveBatchItemResult(BaseModel):
+    user_id: str
+    status: SetIsActiveBatchItemStatus
+    user: UserFull | None = None
+    # Открытые ревью пользователя: переданы другому ревьюеру / сняты,
+    # потому что заменить некем
+    reassigned_reviews: int = 0
+    removed_reviews: int = 0
+
+
+class SetIsActiveBatchResult(BaseModel):
+    results: list[SetIsActiveBatchItemResult]
+
+
 class UserReviewPRs(BaseModel):
     user_id: str
     pull_requests: list[PullRequestShort]
+    # id последнего PR страницы; None — страниц больше нет
+    next_cursor: str | None = None
 
 
 class UserReviewStat(BaseModel):
@@ -1,4 +1,5 @@
 from app.services.pull_request_service import PullRequestService
+from app.services.stats_service import StatsService
 from app.services.team_service import TeamService
 from app.services.user_service import UserService
 
@@ -6,4 +7,5 @@ __all__ = [
     "TeamService",
     "UserService",
     "PullRequestService",
+    "StatsService",
 ]
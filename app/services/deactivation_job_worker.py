@@ -0,0 +1,114 @@
+import asyncio
+import logging
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import AssignmentStrategy, settings
+from app.core.db.connect import async_session
+from app.models.deactivation_jobs import JobStatus
+from app.repositories import PullRequestRepository
+from app.repositories.pull_request_repository import is_retryable_error
+
+logger = logging.getLogger("app.jobs")
+
+
+class DeactivationJobWorker:
+    """
+    Фоновая обработка заданий массовой деактивации.
+
+    Каждая порция обрабатывается в своей сессии и коммитится вместе
+    с прогрессом, поэтому после рестарта воркер просто подбирает
+    незавершённые задания из БД. Несколько процессов могут работать
+    одновременно: порцию задания берёт тот, кто первым заблокировал
+    его строку.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = async_session,
+        poll_interval: float = settings.DEACTIVATION_JOB_POLL_INTERVAL,
+        assignment_strategy: AssignmentStrategy = settings.REVIEWER_ASSIGNMENT_STRATEGY,
+    ) -> None:
+        self._session_factory = session_factory
+        self._poll_interval = poll_interval
+        self._assignment_strategy = assignment_strategy
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def wake(self) -> None:
+        """Не ждать следующего опроса: появилось новое задание."""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                await self.run_pending()
+            except Exception:
+                logger.exception("deactivation jobs: polling failed")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_pending(self) -> None:
+        async with self._session_factory() as session:
+            repo = PullRequestRepository(session)
+            job_ids = await repo.get_unfinished_deactivation_job_ids()
+
+        for job_id in job_ids:
+            await self.run_job(job_id)
+
+    async def run_job(self, job_id: str) -> None:
+        """
+        Обрабатывает задание порциями до конца. Если задание занято
+        другим воркером или упало на временной ошибке БД, оно остаётся
+        незавершённым и будет подобрано при следующем опросе. Любая
+        другая ошибка помечает задание FAILED, чтобы оно не блокировало
+        задания в очереди за ним.
+        """
+        while True:
+            async with self._session_factory() as session:
+                repo = PullRequestRepository(
+                    session,
+                    assignment_strategy=self._assignment_strategy,
+                )
+                try:
+                    job = await repo.run_deactivation_job_chunk(job_id)
+                except DBAPIError as exc:
+                    await session.rollback()
+                    if is_retryable_error(exc):
+                        logger.warning("deactivation job %s: retry later", job_id)
+                        return
+
+                    logger.exception("deactivation job %s failed", job_id)
+                    await repo.fail_deactivation_job(job_id, str(exc.orig))
+                    return
+                except Exception as exc:
+                    await session.rollback()
+                    logger.exception("deactivation job %s failed", job_id)
+                    await repo.fail_deactivation_job(job_id, repr(exc))
+                    return
+
+            if job is None or job.status == JobStatus.DONE:
+                return
+
+
+deactivation_job_worker = DeactivationJobWorker()
@@ -1,8 +1,15 @@
-from app.models import PullRequest
+from app.models import DeactivationJob, PullRequest
+from app.models.deactivation_jobs import JobStatus
 from app.repositories import PullRequestRepository
 from app.schemas import (
+    DeactivationJobInfo,
+    PullRequestBatchCreatePayload,
+    PullRequestBatchCreateResult,
+    PullRequestBatchItemResult,
     PullRequestCreatePayload,
     PullRequestFull,
+    PullRequestMergeBatchPayload,
+    PullRequestMergeBatchResult,
     PullRequestMergePayload,
     PullRequestReassignPayload,
     TeamBulkDeactivatePayload,
@@ -25,6 +32,30 @@ class PullRequestService:
             mergedAt=pr.merged_at,
         )
 
+    @staticmethod
+    def _map_job_model(job: DeactivationJob) -> DeactivationJobInfo:
+        result = None
+        if job.status == JobStatus.DONE:
+            result = TeamBulkDeactivateResult(
+                team_name=job.team_name,
+                deactivated_users=job.deactivated_users,
+                reassigned_reviewers=job.reassigned_reviewers,
+                affected_pull_requests=job.affected_pull_requests,
+            )
+
+        return DeactivationJobInfo(
+            job_id=job.id,
+            team_name=job.team_name,
+            status=job.status,
+            chunk_size=job.chunk_size,
+            deactivated_users=job.deactivated_users,
+            prs_scanned=job.prs_scanned,
+            reassigned_reviewers=job.reassigned_reviewers,
+            removed_reviewers=job.removed_reviewers,
+            error=job.error,
+            result=result,
+        )
+
     async def create_pull_request(
         self,
         payload: PullRequestCreatePayload,
@@ -36,6 +67,22 @@ class PullRequestService:
         )
         return self._map_pr_model(pr)
 
+    async def create_pull_requests_batch(
+        self,
+        payload: PullRequestBatchCreatePayload,
+    ) -> PullRequestBatchCreateResult:
+        results = await self._repo.create_pull_requests_batch(payload.items)
+        return PullRequestBatchCreateResult(
+            results=[
+                PullRequestBatchItemResult(
+                    pull_request_id=item.pull_request_id,
+                    status=status,
+                    pr=self._map_pr_model(pr) if pr is not None else None,
+                )
+                for item, (status, pr) in zip(payload.items, results)
+            ]
+        )
+
     async def merge_pull_request(
         self,
         payload: PullRequestMergePayload,
@@ -43,6 +90,19 @@ class PullRequestService:
         pr = await self._repo.merge_pull_request(payload.pull_request_id)
         return self._map_pr_model(pr)
 
+    async def merge_pull_requests_batch(
+        self,
+        payload: PullRequestMergeBatchPayload,
+    ) -> PullRequestMergeBatchResult:
+        merged, already_merged, not_found = await self._repo.merge_pull_requests_batch(
+            payload.pull_request_ids
+        )
+        return PullRequestMergeBatchResult(
+            merged=[self._map_pr_model(pr) for pr in merged],
+            already_merged=[self._map_pr_model(pr) for pr in already_merged],
+            not_found=not_found,
+        )
+
     async def reassign_reviewer(
         self,
         payload: PullRequestReassignPayload,
@@ -69,3 +129,19 @@ class PullRequestService:
             reassigned_reviewers=reassigned,
             affected_pull_requests=affected_prs,
         )
+
+    async def start_bulk_deactivation_job(
+        self,
+        payload: TeamBulkDeactivatePayload,
+        chunk_size: int,
+    ) -> DeactivationJobInfo:
+        job = await self._repo.create_deactivation_job(
+            team_name=payload.team_name,
+            user_ids=payload.user_ids,
+            chunk_size=chunk_size,
+        )
+        return self._map_job_model(job)
+
+    async def get_deactivation_job(self, job_id: str) -> DeactivationJobInfo:
+        job = await self._repo.get_deactivation_job(job_id)
+        return self._map_job_model(job)
@@ -0,0 +1,64 @@
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.db.connect import async_session
+from app.repositories import StatsRepository
+
+logger = logging.getLogger("app.stats")
+
+
+class StatsRollupTask:
+    """
+    Периодический пересчёт дневных срезов статистики.
+
+    Каждый запуск досчитывает только дни с прошлого пересчёта, поэтому
+    стоимость не зависит от длины истории. Несколько процессов могут
+    работать одновременно: пересчёт берёт тот, кто первым получил
+    advisory-блокировку, остальные пропускают запуск.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = async_session,
+        interval: float = settings.STATS_ROLLUP_INTERVAL,
+    ) -> None:
+        self._session_factory = session_factory
+        self._interval = interval
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("daily stats: rollup failed")
+
+            await asyncio.sleep(self._interval)
+
+    async def run_once(self) -> None:
+        async with self._session_factory() as session:
+            start_day = await StatsRepository(session).refresh_daily_stats()
+
+        if start_day is not None:
+            logger.info("daily stats: refreshed since %s", start_day)
+
+
+stats_rollup_task = StatsRollupTask()
@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta, timezone
+
+from app.repositories import StatsRepository
+from app.schemas import DailyReviewerStat, DailyStats, DailyTeamStat
+
+
+class StatsService:
+    def __init__(self, repo: StatsRepository) -> None:
+        self._repo = repo
+
+    async def get_daily_stats(self, team_name: str, days: int) -> DailyStats:
+        """Срезы команды за последние `days` дней (UTC), включая сегодня."""
+        since_day = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+        day_rows, reviewer_rows = await self._repo.get_daily_stats(team_name, since_day)
+        return DailyStats(
+            team_name=team_name,
+            days=[
+                DailyTeamStat(
+                    day=row.day,
+                    prs_opened=row.prs_opened,
+                    prs_merged=row.prs_merged,
+                    time_to_merge_p50_seconds=row.time_to_merge_p50,
+                    time_to_merge_p90_seconds=row.time_to_merge_p90,
+                    reviews_assigned=row.reviews_assigned,
+                )
+                for row in day_rows
+            ],
+            reviewers=[
+                DailyReviewerStat(
+                    day=row.day,
+                    user_id=row.reviewer_id,
+                    reviews_assigned=row.reviews_assigned,
+                )
+                for row in reviewer_rows
+            ],
+        )
@@ -0,0 +1,215 @@
+"""
+Разбор тела POST /team/import: NDJSON или CSV, построчно из потока.
+
+Каждая строка превращается в записи для COPY в staging-таблицу:
+(line_no, team_name, user_id, username, is_active). Запись с
+user_id = None только создаёт команду.
+
+NDJSON — объект на строку, одного из видов:
+
+    {"team_name": "backend", "user_id": "u1", "username": "Alice", "is_active": true}
+    {"team_name": "backend", "members": [{"user_id": ..., ...}, ...]}
+    {"team_name": "backend"}
+
+CSV — первая строка заголовок с колонками team_name, user_id, username,
+is_active (порядок любой); пустой user_id — строка только с командой.
+Поля с переводом строки внутри кавычек не поддерживаются.
+"""
+
+import csv
+import json
+from enum import Enum
+from typing import AsyncIterator
+
+from app.core.exceptions import InvalidImportError
+
+# Длиннее — строка отклоняется, а не копится в памяти
+MAX_LINE_BYTES = 1 << 20
+
+USERNAME_MAX_LENGTH = 100
+
+CSV_COLUMNS = ("team_name", "user_id", "username", "is_active")
+
+_CSV_BOOLEANS = {
+    "true": True,
+    "1": True,
+    "yes": True,
+    "false": False,
+    "0": False,
+    "no": False,
+}
+
+ImportRecord = tuple[int, str, str | None, str | None, bool | None]
+
+
+class ImportFormat(str, Enum):
+    NDJSON = "application/x-ndjson"
+    CSV = "text/csv"
+
+    @classmethod
+    def from_content_type(cls, content_type: str | None) -> "ImportFormat | None":
+        media_type = (content_type or "").split(";")[0].strip().lower()
+        for fmt in cls:
+            if fmt.value == media_type:
+                return fmt
+        return None
+
+
+class RejectedRows:
+    """Отклонённые строки: общее число и первые `limit` с причиной."""
+
+    __slots__ = ("total", "rows", "_limit")
+
+    def __init__(self, limit: int) -> None:
+        self.total = 0
+        self.rows: list[tuple[int, str]] = []
+        self._limit = limit
+
+    def add(self, line_no: int, error: str) -> None:
+        self.total += 1
+        if len(self.rows) < self._limit:
+            self.rows.append((line_no, error))
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[tuple[int, bytes | None]]:
+    """
+    Строки тела по мере прихода кусков. Вместо строки длиннее
+    MAX_LINE_BYTES отдаётся None, сама строка отбрасывается.
+    """
+    buffer = b""
+    oversized = False
+    line_no = 0
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, None if oversized else line
+            oversized = False
+
+        if len(buffer) > MAX_LINE_BYTES:
+            oversized = True
+            buffer = b""
+
+    if buffer or oversized:
+        yield line_no + 1, None if oversized else buffer
+
+
+async def iter_record_batches(
+    chunks: AsyncIterator[bytes],
+    fmt: ImportFormat,
+    batch_size: int,
+    rejected: RejectedRows,
+) -> AsyncIterator[list[ImportRecord]]:
+    """
+    Записи порциями по `batch_size` (порция может быть чуть больше:
+    строка с `members` не делится). Ошибочные строки попадают в
+    `rejected`; без заголовка CSV разбирать нечего — InvalidImportError.
+    """
+    batch: list[ImportRecord] = []
+    csv_columns: dict[str, int] | None = None
+
+    async for line_no, raw in iter_lines(chunks):
+        if raw is None:
+            rejected.add(line_no, "line too long")
+            continue
+
+        try:
+            line = raw.decode("utf-8").strip()
+        except UnicodeDecodeError:
+            rejected.add(line_no, "invalid utf-8")
+            continue
+        if not line:
+            continue
+
+        try:
+            if fmt == ImportFormat.NDJSON:
+                batch += _parse_ndjson_line(line_no, line)
+            elif csv_columns is None:
+                csv_columns = _parse_csv_header(line)
+            else:
+                batch.append(_parse_csv_line(line_no, line, csv_columns))
+        except ValueError as exc:
+            rejected.add(line_no, str(exc))
+            continue
+
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def _parse_ndjson_line(line_no: int, line: str) -> list[ImportRecord]:
+    try:
+        obj = json.loads(line)
+    except json.JSONDecodeError:
+        raise ValueError("invalid json")
+    if not isinstance(obj, dict):
+        raise ValueError("expected an object")
+
+    team_name = _required_str(obj, "team_name")
+
+    if "members" in obj:
+        members = obj["members"]
+        if not isinstance(members, list) or not all(
+            isinstance(member, dict) for member in members
+        ):
+            raise ValueError("members must be a list of objects")
+        if not members:
+            return [(line_no, team_name, None, None, None)]
+        return [_member_record(line_no, team_name, member) for member in members]
+
+    if "user_id" in obj:
+        return [_member_record(line_no, team_name, obj)]
+
+    return [(line_no, team_name, None, None, None)]
+
+
+def _member_record(line_no: int, team_name: str, obj: dict) -> ImportRecord:
+    user_id = _required_str(obj, "user_id")
+    username = _required_str(obj, "username")
+    if len(username) > USERNAME_MAX_LENGTH:
+        raise ValueError(f"username longer than {USERNAME_MAX_LENGTH}")
+
+    is_active = obj.get("is_active")
+    if not isinstance(is_active, bool):
+        raise ValueError("is_active must be a boolean")
+
+    return line_no, team_name, user_id, username, is_active
+
+
+def _required_str(obj: dict, field: str) -> str:
+    value = obj.get(field)
+    if not isinstance(value, str) or not value:
+        raise ValueError(f"{field} must be a non-empty string")
+    return value
+
+
+def _parse_csv_header(line: str) -> dict[str, int]:
+    header = [name.strip() for name in next(csv.reader([line]))]
+    missing = [name for name in CSV_COLUMNS if name not in header]
+    if missing:
+        raise InvalidImportError(f"csv header is missing: {', '.join(missing)}")
+    return {name: header.index(name) for name in CSV_COLUMNS}
+
+
+def _parse_csv_line(line_no: int, line: str, columns: dict[str, int]) -> ImportRecord:
+    values = next(csv.reader([line]))
+    if len(values) <= max(columns.values()):
+        raise ValueError("not enough columns")
+
+    obj = {name: values[index].strip() for name, index in columns.items()}
+    team_name = _required_str(obj, "team_name")
+    if not obj["user_id"]:
+        return line_no, team_name, None, None, None
+
+    is_active = _CSV_BOOLEANS.get(obj["is_active"].lower())
+    if is_active is None:
+        raise ValueError("is_active must be a boolean")
+
+    return _member_record(line_no, team_name, {**obj, "is_active": is_active})
@@ -1,6 +1,19 @@
-from app.models import Team
+from typing import AsyncIterator
+
+from app.core.config import settings
 from app.repositories import TeamRepository
-from app.schemas import TeamMember, TeamWithMembers
+from app.repositories.team_repository import TeamMembers
+from app.schemas import (
+    TeamImportRejectedRow,
+    TeamImportResult,
+    TeamImportTeamResult,
+    TeamMember,
+    TeamMemberField,
+    TeamMemberView,
+    TeamView,
+    TeamWithMembers,
+)
+from app.services.team_import import ImportFormat, RejectedRows, iter_record_batches
 
 
 class TeamService:
@@ -8,7 +21,7 @@ class TeamService:
         self._repo = repo
 
     @staticmethod
-    def _map_team_model(team: Team) -> TeamWithMembers:
+    def _map_team_model(team: TeamMembers) -> TeamWithMembers:
         return TeamWithMembers(
             team_name=team.name,
             members=[
@@ -25,9 +38,88 @@ class TeamService:
         self, team_in: TeamWithMembers
     ) -> TeamWithMembers:
         team = await self._repo.create_team_with_members(team_in)
-        team = await self._repo.get_team_with_members(team.name)
         return self._map_team_model(team)
 
-    async def get_team_with_members(self, team_name: str) -> TeamWithMembers:
-        team_model = await self._repo.get_team_with_members(team_name)
-        return self._map_team_model(team_model)
+    async def get_team_view(
+        self,
+        team_name: str,
+        active_only: bool = False,
+        limit: int | None = None,
+        cursor: str | None = None,
+        fields: list[TeamMemberField] | None = None,
+    ) -> TeamView:
+        """
+        Участники команды с фильтром, страницами по id и выбором полей.
+        Без параметров — все участники со всеми полями.
+        """
+        fields = fields or list(TeamMemberField)
+        # На одну запись больше, чтобы понять, есть ли следующая страница
+        team = await self._repo.get_team_with_members(
+            team_name,
+            active_only=active_only,
+            limit=limit + 1 if limit is not None else None,
+            after_user_id=cursor,
+            fields=fields,
+        )
+
+        users = team.users
+        next_cursor = None
+        if limit is not None and len(users) > limit:
+            users = users[:limit]
+            next_cursor = users[-1].id
+
+        return TeamView(
+            team_name=team.name,
+            members=[
+                TeamMemberView(
+                    **{
+                        field.value: (
+                            user.id
+                            if field == TeamMemberField.USER_ID
+                            else getattr(user, field.value)
+                        )
+                        for field in fields
+                    }
+                )
+                for user in users
+            ],
+            next_cursor=next_cursor,
+        )
+
+    async def get_team_summary(
+        self, team_name: str, active_only: bool = False
+    ) -> TeamView:
+        count = await self._repo.count_team_members(team_name, active_only=active_only)
+        return TeamView(team_name=team_name, member_count=count)
+
+    async def get_team_version(self, team_name: str) -> int | None:
+        return await self._repo.get_team_version(team_name)
+
+    async def import_teams(
+        self,
+        chunks: AsyncIterator[bytes],
+        fmt: ImportFormat,
+        batch_size: int = settings.TEAM_IMPORT_BATCH_SIZE,
+        max_rejected: int = settings.TEAM_IMPORT_MAX_REJECTED,
+    ) -> TeamImportResult:
+        """
+        Импорт из потока тела запроса: строки разбираются по мере прихода
+        и уходят в БД порциями по `batch_size`, поэтому память не зависит
+        от размера импорта.
+        """
+        rejected = RejectedRows(limit=max_rejected)
+        teams = await self._repo.import_teams(
+            iter_record_batches(chunks, fmt, batch_size, rejected)
+        )
+        return TeamImportResult(
+            teams=[
+                TeamImportTeamResult(team_name=name, created=created, members=members)
+                for name, created, members in teams
+            ],
+            users_imported=sum(members for _, _, members in teams),
+            rejected_total=rejected.total,
+            rejected=[
+                TeamImportRejectedRow(line=line, error=error)
+                for line, error in rejected.rows
+            ],
+        )
@@ -1,9 +1,20 @@
+import json
+from typing import AsyncIterator
+
+from app.core.cache import StaleWhileRevalidateCache
+from app.core.config import settings
+from app.core.db.connect import get_read_sessionmaker
 from app.models import PullRequest, User
+from app.models.pull_requests import PRStatus
 from app.repositories import PullRequestRepository, UserRepository
 from app.schemas import (
     PRReviewStat,
     PullRequestShort,
     ReviewStats,
+    SetIsActiveBatchItemResult,
+    SetIsActiveBatchItemStatus,
+    SetIsActiveBatchRequest,
+    SetIsActiveBatchResult,
     UserFull,
     UserReviewPRs,
     UserReviewStat,
@@ -39,11 +50,75 @@ class UserService:
         user_model = await self._repo_user.set_is_active(user_id, is_active)
         return self._map_user_model(user_model)
 
-    async def get_review_pull_requests(self, user_id: str) -> UserReviewPRs:
-        prs = await self._repo_user.get_user_review_pull_requests(user_id)
+    async def set_is_active_batch(
+        self, payload: SetIsActiveBatchRequest
+    ) -> SetIsActiveBatchResult:
+        """
+        Результат по каждому user_id в порядке первого упоминания;
+        при повторе user_id применяется последнее значение.
+        """
+        changes = {item.user_id: item.is_active for item in payload.items}
+        users, reviews = await self._repo_pr.set_is_active_batch(
+            changes, reassign=payload.reassign_open_reviews
+        )
+        users_by_id = {user.id: user for user in users}
+
+        results = []
+        for user_id in changes:
+            user = users_by_id.get(user_id)
+            if user is None:
+                results.append(
+                    SetIsActiveBatchItemResult(
+                        user_id=user_id,
+                        status=SetIsActiveBatchItemStatus.NOT_FOUND,
+                    )
+                )
+                continue
+
+            reassigned, removed = reviews.get(user_id, (0, 0))
+            results.append(
+                SetIsActiveBatchItemResult(
+                    user_id=user_id,
+                    status=(
+                        SetIsActiveBatchItemStatus.UPDATED
+                        if user.changed
+                        else SetIsActiveBatchItemStatus.UNCHANGED
+                    ),
+                    user=self._map_user_model(user),
+                    reassigned_reviews=reassigned,
+                    removed_reviews=removed,
+                )
+            )
+
+        return SetIsActiveBatchResult(results=results)
+
+    async def get_review_version(self, user_id: str) -> int | None:
+        return await self._repo_user.get_review_version(user_id)
+
+    async def get_review_pull_requests(
+        self,
+        user_id: str,
+        status: PRStatus | None = None,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> UserReviewPRs:
+        # Берём на одну запись больше, чтобы понять, есть ли следующая страница
+        prs = await self._repo_user.get_user_review_pull_requests(
+            user_id,
+            status=status,
+            limit=limit + 1 if limit is not None else None,
+            after_pr_id=cursor,
+        )
+
+        next_cursor = None
+        if limit is not None and len(prs) > limit:
+            prs = prs[:limit]
+            next_cursor = prs[-1].id
+
         return UserReviewPRs(
             user_id=user_id,
             pull_requests=[self._map_pr_model(pr) for pr in prs],
+            next_cursor=next_cursor,
         )
 
     async def get_review_stats(self) -> ReviewStats:
@@ -68,3 +143,57 @@ class UserService:
                 for pr_id, count in by_pr_raw
             ],
         )
+
+    async def get_cached_review_stats(
+        self, refresh: bool = False
+    ) -> tuple[ReviewStats, float]:
+        """
+        Статистика из кэша воркера и её возраст в секундах.
+        Пересчёт идёт в отдельной сессии (`load_review_stats`), одновременные
+        промахи ждут один и тот же пересчёт.
+        """
+        return await review_stats_cache.get(load_review_stats, refresh=refresh)
+
+    async def stream_review_stats(
+        self, chunk_size: int = settings.STATS_STREAM_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """
+        Та же статистика в NDJSON: по объекту на строку, сначала
+        пользователи (`"type": "user"`), затем PR (`"type": "pull_request"`).
+
+        Строки читаются серверным курсором порциями по `chunk_size`, и каждая
+        порция сразу отдаётся одним куском, поэтому память не растёт
+        с размером таблиц.
+        """
+        async for rows in self._repo_user.iter_review_stats_by_user(chunk_size):
+            yield _ndjson(
+                {"type": "user", "user_id": user_id, "reviews_assigned": count}
+                for user_id, count in rows
+            )
+
+        async for rows in self._repo_pr.iter_review_stats_by_pr(chunk_size):
+            yield _ndjson(
+                {
+                    "type": "pull_request",
+                    "pull_request_id": pr_id,
+                    "reviewers_assigned": count,
+                }
+                for pr_id, count in rows
+            )
+
+
+review_stats_cache: StaleWhileRevalidateCache[ReviewStats] = StaleWhileRevalidateCache(
+    ttl=settings.STATS_CACHE_TTL,
+    max_stale=settings.STATS_CACHE_MAX_STALE,
+)
+
+
+async def load_review_stats() -> ReviewStats:
+    session_maker = await get_read_sessionmaker()
+    async with session_maker() as session:
+        service = UserService(UserRepository(session), PullRequestRepository(session))
+        return await service.get_review_stats()
+
+
+def _ndjson(objects) -> bytes:
+    return "".join(json.dumps(obj) + "\n" for obj in objects).encode()
@@ -0,0 +1,317 @@
+"""
+Бенчмарк профилей пула соединений (DB_PROFILE / DB_POOL_* / DB_STATEMENT_CACHE_SIZE).
+
+Для каждого профиля поднимает uvicorn с соответствующими переменными
+окружения и гоняет смесь запросов из locustfile.py (те же задачи и веса:
+create 3, reassign 2, merge 2, повторный merge 1, getReview 2,
+deactivateUsers 1) и той же паузой между запросами (`--wait`, как
+`between(0.2, 0.5)` в Locust) с `--users` виртуальными пользователями.
+Выводит запросы в секунду, p50/p95 и число ошибок (5xx и неожиданные
+статусы).
+
+Вся смесь пишет в строки одной команды из 10 человек: записи с общими
+пользователями и PR ждут блокировок друг друга, и с ростом `--users` время
+ответа растёт в первую очередь из-за них. `--tasks` оставляет только часть
+задач (с теми же весами), например `--tasks get_review` — чистое чтение,
+где разница между профилями видна без этих ожиданий.
+
+Профили:
+
+  defaults       -- умолчания SQLAlchemy/asyncpg (пул 5 + 10, timeout 30 с);
+  direct         -- DB_PROFILE=direct с умолчаниями Settings;
+  direct-nocache -- direct без кэша подготовленных выражений (цена кэша);
+  pgbouncer      -- DB_PROFILE=pgbouncer; без `--pgbouncer host:port`
+                    ходит прямо в Postgres, т.е. показывает цену
+                    NullPool и выключенного кэша без самого PgBouncer.
+
+ВНИМАНИЕ: использует тестовую БД (POSTGRES_*_TEST) и пересоздаёт в ней схему
+перед каждым профилем.
+
+    poetry run python -m benchmarks.pool_profiles --users 200 --duration 30
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+
+import httpx
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.db import Base
+
+PROFILES: dict[str, dict[str, str]] = {
+    "defaults": {
+        "DB_PROFILE": "direct",
+        "DB_POOL_SIZE": "5",
+        "DB_MAX_OVERFLOW": "10",
+        "DB_POOL_TIMEOUT": "30",
+        "DB_POOL_RECYCLE": "-1",
+        "DB_STATEMENT_CACHE_SIZE": "100",
+    },
+    "direct": {"DB_PROFILE": "direct"},
+    "direct-nocache": {"DB_PROFILE": "direct", "DB_STATEMENT_CACHE_SIZE": "0"},
+    "pgbouncer": {"DB_PROFILE": "pgbouncer"},
+}
+
+TEAM_NAME = "backend-loadtest"
+MEMBER_IDS = [f"u{i}" for i in range(1, 11)]
+
+TASK_WEIGHTS = {
+    "create": 3,
+    "reassign": 2,
+    "merge": 2,
+    "merge_again": 1,
+    "get_review": 2,
+    "deactivate": 1,
+}
+
+
+@dataclass
+class Stats:
+    latencies: list[float] = field(default_factory=list)
+    failures: int = 0
+
+
+class VirtualUser:
+    """Один пользователь Locust: свои PR и та же логика выбора задач."""
+
+    def __init__(self, client: httpx.AsyncClient, stats: Stats) -> None:
+        self._client = client
+        self._stats = stats
+        self._prs: list[dict] = []
+
+    async def _request(self, method: str, url: str, ok: tuple[int, ...], **kwargs):
+        started = time.perf_counter()
+        try:
+            resp = await self._client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self._stats.failures += 1
+            return None
+        self._stats.latencies.append(time.perf_counter() - started)
+        if resp.status_code not in ok:
+            self._stats.failures += 1
+            return None
+        return resp
+
+    async def on_start(self) -> None:
+        members = [
+            {"user_id": user_id, "username": f"User {user_id}", "is_active": True}
+            for user_id in MEMBER_IDS
+        ]
+        await self._request(
+            "POST",
+            "/team/add",
+            (201, 400),
+            json={"team_name": TEAM_NAME, "members": members},
+        )
+
+    async def run_task(self, tasks: list[str]) -> None:
+        weights = [TASK_WEIGHTS[name] for name in tasks]
+        await getattr(self, random.choices(tasks, weights=weights)[0])()
+
+    async def create(self) -> None:
+        resp = await self._request(
+            "POST",
+            "/pullRequest/create",
+            (201,),
+            json={
+                "pull_request_id": f"pr-{uuid.uuid4()}",
+                "pull_request_name": "Load test PR",
+                "author_id": random.choice(MEMBER_IDS),
+            },
+        )
+        if resp is not None:
+            pr = resp.json()["pr"]
+            self._prs.append(
+                {
+                    "id": pr["pull_request_id"],
+                    "reviewers": pr["assigned_reviewers"],
+                    "status": pr["status"],
+                }
+            )
+
+    async def reassign(self) -> None:
+        candidates = [
+            pr for pr in self._prs if pr["status"] == "OPEN" and pr["reviewers"]
+        ]
+        if not candidates:
+            return
+        pr = random.choice(candidates)
+        resp = await self._request(
+            "POST",
+            "/pullRequest/reassign",
+            (200, 409),
+            json={
+                "pull_request_id": pr["id"],
+                "old_user_id": random.choice(pr["reviewers"]),
+            },
+        )
+        if resp is not None and resp.status_code == 200:
+            pr["reviewers"] = resp.json()["pr"]["assigned_reviewers"]
+
+    async def merge(self) -> None:
+        candidates = [pr for pr in self._prs if pr["status"] == "OPEN"]
+        if not candidates:
+            return
+        pr = random.choice(candidates)
+        resp = await self._request(
+            "POST", "/pullRequest/merge", (200,), json={"pull_request_id": pr["id"]}
+        )
+        if resp is not None:
+            pr["status"] = "MERGED"
+
+    async def merge_again(self) -> None:
+        candidates = [pr for pr in self._prs if pr["status"] == "MERGED"]
+        if not candidates:
+            return
+        await self._request(
+            "POST",
+            "/pullRequest/merge",
+            (200,),
+            json={"pull_request_id": random.choice(candidates)["id"]},
+        )
+
+    async def get_review(self) -> None:
+        await self._request(
+            "GET",
+            "/users/getReview",
+            (200, 404),
+            params={"user_id": random.choice(MEMBER_IDS)},
+        )
+
+    async def deactivate(self) -> None:
+        await self._request(
+            "POST",
+            "/team/deactivateUsers",
+            (200,),
+            json={"team_name": TEAM_NAME, "user_ids": random.sample(MEMBER_IDS, k=2)},
+        )
+
+
+async def _reset_schema() -> None:
+    engine = create_async_engine(settings.get_async_database_test_uri)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+
+def _start_server(profile: str, args: argparse.Namespace) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        # Приложение работает с тестовой БД
+        "POSTGRES_SERVER": settings.POSTGRES_SERVER_TEST,
+        "POSTGRES_PORT": str(settings.POSTGRES_PORT_TEST),
+        "POSTGRES_USER": settings.POSTGRES_USER_TEST,
+        "POSTGRES_PASSWORD": settings.POSTGRES_PASSWORD_TEST,
+        "POSTGRES_DB": settings.POSTGRES_DB_TEST,
+        **PROFILES[profile],
+    }
+    if profile == "pgbouncer" and args.pgbouncer:
+        host, _, port = args.pgbouncer.partition(":")
+        env["POSTGRES_SERVER"] = host
+        env["POSTGRES_PORT"] = port or "6432"
+
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(args.port),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+
+
+async def _wait_ready(client: httpx.AsyncClient) -> None:
+    for _ in range(100):
+        try:
+            await client.get("/team/get", params={"team_name": TEAM_NAME})
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def _run_load(args: argparse.Namespace) -> tuple[Stats, float]:
+    stats = Stats()
+    limits = httpx.Limits(max_connections=args.users)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60
+    ) as client:
+        await _wait_ready(client)
+
+        users = [VirtualUser(client, stats) for _ in range(args.users)]
+        for user in users:
+            await user.on_start()
+            # По PR на пользователя, чтобы getReview было что читать
+            await user.create()
+        stats.latencies.clear()
+
+        deadline = time.perf_counter() + args.duration
+
+        async def loop(user: VirtualUser) -> None:
+            while time.perf_counter() < deadline:
+                await user.run_task(args.tasks)
+                await asyncio.sleep(random.uniform(*args.wait))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(loop(user) for user in users))
+        return stats, time.perf_counter() - started
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+async def main(args: argparse.Namespace) -> None:
+    for profile in args.profiles:
+        await _reset_schema()
+        server = _start_server(profile, args)
+        try:
+            stats, elapsed = await _run_load(args)
+        finally:
+            server.terminate()
+            server.wait()
+
+        requests = len(stats.latencies)
+        print(
+            f"{profile:<15} rps={requests / elapsed:7.1f}  "
+            f"p50={_percentile(stats.latencies, 0.5) * 1000:6.1f} ms  "
+            f"p95={_percentile(stats.latencies, 0.95) * 1000:6.1f} ms  "
+            f"requests={requests:<6} failures={stats.failures}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument(
+        "--tasks", nargs="+", choices=list(TASK_WEIGHTS), default=list(TASK_WEIGHTS)
+    )
+    parser.add_argument(
+        "--wait", type=float, nargs=2, default=(0.2, 0.5), metavar=("MIN", "MAX")
+    )
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument(
+        "--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES)
+    )
+    parser.add_argument(
+        "--pgbouncer",
+        metavar="HOST:PORT",
+        help="PgBouncer (transaction mode) перед тестовой БД для профиля pgbouncer",
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,154 @@
+"""
+Бенчмарк чтения списков: сущности ORM против проекции по колонкам.
+
+Сравнивает на одном наборе данных (по умолчанию 10k строк):
+
+  getReview -- select(PullRequest) + маппинг в PullRequestShort против
+               UserRepository.get_user_review_pull_requests;
+  team get  -- selectinload(Team.users) + маппинг в TeamWithMembers против
+               TeamRepository.get_team_with_members.
+
+Для каждого варианта выводит время (wall и CPU процесса) на строку и пик
+выделенной памяти по tracemalloc. Время меряется без tracemalloc,
+память — отдельным прогоном.
+
+ВНИМАНИЕ: использует тестовую БД (POSTGRES_*_TEST) и пересоздаёт в ней схему.
+
+    poetry run python -m benchmarks.projection_reads --rows 10000 --repeat 20
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import Awaitable, Callable
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.core.db import Base
+from app.models import PRReviewer, PullRequest, Team
+from app.repositories import TeamRepository, UserRepository
+from app.services import TeamService, UserService
+
+TEAM_NAME = "bench-projection"
+REVIEWER_ID = "bench-reviewer"
+
+
+async def _seed(session_maker: async_sessionmaker[AsyncSession], rows: int) -> None:
+    async with session_maker() as session:
+        await session.execute(
+            text("INSERT INTO teams (name) VALUES (:team)"), {"team": TEAM_NAME}
+        )
+        await session.execute(
+            text(
+                "INSERT INTO users (id, username, is_active, team_name) "
+                "SELECT 'u' || g, 'User ' || g, true, :team "
+                "FROM generate_series(0, :rows - 1) AS g "
+                "UNION ALL SELECT :reviewer, 'Reviewer', true, :team"
+            ),
+            {"team": TEAM_NAME, "rows": rows, "reviewer": REVIEWER_ID},
+        )
+        await session.execute(
+            text(
+                "INSERT INTO pull_requests (id, title, author_id, status) "
+                "SELECT 'pr' || g, 'PR ' || g, 'u' || g, 'OPEN' "
+                "FROM generate_series(0, :rows - 1) AS g"
+            ),
+            {"rows": rows},
+        )
+        await session.execute(
+            text(
+                "INSERT INTO pr_reviewers (pr_id, reviewer_id) "
+                "SELECT 'pr' || g, :reviewer FROM generate_series(0, :rows - 1) AS g"
+            ),
+            {"rows": rows, "reviewer": REVIEWER_ID},
+        )
+        await session.commit()
+
+
+async def _review_entities(session: AsyncSession) -> int:
+    stmt = (
+        select(PullRequest)
+        .join(PRReviewer, PRReviewer.pr_id == PullRequest.id)
+        .where(PRReviewer.reviewer_id == REVIEWER_ID)
+        .order_by(PRReviewer.pr_id)
+    )
+    prs = list(await session.scalars(stmt))
+    return len([UserService._map_pr_model(pr) for pr in prs])
+
+
+async def _review_projection(session: AsyncSession) -> int:
+    prs = await UserRepository(session).get_user_review_pull_requests(REVIEWER_ID)
+    return len([UserService._map_pr_model(pr) for pr in prs])
+
+
+async def _team_entities(session: AsyncSession) -> int:
+    stmt = select(Team).where(Team.name == TEAM_NAME).options(selectinload(Team.users))
+    team = await session.scalar(stmt)
+    return len(TeamService._map_team_model(team).members)
+
+
+async def _team_projection(session: AsyncSession) -> int:
+    team = await TeamRepository(session).get_team_with_members(TEAM_NAME)
+    return len(TeamService._map_team_model(team).members)
+
+
+async def _measure(
+    session_maker: async_sessionmaker[AsyncSession],
+    name: str,
+    read: Callable[[AsyncSession], Awaitable[int]],
+    repeat: int,
+) -> None:
+    # Каждое чтение в новой сессии, как в запросе API
+    async def run_once() -> int:
+        async with session_maker() as session:
+            return await read(session)
+
+    await run_once()  # прогрев: соединение, кэш компиляции
+
+    wall = cpu = 0.0
+    rows = 0
+    for _ in range(repeat):
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        rows = await run_once()
+        wall += time.perf_counter() - wall_started
+        cpu += time.process_time() - cpu_started
+
+    tracemalloc.start()
+    await run_once()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{name:<20} rows={rows:<6} "
+        f"wall={wall / repeat / rows * 1e6:7.2f} us/row  "
+        f"cpu={cpu / repeat / rows * 1e6:7.2f} us/row  "
+        f"peak_mem={peak / rows:8.1f} B/row"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(settings.get_async_database_test_uri)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    await _seed(session_maker, args.rows)
+
+    await _measure(session_maker, "review/entities", _review_entities, args.repeat)
+    await _measure(session_maker, "review/projection", _review_projection, args.repeat)
+    await _measure(session_maker, "team/entities", _team_entities, args.repeat)
+    await _measure(session_maker, "team/projection", _team_projection, args.repeat)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,175 @@
+"""
+Стресс-бенчмарк /pullRequest/reassign под конкуренцией.
+
+Параллельные воркеры переназначают ревьюеров через PullRequestRepository,
+каждый в своей сессии. Сценарии:
+
+  hot    -- все воркеры бьют в несколько «горячих» PR;
+  spread -- у каждого воркера свой PR (проверка, что разные PR
+            не сериализуются друг с другом).
+
+Выводит пропускную способность и число исходов по типам; ошибок
+целостности (IntegrityError) быть не должно.
+
+ВНИМАНИЕ: использует тестовую БД (POSTGRES_*_TEST) и пересоздаёт в ней схему.
+
+    poetry run python -m benchmarks.reassign_contention --workers 32 --seconds 10
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.db import Base
+from app.core.exceptions import (
+    NoReplacementCandidateError,
+    PullRequestMergedError,
+    ReviewerNotAssignedError,
+)
+from app.models import PRReviewer, PullRequest, Team, User
+from app.repositories import PullRequestRepository
+
+TEAM_NAME = "bench-reassign"
+
+
+async def _seed(
+    session_maker: async_sessionmaker[AsyncSession],
+    team_size: int,
+    pr_count: int,
+) -> list[str]:
+    async with session_maker() as session:
+        session.add(Team(name=TEAM_NAME))
+        session.add_all(
+            User(id=f"u{i}", username=f"User {i}", team_name=TEAM_NAME)
+            for i in range(team_size)
+        )
+        await session.commit()
+
+        repo = PullRequestRepository(session)
+        pr_ids = [f"pr-{i}" for i in range(pr_count)]
+        for i, pr_id in enumerate(pr_ids):
+            await repo.create_pull_request(pr_id, f"PR {i}", f"u{i % team_size}")
+
+    return pr_ids
+
+
+async def _worker(
+    session_maker: async_sessionmaker[AsyncSession],
+    pr_ids: list[str],
+    deadline: float,
+    outcomes: Counter,
+) -> None:
+    while time.perf_counter() < deadline:
+        pr_id = random.choice(pr_ids)
+        async with session_maker() as session:
+            stmt = select(PRReviewer.reviewer_id).where(PRReviewer.pr_id == pr_id)
+            reviewer_ids = list(await session.scalars(stmt))
+            await session.rollback()
+            if not reviewer_ids:
+                outcomes["skipped"] += 1
+                continue
+
+            repo = PullRequestRepository(session)
+            try:
+                await repo.reassign_reviewer(pr_id, random.choice(reviewer_ids))
+                outcomes["ok"] += 1
+            except (
+                ReviewerNotAssignedError,
+                NoReplacementCandidateError,
+                PullRequestMergedError,
+            ):
+                # Обычные 409: ревьюера уже заменил параллельный запрос и т.п.
+                outcomes["conflict_409"] += 1
+            except IntegrityError:
+                outcomes["integrity_error"] += 1
+            except DBAPIError:
+                outcomes["db_error"] += 1
+
+
+async def _run_scenario(
+    session_maker: async_sessionmaker[AsyncSession],
+    name: str,
+    pr_ids_per_worker: list[list[str]],
+    seconds: float,
+) -> None:
+    outcomes: Counter = Counter()
+    started = time.perf_counter()
+    deadline = started + seconds
+
+    await asyncio.gather(
+        *(
+            _worker(session_maker, pr_ids, deadline, outcomes)
+            for pr_ids in pr_ids_per_worker
+        )
+    )
+
+    elapsed = time.perf_counter() - started
+    total = sum(v for k, v in outcomes.items() if k != "skipped")
+    print(
+        f"{name:<7} workers={len(pr_ids_per_worker):<4} "
+        f"throughput={total / elapsed:8.1f} req/s  "
+        f"ok={outcomes['ok']:<6} 409={outcomes['conflict_409']:<6} "
+        f"integrity_errors={outcomes['integrity_error']:<3} "
+        f"other_db_errors={outcomes['db_error']}"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(
+        settings.get_async_database_test_uri,
+        pool_size=args.workers,
+        max_overflow=0,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    pr_ids = await _seed(
+        session_maker,
+        team_size=args.team_size,
+        pr_count=max(args.workers, args.hot_prs),
+    )
+
+    hot = pr_ids[: args.hot_prs]
+    await _run_scenario(session_maker, "hot", [hot] * args.workers, args.seconds)
+    await _run_scenario(
+        session_maker,
+        "spread",
+        [[pr_id] for pr_id in pr_ids[: args.workers]],
+        args.seconds,
+    )
+
+    # Инвариант: счётчики open_reviews совпадают с фактическими назначениями
+    async with session_maker() as session:
+        counters = dict(
+            (await session.execute(select(User.id, User.open_reviews))).tuples().all()
+        )
+        stmt = select(PRReviewer.reviewer_id).join(
+            PullRequest, PullRequest.id == PRReviewer.pr_id
+        )
+        actual = Counter(await session.scalars(stmt))
+        drift = {
+            uid: (count, actual.get(uid, 0))
+            for uid, count in counters.items()
+            if count != actual.get(uid, 0)
+        }
+        print(f"open_reviews drift: {drift or 'none'}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--hot-prs", type=int, default=4)
+    parser.add_argument("--team-size", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
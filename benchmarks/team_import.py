@@ -0,0 +1,91 @@
+"""
+Бенчмарк POST /team/import на уровне сервиса: NDJSON-поток из `--users`
+участников (по `--team-size` в команде) режется на куски по 64 KiB, как
+тело HTTP-запроса, и импортируется TeamService.import_teams.
+
+Выводит время импорта и пик выделенной памяти по tracemalloc (отдельным
+прогоном на свежей схеме — tracemalloc сам замедляет импорт).
+
+ВНИМАНИЕ: использует тестовую БД (POSTGRES_*_TEST) и пересоздаёт в ней схему.
+
+    poetry run python -m benchmarks.team_import --users 100000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from typing import AsyncIterator
+
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.db import Base
+from app.repositories import TeamRepository
+from app.services import TeamService
+from app.services.team_import import ImportFormat
+
+CHUNK_BYTES = 64 * 1024
+
+
+async def _body(users: int, team_size: int) -> AsyncIterator[bytes]:
+    chunk = bytearray()
+    for i in range(users):
+        record = {
+            "team_name": f"bench-team-{i // team_size}",
+            "user_id": f"bench-u{i}",
+            "username": f"User {i}",
+            "is_active": i % 10 != 0,
+        }
+        chunk += json.dumps(record).encode() + b"\n"
+        if len(chunk) >= CHUNK_BYTES:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
+
+
+async def _reset(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def _import(engine: AsyncEngine, args: argparse.Namespace) -> int:
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_maker() as session:
+        result = await TeamService(TeamRepository(session)).import_teams(
+            _body(args.users, args.team_size), ImportFormat.NDJSON
+        )
+    return result.users_imported
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(settings.get_async_database_test_uri)
+
+    await _reset(engine)
+    started = time.perf_counter()
+    imported = await _import(engine, args)
+    elapsed = time.perf_counter() - started
+
+    await _reset(engine)
+    tracemalloc.start()
+    await _import(engine, args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"users={imported} teams={-(-args.users // args.team_size)} "
+        f"time={elapsed:.2f} s ({imported / elapsed:,.0f} users/s) "
+        f"peak_mem={peak / 2**20:.1f} MiB"
+    )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--team-size", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
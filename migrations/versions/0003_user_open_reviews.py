@@ -0,0 +1,41 @@
+"""user_open_reviews
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:12:41.306517
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("open_reviews", sa.Integer(), server_default="0", nullable=False),
+    )
+    # Заполняем счётчик по текущим назначениям в OPEN PR
+    op.execute(
+        """
+        UPDATE users AS u
+        SET open_reviews = s.cnt
+        FROM (
+            SELECT r.reviewer_id, count(*) AS cnt
+            FROM pr_reviewers AS r
+            JOIN pull_requests AS p ON p.id = r.pr_id
+            WHERE p.status = 'OPEN'
+            GROUP BY r.reviewer_id
+        ) AS s
+        WHERE s.reviewer_id = u.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "open_reviews")
@@ -0,0 +1,66 @@
+"""deactivation_jobs
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 14:03:27.519204
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "deactivation_jobs",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("team_name", sa.String(), nullable=False),
+        sa.Column("user_ids", sa.ARRAY(sa.String()), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("PENDING", "RUNNING", "DONE", "FAILED", name="job_status_enum"),
+            nullable=False,
+        ),
+        sa.Column("chunk_size", sa.Integer(), nullable=False),
+        sa.Column("last_pr_id", sa.String(), nullable=True),
+        sa.Column(
+            "deactivated_users", sa.Integer(), server_default="0", nullable=False
+        ),
+        sa.Column("prs_scanned", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "reassigned_reviewers", sa.Integer(), server_default="0", nullable=False
+        ),
+        sa.Column(
+            "removed_reviewers", sa.Integer(), server_default="0", nullable=False
+        ),
+        sa.Column(
+            "affected_pull_requests", sa.Integer(), server_default="0", nullable=False
+        ),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column(
+            "created_at",
+            postgresql.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            postgresql.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["team_name"], ["teams.name"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("deactivation_jobs")
+    sa.Enum(name="job_status_enum").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,61 @@
+"""hot_path_indexes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 16:05:12.418230
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY не блокирует запись в таблицы, но не работает
+    # внутри транзакции. if_not_exists — на случай повторного запуска
+    # после прерванной сборки (невалидный индекс нужно удалить вручную).
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_pr_reviewers_reviewer_id_pr_id",
+            "pr_reviewers",
+            ["reviewer_id", "pr_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_users_team_name_is_active",
+            "users",
+            ["team_name", "is_active"],
+            postgresql_include=["id", "open_reviews"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_pull_requests_open",
+            "pull_requests",
+            ["id"],
+            postgresql_include=["author_id"],
+            postgresql_where=sa.text("status = 'OPEN'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, index in (
+            ("pull_requests", "ix_pull_requests_open"),
+            ("users", "ix_users_team_name_is_active"),
+            ("pr_reviewers", "ix_pr_reviewers_reviewer_id_pr_id"),
+        ):
+            op.drop_index(
+                index,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,31 @@
+"""etag_versions
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 17:21:03.552184
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "teams",
+        sa.Column("version", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "users",
+        sa.Column("review_version", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "review_version")
+    op.drop_column("teams", "version")
@@ -0,0 +1,56 @@
+"""review_stats_counters
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 18:40:27.904113
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("reviews_assigned", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "pull_requests",
+        sa.Column("reviewers_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    # Заполняем счётчики по текущим назначениям
+    op.execute(
+        """
+        UPDATE users AS u
+        SET reviews_assigned = s.cnt
+        FROM (
+            SELECT reviewer_id, count(*) AS cnt
+            FROM pr_reviewers
+            GROUP BY reviewer_id
+        ) AS s
+        WHERE s.reviewer_id = u.id
+        """
+    )
+    op.execute(
+        """
+        UPDATE pull_requests AS p
+        SET reviewers_count = s.cnt
+        FROM (
+            SELECT pr_id, count(*) AS cnt
+            FROM pr_reviewers
+            GROUP BY pr_id
+        ) AS s
+        WHERE s.pr_id = p.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("pull_requests", "reviewers_count")
+    op.drop_column("users", "reviews_assigned")
@@ -0,0 +1,119 @@
+"""daily_stats
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 20:02:45.117306
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def _timestamps() -> list[sa.Column]:
+    return [
+        sa.Column(
+            "created_at",
+            postgresql.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            postgresql.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_team_stats",
+        sa.Column("team_name", sa.String(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("prs_opened", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("prs_merged", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("time_to_merge_p50", sa.Float(), nullable=True),
+        sa.Column("time_to_merge_p90", sa.Float(), nullable=True),
+        sa.Column("reviews_assigned", sa.Integer(), server_default="0", nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["team_name"], ["teams.name"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("team_name", "day"),
+    )
+    op.create_table(
+        "daily_reviewer_stats",
+        sa.Column("reviewer_id", sa.String(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("team_name", sa.String(), nullable=False),
+        sa.Column("reviews_assigned", sa.Integer(), server_default="0", nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["reviewer_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["team_name"], ["teams.name"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("reviewer_id", "day"),
+    )
+    op.create_index(
+        "ix_daily_reviewer_stats_team_name_day",
+        "daily_reviewer_stats",
+        ["team_name", "day"],
+    )
+    op.create_table(
+        "stats_rollup_state",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("refreshed_at", postgresql.TIMESTAMP(timezone=True), nullable=False),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+    # Индексы на большие таблицы — без блокировки записи, как в 0005
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_pull_requests_created_at",
+            "pull_requests",
+            ["created_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_pull_requests_merged_at",
+            "pull_requests",
+            ["merged_at"],
+            postgresql_where=sa.text("merged_at IS NOT NULL"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_pr_reviewers_updated_at",
+            "pr_reviewers",
+            ["updated_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, index in (
+            ("pr_reviewers", "ix_pr_reviewers_updated_at"),
+            ("pull_requests", "ix_pull_requests_merged_at"),
+            ("pull_requests", "ix_pull_requests_created_at"),
+        ):
+            op.drop_index(
+                index,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+    op.drop_table("stats_rollup_state")
+    op.drop_index(
+        "ix_daily_reviewer_stats_team_name_day", table_name="daily_reviewer_stats"
+    )
+    op.drop_table("daily_reviewer_stats")
+    op.drop_table("daily_team_stats")
@@ -0,0 +1,38 @@
+"""team_members_page_index
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 21:40:37.902115
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Страницы /team/get по (team_name, id > cursor) без сортировки
+    # всей команды; см. 0005 про CONCURRENTLY и if_not_exists
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_team_name_id",
+            "users",
+            ["team_name", "id"],
+            postgresql_include=["username", "is_active"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_users_team_name_id",
+            table_name="users",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,38 @@
+"""pr_reviewers_created_at_index
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 23:05:12.418306
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Дневные срезы датируют назначения по created_at: reassign меняет
+    # updated_at, и день назначения не должен от него зависеть;
+    # см. 0005 про CONCURRENTLY и if_not_exists
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_pr_reviewers_created_at",
+            "pr_reviewers",
+            ["created_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_pr_reviewers_created_at",
+            table_name="pr_reviewers",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
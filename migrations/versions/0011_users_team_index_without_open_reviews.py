@@ -0,0 +1,49 @@
+"""users_team_index_without_open_reviews
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 23:48:20.561904
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def _rebuild_team_index(include: list[str]) -> None:
+    # Новый индекс строится рядом со старым и занимает его имя: выбор
+    # кандидатов ни на момент не остаётся без индекса; см. 0005 про
+    # CONCURRENTLY и if_not_exists
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_team_name_is_active_new",
+            "users",
+            ["team_name", "is_active"],
+            postgresql_include=include,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_users_team_name_is_active",
+            table_name="users",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.execute(
+        "ALTER INDEX ix_users_team_name_is_active_new "
+        "RENAME TO ix_users_team_name_is_active"
+    )
+
+
+def upgrade() -> None:
+    # open_reviews меняется на каждом назначении и merge; пока он в
+    # INCLUDE, ни один такой UPDATE users не может быть HOT
+    _rebuild_team_index(["id"])
+
+
+def downgrade() -> None:
+    _rebuild_team_index(["id", "open_reviews"])
@@ -1,7 +1,10 @@
+import asyncio
 from uuid import uuid4
 
 import pytest
 
+from app.core.config import settings
+
 
 @pytest.mark.e2e
 @pytest.mark.anyio
@@ -159,3 +162,153 @@ async def test_bulk_deactivate_team_users_and_reassign_e2e(client, unique_suffix
     assert resp.status_code == 200, resp.text
     merged = resp.json()["pr"]
     assert merged["status"] == "MERGED"
+
+
+@pytest.mark.e2e
+@pytest.mark.anyio
+async def test_create_pull_requests_batch_e2e(client, unique_suffix):
+    team_name = f"batch-{unique_suffix}"
+    u1 = f"{team_name}-u1"
+    u2 = f"{team_name}-u2"
+    u3 = f"{team_name}-u3"
+
+    resp = await client.post(
+        "/team/add",
+        json={
+            "team_name": team_name,
+            "members": [
+                {"user_id": u1, "username": "Alice", "is_active": True},
+                {"user_id": u2, "username": "Bob", "is_active": True},
+                {"user_id": u3, "username": "Charlie", "is_active": True},
+            ],
+        },
+    )
+    assert resp.status_code == 201, resp.text
+
+    pr_ids = [f"pr-{uuid4().hex[:8]}" for _ in range(3)]
+    items = [
+        {"pull_request_id": pr_id, "pull_request_name": "batch PR", "author_id": u1}
+        for pr_id in pr_ids
+    ]
+    items.append(
+        {
+            "pull_request_id": f"pr-{uuid4().hex[:8]}",
+            "pull_request_name": "unknown author",
+            "author_id": f"{team_name}-nobody",
+        }
+    )
+    items.append(dict(items[0]))
+
+    resp = await client.post("/pullRequest/createBatch", json={"items": items})
+    assert resp.status_code == 200, resp.text
+    results = resp.json()["results"]
+
+    assert [r["status"] for r in results] == [
+        "CREATED",
+        "CREATED",
+        "CREATED",
+        "NOT_FOUND",
+        "PR_EXISTS",
+    ]
+    for result in results[:3]:
+        assert set(result["pr"]["assigned_reviewers"]) == {u2, u3}
+    assert results[3]["pr"] is None
+
+
+@pytest.mark.e2e
+@pytest.mark.anyio
+async def test_create_batch_rejects_empty_and_oversized_batches(client):
+    item = {
+        "pull_request_id": f"pr-{uuid4().hex[:8]}",
+        "pull_request_name": "batch PR",
+        "author_id": "nobody",
+    }
+
+    resp = await client.post("/pullRequest/createBatch", json={"items": []})
+    assert resp.status_code == 422
+
+    items = [item] * (settings.BATCH_MAX_ITEMS + 1)
+    resp = await client.post("/pullRequest/createBatch", json={"items": items})
+    assert resp.status_code == 422
+
+
+@pytest.mark.e2e
+@pytest.mark.anyio
+async def test_merge_batch_rejects_empty_and_oversized_batches(client):
+    resp = await client.post("/pullRequest/mergeBatch", json={"pull_request_ids": []})
+    assert resp.status_code == 422
+
+    pr_ids = [f"pr-{i}" for i in range(settings.BATCH_MAX_ITEMS + 1)]
+    resp = await client.post(
+        "/pullRequest/mergeBatch", json={"pull_request_ids": pr_ids}
+    )
+    assert resp.status_code == 422
+
+
+@pytest.mark.e2e
+@pytest.mark.anyio
+async def test_bulk_deactivate_in_background_e2e(client, unique_suffix):
+    team_name = f"bulk-bg-{unique_suffix}"
+    u1 = f"{team_name}-u1"
+    u2 = f"{team_name}-u2"
+    u3 = f"{team_name}-u3"
+    u4 = f"{team_name}-u4"
+
+    resp = await client.post(
+        "/team/add",
+        json={
+            "team_name": team_name,
+            "members": [
+                {"user_id": u1, "username": "Alice", "is_active": True},
+                {"user_id": u2, "username": "Bob", "is_active": True},
+                {"user_id": u3, "username": "Charlie", "is_active": True},
+                {"user_id": u4, "username": "Dave", "is_active": True},
+            ],
+        },
+    )
+    assert resp.status_code == 201, resp.text
+
+    pr_ids = [f"pr-{uuid4().hex[:8]}" for _ in range(3)]
+    for pr_id in pr_ids:
+        resp = await client.post(
+            "/pullRequest/create",
+            json={
+                "pull_request_id": pr_id,
+                "pull_request_name": "background deactivate PR",
+                "author_id": u1,
+            },
+        )
+        assert resp.status_code == 201, resp.text
+
+    resp = await client.post(
+        "/team/deactivateUsers",
+        params={"background": "true", "chunk_size": 1},
+        json={"team_name": team_name, "user_ids": [u2, u3]},
+    )
+    assert resp.status_code == 202, resp.text
+    job = resp.json()
+    assert job["deactivated_users"] == 2
+    assert job["chunk_size"] == 1
+
+    for _ in range(50):
+        resp = await client.get(f"/jobs/{job['job_id']}")
+        assert resp.status_code == 200, resp.text
+        job = resp.json()
+        if job["status"] == "DONE":
+            break
+        await asyncio.sleep(0.1)
+
+    assert job["status"] == "DONE"
+    assert job["prs_scanned"] == 3
+    assert job["result"]["deactivated_users"] == 2
+    assert job["result"]["affected_pull_requests"] == 3
+    # заменить можно только на u4 и не больше одного раза на PR
+    assert job["result"]["reassigned_reviewers"] <= 3
+
+    for user_id in (u2, u3):
+        resp = await client.get("/users/getReview", params={"user_id": user_id})
+        assert resp.status_code == 200, resp.text
+        assert resp.json()["pull_requests"] == []
+
+    resp = await client.get("/jobs/missing-job")
+    assert resp.status_code == 404, resp.text
@@ -1,7 +1,10 @@
+import json
 from uuid import uuid4
 
 import pytest
 
+from app.core.config import settings
+
 
 @pytest.mark.e2e
 @pytest.mark.anyio
@@ -69,3 +72,464 @@ async def test_team_and_user_not_found_errors(client, unique_suffix):
     assert resp.status_code == 404, resp.text
     err2 = resp.json()["error"]
     assert err2["code"] == "NOT_FOUND"
+
+
+@pytest.mark.e2e
+@pytest.mark.anyio
+async def test_get_review_paginates_with_cursor_and_status(client, unique_suffix):
+    team_name = f"review-pages-{unique_suffix}"
+    author = f"{team_name}-author"
+    reviewer = f"{team_name}-reviewer"
+
+    resp = await client.post(
+        "/team/add",
+        json={
+            "team_name": team_name,
+            "members": [
+                {"user_id": author, "username": "Author", "is_active": True},
+                {"user_id": reviewer, "username": "Reviewer", "is_active": True},
+            ],
+        },
+    )
+    assert resp.status_code == 201, resp.text
+
+    pr_ids = [f"{team_name}-pr-{i}" for i in range(3)]
+    for pr_id in pr_ids:
+        resp = await client.post(
+            "/pullRequest/create",
+            json={
+                "pull_request_id": pr_id,
+                "pull_request_name": "paged PR",
+                "author_id": author,
+            },
+        )
+        assert resp.status_code == 201, resp.text
+
+    resp = await client.post("/pullRequest/merge", json={"pull_request_id": pr_ids[0]})
+    assert resp.status_code == 200, resp.text
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"user_id": reviewer, "status": "OPEN", "limit": 1}
+        if cursor:
+            params["cursor"] = cursor
+        resp = await client.get("/users/getReview", params=params)
+        assert resp.status_code == 200, resp.text
+        body = resp.json()
+        seen += [p["pull_request_id"] for p in body["pull_requests"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == pr_ids[1:]
+
+    # Без limit — весь список одним ответом
+    resp = await client.get("/users/getReview", params={"user_id": reviewer})
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert [p["pull_request_id"] for p in body["pull_requests"]] == pr_ids
+    assert body["next_cursor"] is None
+
+    resp = await client.get(
+        "/users/getReview", params={"user_id": f"nobody-{unique_suffix}"}
+    )
+    assert resp.status_code == 404, resp.text
+
+
+@pytest.mark.e2e
+@pytest.mark.anyio
+async def test_team_and_review_reads_support_etag(client, unique_suffix):
+    team_name = f"etag-{unique_suffix}"
+    author = f"{team_name}-author"
+    reviewer = f"{team_name}-reviewer"
+
+    resp = await client.post(
+        "/team/add",
+        json={
+            "team_name": team_name,
+            "members": [
+                {"user_id": author, "username": "Author", "is_active": True},
+                {"user_id": reviewer, "username": "Reviewer", "is_active": True},
+            ],
+        },
+    )
+    assert resp.status_code == 201, resp.text
+
+    resp = await client.get("/team/get", params={"team_name": team_name})
+    assert resp.status_code == 200, resp.text
+    team_etag = resp.headers["ETag"]
+
+    resp = await client.get(
+        "/team/get",
+        params={"team_name": team_name},
+        headers={"If-None-Match": team_etag},
+    )
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == team_etag
+    assert resp.content == b""
+
+    resp = await client.get("/users/getReview", params={"user_id": reviewer})
+    assert resp.status_code == 200, resp.text
+    review_etag = resp.headers["ETag"]
+
+    pr_id = f"{team_name}-pr"
+    resp = await client.post(
+        "/pullRequest/create",
+        json={
+            "pull_request_id": pr_id,
+            "pull_request_name": "etag PR",
+            "author_id": author,
+        },
+    )
+    assert resp.status_code == 201, resp.text
+
+    # Новое назначение меняет ETag ревьюера, но не команды
+    resp = await client.get(
+        "/users/getReview",
+        params={"user_id": reviewer},
+        headers={"If-None-Match": review_etag},
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["ETag"] != review_etag
+    assert [p["pull_request_id"] for p in resp.json()["pull_requests"]] == [pr_id]
+    review_etag = resp.headers["ETag"]
+
+    resp = await client.get(
+        "/users/getReview",
+        params={"user_id": reviewer, "status": "OPEN"},
+        headers={"If-None-Match": f'"other", {review_etag}'},
+    )
+    assert resp.status_code == 304
+
+    resp = await client.get(
+        "/team/get",
+        params={"team_name": team_name},
+        headers={"If-None-Match": team_etag},
+    )
+    assert resp.status_code == 304
+
+    resp = await client.post(
+        "/users/setIsActive",
+        json={"user_id": reviewer, "is_active": False},
+    )
+    assert resp.status_code == 200, resp.text
+
+    resp = await client.get(
+        "/team/get",
+        params={"team_name": team_name},
+        headers={"If-None-Match": team_etag},
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["ETag"] != team_etag
+
+
+@pytest.mark.e2e
+@pytest.mark.anyio
+async def test_review_stats_streams_ndjson(client, unique_suffix):
+    team_name = f"stats-{unique_suffix}"
+    author = f"{team_name}-author"
+    reviewer = f"{team_name}-reviewer"
+
+    resp = await client.post(
+        "/team/add",
+        json={
+            "team_name": team_name,
+            "members": [
+                {"user_id": author, "username": "Author", "is_active": True},
+                {"user_id": reviewer, "username": "Reviewer", "is_active": True},
+            ],
+        },
+    )
+    assert resp.status_code == 201, resp.text
+
+    pr_id = f"{team_name}-pr"
+    resp = await client.post(
+        "/pullRequest/create",
+        json={
+            "pull_request_id": pr_id,
+            "pull_request_name": "stats PR",
+            "author_id": author,
+        },
+    )
+    assert resp.status_code == 201, resp.text
+
+    resp = await client.get("/stats/review", headers={"Accept": "application/x-ndjson"})
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert {
+        "type": "user",
+        "user_id": reviewer,
+        "reviews_assigned": 1,
+    } in lines
+    assert {
+        "type": "pull_request",
+        "pull_request_id": pr_id,
+        "reviewers_assigned": 1,
+    } in lines
+
+    # По умолчанию — прежний JSON; no-cache ждёт пересчёта, а не снимок
+    resp = await client.get("/stats/review", headers={"Cache-Control": "no-cache"})
+    assert resp.status_code == 200, resp.text
+    assert int(resp.headers["Age"]) == 0
+    body = resp.json()
+    assert {"user_id": reviewer, "reviews_assigned": 1} in body["by_user"]
+    assert {"pull_request_id": pr_id, "reviewers_assigned": 1} in body[
+        "by_pull_request"
+    ]
+
+    # Без no-cache — снимок из кэша с его возрастом
+    resp = await client.get("/stats/review")
+    assert resp.status_code == 200, resp.text
+    assert int(resp.headers["Age"]) >= 0
+
+
+@pytest.mark.e2e
+@pytest.mark.anyio
+async def test_daily_stats_returns_team_rollups(client, unique_suffix):
+    resp = await client.get("/stats/daily", params={"team_name": "missing-team"})
+    assert resp.status_code == 404, resp.text
+    assert resp.json()["error"]["code"] == "NOT_FOUND"
+
+    team_name = f"daily-{unique_suffix}"
+    resp = await client.post(
+        "/team/add",
+        json={
+            "team_name": team_name,
+            "members": [
+                {"user_id": f"{team_name}-u1", "username": "U1", "is_active": True}
+            ],
+        },
+    )
+    assert resp.status_code == 201, resp.text
+
+    resp = await client.get("/stats/daily", params={"team_name": team_name, "days": 7})
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    # Срезы пересчитываются в фоне: новая команда может быть ещё пустой
+    assert body["team_name"] == team_name
+    assert isinstance(body["days"], list)
+    assert isinstance(body["reviewers"], list)
+
+    resp = await client.get("/stats/daily", params={"team_name": team_name, "days": 0})
+    assert resp.status_code == 422
+
+
+@pytest.mark.e2e
+@pytest.mark.anyio
+async def test_team_import_accepts_ndjson_and_csv(client, unique_suffix):
+    team_a = f"import-a-{unique_suffix}"
+    team_b = f"import-b-{unique_suffix}"
+    ndjson = "\n".join(
+        [
+            json.dumps(
+                {
+                    "team_name": team_a,
+                    "members": [
+                        {
+                            "user_id": f"{team_a}-u1",
+                            "username": "A1",
+                            "is_active": True,
+                        },
+                        {
+                            "user_id": f"{team_a}-u2",
+                            "username": "A2",
+                            "is_active": False,
+                        },
+                    ],
+                }
+            ),
+            "{broken",
+            json.dumps({"team_name": team_b}),
+        ]
+    )
+
+    resp = await client.post(
+        "/team/import",
+        content=ndjson,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["teams"] == [
+        {"team_name": team_a, "created": True, "members": 2},
+        {"team_name": team_b, "created": True, "members": 0},
+    ]
+    assert body["users_imported"] == 2
+    assert body["rejected_total"] == 1
+    assert body["rejected"] == [{"line": 2, "error": "invalid json"}]
+
+    csv_body = f"team_name,user_id,username,is_active\n{team_b},{team_a}-u2,A2,true\n"
+    resp = await client.post(
+        "/team/import", content=csv_body, headers={"Content-Type": "text/csv"}
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["teams"] == [
+        {"team_name": team_b, "created": False, "members": 1}
+    ]
+
+    resp = await client.get("/team/get", params={"team_name": team_b})
+    assert resp.json()["members"] == [
+        {"user_id": f"{team_a}-u2", "username": "A2", "is_active": True}
+    ]
+
+    resp = await client.post(
+        "/team/import", content="team\nx\n", headers={"Content-Type": "text/csv"}
+    )
+    assert resp.status_code == 400
+    assert resp.json()["error"]["code"] == "INVALID_IMPORT"
+
+    resp = await client.post(
+        "/team/import", content="{}", headers={"Content-Type": "application/json"}
+    )
+    assert resp.status_code == 415
+    assert resp.json()["error"]["code"] == "UNSUPPORTED_MEDIA_TYPE"
+
+
+@pytest.mark.e2e
+@pytest.mark.anyio
+async def test_team_get_pages_filters_and_summarizes(client, unique_suffix):
+    team_name = f"pool-{unique_suffix}"
+    members = [
+        {"user_id": f"{team_name}-u{i}", "username": f"U{i}", "is_active": i != 1}
+        for i in range(4)
+    ]
+    resp = await client.post(
+        "/team/add", json={"team_name": team_name, "members": members}
+    )
+    assert resp.status_code == 201, resp.text
+
+    # Без параметров — прежний ответ
+    resp = await client.get("/team/get", params={"team_name": team_name})
+    assert resp.json() == {"team_name": team_name, "members": members}
+
+    resp = await client.get(
+        "/team/get",
+        params={
+            "team_name": team_name,
+            "active_only": "true",
+            "limit": 2,
+            "fields": ["user_id", "username"],
+        },
+    )
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["members"] == [
+        {"user_id": f"{team_name}-u0", "username": "U0"},
+        {"user_id": f"{team_name}-u2", "username": "U2"},
+    ]
+    assert body["next_cursor"] == f"{team_name}-u2"
+
+    resp = await client.get(
+        "/team/get",
+        params={
+            "team_name": team_name,
+            "active_only": "true",
+            "limit": 2,
+            "cursor": body["next_cursor"],
+        },
+    )
+    body = resp.json()
+    assert [m["user_id"] for m in body["members"]] == [f"{team_name}-u3"]
+    assert "next_cursor" not in body
+
+    resp = await client.get(
+        "/team/get", params={"team_name": team_name, "summary": "true"}
+    )
+    assert resp.json() == {"team_name": team_name, "member_count": 4}
+
+    resp = await client.get("/team/get", params={"team_name": team_name, "fields": "x"})
+    assert resp.status_code == 422
+
+
+@pytest.mark.e2e
+@pytest.mark.anyio
+async def test_set_is_active_batch_reassigns_open_reviews(client, unique_suffix):
+    team_name = f"hr-{unique_suffix}"
+    author = f"{team_name}-author"
+    leaving = f"{team_name}-leaving"
+    spare = f"{team_name}-spare"
+    resp = await client.post(
+        "/team/add",
+        json={
+            "team_name": team_name,
+            "members": [
+                {"user_id": author, "username": "Author", "is_active": True},
+                {"user_id": leaving, "username": "Leaving", "is_active": True},
+                {"user_id": spare, "username": "Spare", "is_active": False},
+            ],
+        },
+    )
+    assert resp.status_code == 201, resp.text
+
+    pr_id = f"{team_name}-pr"
+    resp = await client.post(
+        "/pullRequest/create",
+        json={"pull_request_id": pr_id, "pull_request_name": "PR", "author_id": author},
+    )
+    assert resp.status_code == 201, resp.text
+    assert resp.json()["pr"]["assigned_reviewers"] == [leaving]
+
+    resp = await client.post(
+        "/users/setIsActiveBatch",
+        json={
+            "items": [
+                {"user_id": spare, "is_active": True},
+                {"user_id": leaving, "is_active": False},
+                {"user_id": f"{team_name}-ghost", "is_active": False},
+            ],
+            "reassign_open_reviews": True,
+        },
+    )
+    assert resp.status_code == 200, resp.text
+    results = resp.json()["results"]
+    assert [(r["user_id"], r["status"]) for r in results] == [
+        (spare, "UPDATED"),
+        (leaving, "UPDATED"),
+        (f"{team_name}-ghost", "NOT_FOUND"),
+    ]
+    assert results[1]["reassigned_reviews"] == 1
+    assert results[1]["user"]["is_active"] is False
+
+    resp = await client.get("/users/getReview", params={"user_id": spare})
+    assert [pr["pull_request_id"] for pr in resp.json()["pull_requests"]] == [pr_id]
+
+
+@pytest.mark.e2e
+@pytest.mark.anyio
+async def test_set_is_active_batch_rejects_empty_and_oversized_batches(client):
+    resp = await client.post("/users/setIsActiveBatch", json={"items": []})
+    assert resp.status_code == 422
+
+    items = [
+        {"user_id": f"u{i}", "is_active": False}
+        for i in range(settings.BATCH_MAX_ITEMS + 1)
+    ]
+    resp = await client.post("/users/setIsActiveBatch", json={"items": items})
+    assert resp.status_code == 422
+
+
+@pytest.mark.e2e
+@pytest.mark.anyio
+async def test_db_metrics_report_compiled_cache_hits(client, unique_suffix):
+    user_id = f"u-metrics-{unique_suffix}"
+    resp = await client.post(
+        "/team/add",
+        json={
+            "team_name": f"metrics-{unique_suffix}",
+            "members": [{"user_id": user_id, "username": "Alice", "is_active": True}],
+        },
+    )
+    assert resp.status_code == 201
+
+    for _ in range(2):
+        resp = await client.get("/users/getReview", params={"user_id": user_id})
+        assert resp.status_code == 200
+
+    resp = await client.get("/metrics/db")
+    assert resp.status_code == 200
+    cache = resp.json()["compiled_cache"]
+    assert cache["hits"] >= 1
+    assert 0 < cache["hit_rate"] <= 1
@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+
+from app.core.cache import StaleWhileRevalidateCache, TeamRosterCache
+
+
+def test_get_counts_hits_and_misses():
+    cache = TeamRosterCache(max_size=2)
+
+    assert cache.get("backend", 0) is None
+    cache.put("backend", ["u1", "u2"], 0)
+
+    assert cache.get("backend", 0) == ("u1", "u2")
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_put_evicts_least_recently_used_team():
+    cache = TeamRosterCache(max_size=2)
+
+    cache.put("a", ["u1"], 0)
+    cache.put("b", ["u2"], 0)
+    cache.get("a", 0)
+    cache.put("c", ["u3"], 0)
+
+    assert len(cache) == 2
+    assert cache.get("b", 0) is None
+    assert cache.get("a", 0) == ("u1",)
+    assert cache.get("c", 0) == ("u3",)
+
+
+def test_invalidate_removes_team():
+    cache = TeamRosterCache(max_size=2)
+    cache.put("a", ["u1"], 0)
+    cache.put("b", ["u2"], 0)
+
+    cache.invalidate("a", None)
+
+    assert cache.get("a", 0) is None
+    assert cache.get("b", 0) == ("u2",)
+
+
+def test_get_with_other_team_version_misses():
+    cache = TeamRosterCache(max_size=2)
+    cache.put("a", ["u1"], 3)
+
+    # Состав поменяли в другом процессе: версия команды в БД уже другая
+    assert cache.get("a", 4) is None
+    assert cache.misses == 1
+
+    cache.put("a", ["u2"], 4)
+    assert cache.get("a", 4) == ("u2",)
+
+
+def test_zero_size_disables_cache():
+    cache = TeamRosterCache(max_size=0)
+
+    cache.put("a", ["u1"], 0)
+
+    assert cache.get("a", 0) is None
+    assert len(cache) == 0
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingLoader:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self) -> int:
+        self.calls += 1
+        await self.release.wait()
+        return self.calls
+
+
+async def test_swr_concurrent_misses_share_one_load():
+    cache = StaleWhileRevalidateCache(ttl=10, max_stale=60, clock=FakeClock())
+    load = CountingLoader()
+    load.release.clear()
+
+    pending = [asyncio.create_task(cache.get(load)) for _ in range(20)]
+    await asyncio.sleep(0)
+    load.release.set()
+    results = await asyncio.gather(*pending)
+
+    assert load.calls == 1
+    assert results == [(1, 0.0)] * 20
+    assert cache.misses == 20
+
+
+async def test_swr_serves_fresh_value_without_load():
+    clock = FakeClock()
+    cache = StaleWhileRevalidateCache(ttl=10, max_stale=60, clock=clock)
+    load = CountingLoader()
+
+    await cache.get(load)
+    clock.now = 5
+
+    assert await cache.get(load) == (1, 5)
+    assert load.calls == 1
+    assert cache.hits == 1
+
+
+async def test_swr_serves_stale_value_and_refreshes_once_in_background():
+    clock = FakeClock()
+    cache = StaleWhileRevalidateCache(ttl=10, max_stale=60, clock=clock)
+    load = CountingLoader()
+    await cache.get(load)
+
+    clock.now = 30
+    load.release.clear()
+    assert await cache.get(load) == (1, 30)
+    assert await cache.get(load) == (1, 30)
+    assert cache.stale_hits == 2
+
+    load.release.set()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert load.calls == 2
+    assert await cache.get(load) == (2, 0)
+
+
+async def test_swr_waits_for_load_when_too_stale_or_refresh_requested():
+    clock = FakeClock()
+    cache = StaleWhileRevalidateCache(ttl=10, max_stale=60, clock=clock)
+    load = CountingLoader()
+    await cache.get(load)
+
+    clock.now = 71
+    assert await cache.get(load) == (2, 0)
+
+    assert await cache.get(load, refresh=True) == (3, 0)
+    assert load.calls == 3
+
+
+async def test_swr_failed_load_is_retried_by_next_request():
+    cache = StaleWhileRevalidateCache(ttl=10, max_stale=60, clock=FakeClock())
+    calls = 0
+
+    async def load() -> str:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("db down")
+        return "ok"
+
+    with pytest.raises(RuntimeError):
+        await cache.get(load)
+    await asyncio.sleep(0)
+
+    assert await cache.get(load) == ("ok", 0)
@@ -0,0 +1,87 @@
+import pytest_asyncio
+from sqlalchemy import bindparam, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.cache import team_roster_cache
+from app.core.config import settings
+from app.core.db import Base
+from app.core.db.metrics import CompiledCacheStats
+from app.repositories import PullRequestRepository, TeamRepository
+from app.schemas import PullRequestCreatePayload, TeamMember, TeamWithMembers
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine(settings.get_async_database_test_uri)
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def session(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    team_roster_cache.clear()
+
+    maker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    async with maker() as session:
+        yield session
+    team_roster_cache.clear()
+
+
+async def test_compiled_cache_stats_count_hits_misses_and_uncached(engine):
+    stats = CompiledCacheStats()
+    stats.track(engine)
+    stmt = select(literal_column("1")).where(bindparam("x") > 0)
+
+    assert stats.hit_rate is None
+
+    async with engine.connect() as conn:
+        for x in (1, 2, 3):
+            await conn.execute(stmt, {"x": x})
+        await conn.exec_driver_sql("SELECT 1")
+
+    assert (stats.hits, stats.misses, stats.uncached) == (2, 1, 1)
+    assert stats.hit_rate == 2 / 4
+
+    stats.clear()
+    assert (stats.hits, stats.misses, stats.uncached) == (0, 0, 0)
+
+
+async def test_create_team_and_pull_requests_are_cached(engine, session):
+    stats = CompiledCacheStats()
+    stats.track(engine)
+    teams = TeamRepository(session)
+    prs = PullRequestRepository(session)
+
+    for team_idx in range(2):
+        await teams.create_team_with_members(
+            TeamWithMembers(
+                team_name=f"team-{team_idx}",
+                members=[
+                    TeamMember(
+                        user_id=f"u{team_idx}-{i}", username=f"User {i}", is_active=True
+                    )
+                    for i in range(3)
+                ],
+            )
+        )
+    for pr_idx in range(3):
+        await prs.create_pull_request(f"pr-{pr_idx}", "Title", "u0-0")
+    for batch_idx in range(2):
+        await prs.create_pull_requests_batch(
+            [
+                PullRequestCreatePayload(
+                    pull_request_id=f"batch-{batch_idx}-{i}",
+                    pull_request_name="Title",
+                    author_id="u1-0",
+                )
+                for i in range(3)
+            ]
+        )
+
+    assert stats.uncached == 0
+    assert stats.hits > 0
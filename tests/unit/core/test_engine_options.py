@@ -0,0 +1,84 @@
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import DatabaseProfile, Settings, settings
+from app.core.db.connect import engine_options
+
+
+def test_direct_profile_uses_pool_and_statement_cache_settings():
+    config = Settings(
+        DB_POOL_SIZE=7,
+        DB_MAX_OVERFLOW=3,
+        DB_POOL_TIMEOUT=2.5,
+        DB_POOL_RECYCLE=-1,
+        DB_POOL_PRE_PING=True,
+        DB_STATEMENT_CACHE_SIZE=50,
+        _env_file=None,
+    )
+
+    options = engine_options(config)
+
+    assert options == {
+        "pool_size": 7,
+        "max_overflow": 3,
+        "pool_timeout": 2.5,
+        "pool_recycle": -1,
+        "pool_pre_ping": True,
+        "connect_args": {
+            "statement_cache_size": 50,
+            "prepared_statement_cache_size": 50,
+        },
+    }
+
+
+def test_pgbouncer_profile_disables_pool_and_statement_caches():
+    config = Settings(DB_PROFILE=DatabaseProfile.PGBOUNCER, _env_file=None)
+
+    options = engine_options(config)
+
+    assert config.DB_STATEMENT_CACHE_SIZE == 0
+    assert options["poolclass"] is NullPool
+    connect_args = options["connect_args"]
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    name_func = connect_args["prepared_statement_name_func"]
+    assert name_func() != name_func()
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"DB_PROFILE": "pgbouncer", "DB_STATEMENT_CACHE_SIZE": 100},
+        {"DB_POOL_SIZE": 0},
+        {"DB_MAX_OVERFLOW": -1},
+        {"DB_POOL_TIMEOUT": 0},
+        {"DB_PROFILE": "session"},
+    ],
+)
+def test_invalid_database_profile_is_rejected(overrides):
+    with pytest.raises(ValidationError):
+        Settings(**overrides, _env_file=None)
+
+
+async def test_pgbouncer_profile_prepares_uniquely_named_statements():
+    engine = create_async_engine(
+        settings.get_async_database_test_uri,
+        **engine_options(
+            Settings(DB_PROFILE=DatabaseProfile.PGBOUNCER, _env_file=None)
+        ),
+    )
+    try:
+        async with engine.connect() as conn:
+            for _ in range(3):
+                await conn.execute(text("SELECT 1"))
+            names = (
+                await conn.scalars(text("SELECT name FROM pg_prepared_statements"))
+            ).all()
+    finally:
+        await engine.dispose()
+
+    assert names
+    assert not any(name.startswith("__asyncpg_stmt_") for name in names)
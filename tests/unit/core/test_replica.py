@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.db import connect
+from app.core.db.replica import ReplicaLagMonitor
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_monitor(lags, clock=None, **kwargs) -> ReplicaLagMonitor:
+    """
+    Монитор без БД: отставание при каждой проверке берётся из `lags`
+    (исключение в списке — реплика недоступна).
+    """
+    monitor = ReplicaLagMonitor(
+        engine=None,
+        max_lag=5.0,
+        check_interval=1.0,
+        clock=clock or FakeClock(),
+        **kwargs,
+    )
+    lags = iter(lags)
+
+    async def fetch_lag() -> float:
+        lag = next(lags)
+        if isinstance(lag, Exception):
+            raise lag
+        return lag
+
+    monitor._fetch_lag = fetch_lag
+    return monitor
+
+
+async def test_replica_lag_is_zero_for_database_not_in_recovery():
+    engine = create_async_engine(settings.get_async_database_test_uri)
+    monitor = ReplicaLagMonitor(engine, max_lag=5.0, check_interval=1.0)
+    try:
+        assert await monitor.is_fresh() is True
+        assert monitor.lag == 0.0
+    finally:
+        await engine.dispose()
+
+
+async def test_replica_lag_above_threshold_falls_back_and_recovers():
+    clock = FakeClock()
+    monitor = make_monitor([0.5, 12.0, 3.0], clock=clock)
+
+    assert await monitor.is_fresh() is True
+    clock.now = 1.0
+    assert await monitor.is_fresh() is False
+    assert monitor.lag == 12.0
+    clock.now = 2.0
+    assert await monitor.is_fresh() is True
+
+
+async def test_replica_lag_is_checked_once_per_interval():
+    clock = FakeClock()
+    monitor = make_monitor([0.0, 0.0], clock=clock)
+
+    for _ in range(10):
+        await monitor.is_fresh()
+    assert monitor.checks == 1
+
+    clock.now = 1.0
+    await monitor.is_fresh()
+    assert monitor.checks == 2
+
+
+async def test_replica_unreachable_or_slow_is_not_fresh():
+    monitor = make_monitor([OSError("connection refused")])
+    assert await monitor.is_fresh() is False
+    assert monitor.lag is None
+
+    slow = ReplicaLagMonitor(engine=None, max_lag=5.0, check_interval=1.0, timeout=0.01)
+
+    async def hang() -> float:
+        await asyncio.sleep(10)
+        return 0.0
+
+    slow._fetch_lag = hang
+    assert await slow.is_fresh() is False
+
+
+async def test_concurrent_reads_share_one_lag_check():
+    monitor = make_monitor([0.0])
+    release = asyncio.Event()
+    fetch_lag = monitor._fetch_lag
+
+    async def blocked_fetch_lag() -> float:
+        await release.wait()
+        return await fetch_lag()
+
+    monitor._fetch_lag = blocked_fetch_lag
+
+    pending = [asyncio.create_task(monitor.is_fresh()) for _ in range(20)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*pending) == [True] * 20
+    assert monitor.checks == 1
+
+
+@pytest.mark.parametrize(
+    "replica_configured, lag, expected",
+    [
+        (False, None, "primary"),
+        (True, 1.0, "replica"),
+        (True, 60.0, "primary"),
+    ],
+)
+async def test_get_read_sessionmaker_routes_by_replica_lag(
+    monkeypatch, replica_configured, lag, expected
+):
+    primary, replica = object(), object()
+    monkeypatch.setattr(connect, "async_session", primary)
+    monkeypatch.setattr(
+        connect, "replica_session", replica if replica_configured else None
+    )
+    monkeypatch.setattr(
+        connect,
+        "replica_monitor",
+        make_monitor([lag]) if replica_configured else None,
+    )
+
+    session_maker = await connect.get_read_sessionmaker()
+
+    assert session_maker is {"primary": primary, "replica": replica}[expected]
@@ -2,6 +2,7 @@ import pytest
 import pytest_asyncio
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from app.core.cache import team_roster_cache
 from app.core.config import settings
 from app.core.db import Base
 from app.repositories import TeamRepository, UserRepository
@@ -9,6 +10,17 @@ from app.repositories import TeamRepository, UserRepository
 TEST_DATABASE_URL = settings.get_async_database_test_uri
 
 
+@pytest.fixture(autouse=True)
+def clear_team_roster_cache():
+    """
+    Схема пересоздаётся на каждый тест, поэтому кэш составов команд
+    тоже должен начинаться с чистого листа.
+    """
+    team_roster_cache.clear()
+    yield
+    team_roster_cache.clear()
+
+
 @pytest_asyncio.fixture
 async def engine():
     """
@@ -1,17 +1,28 @@
+import asyncio
+import random
+from datetime import datetime
+
 import pytest
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
+from app.core.cache import TeamRosterCache, team_roster_cache
+from app.core.config import AssignmentStrategy
 from app.core.exceptions import (
     AlreadyExistsError,
+    ConcurrentUpdateError,
     NoReplacementCandidateError,
     NotFoundError,
     PullRequestMergedError,
     ReviewerNotAssignedError,
 )
 from app.models import PRReviewer, PullRequest, Team, User
+from app.models.deactivation_jobs import JobStatus
 from app.models.pull_requests import PRStatus
-from app.repositories import PullRequestRepository
+from app.repositories import PullRequestRepository, UserRepository
+from app.repositories import pull_request_repository as pr_module
+from app.schemas import PullRequestBatchItemStatus, PullRequestCreatePayload
+from app.services.deactivation_job_worker import DeactivationJobWorker
 
 
 @pytest.fixture
@@ -184,6 +195,72 @@ async def test_create_pull_request_with_single_candidate_assigns_one(
     assert reviewer_ids[0] == "rev-1"
 
 
+@pytest.mark.asyncio
+async def test_create_pull_request_persists_pr_and_reviewers(
+    pr_repo: PullRequestRepository,
+    session: AsyncSession,
+):
+    team = Team(name="team-persist")
+    author = User(
+        id="author-1",
+        username="author",
+        is_active=True,
+        team_name="team-persist",
+    )
+    reviewer = User(
+        id="rev-1",
+        username="rev",
+        is_active=True,
+        team_name="team-persist",
+    )
+    session.add_all([team, author, reviewer])
+    await session.commit()
+
+    pr = await pr_repo.create_pull_request(
+        pr_id="pr-1",
+        title="Title",
+        author_id="author-1",
+    )
+
+    assert pr.status == PRStatus.OPEN
+    assert pr.merged_at is None
+
+    pr_db = await session.get(PullRequest, "pr-1")
+    assert pr_db is not None
+    assert pr_db.title == "Title"
+
+    stmt = select(PRReviewer.reviewer_id).where(PRReviewer.pr_id == "pr-1")
+    assert set(await session.scalars(stmt)) == {"rev-1"}
+
+
+@pytest.mark.asyncio
+async def test_create_pull_request_existing_pr_wins_over_missing_author(
+    pr_repo: PullRequestRepository,
+    session: AsyncSession,
+):
+    team = Team(name="team-1")
+    author = User(
+        id="author-1",
+        username="author",
+        is_active=True,
+        team_name="team-1",
+    )
+    pr_existing = PullRequest(
+        id="pr-1",
+        title="Existing PR",
+        author_id="author-1",
+    )
+    session.add_all([team, author, pr_existing])
+    await session.commit()
+
+    with pytest.raises(AlreadyExistsError):
+        await pr_repo.create_pull_request(
+            pr_id="pr-1",
+            title="New title",
+            author_id="unknown-author",
+        )
+
+
 @pytest.mark.asyncio
 async def test_merge_pull_request_raises_if_not_found(
     pr_repo: PullRequestRepository,
@@ -298,6 +375,306 @@ async def test_reassign_reviewer_success(
     assert new_reviewer_id == "rev-new"
 
 
+@pytest.mark.asyncio
+async def test_concurrent_reassign_on_same_pr_keeps_reviewers_consistent(
+    engine: AsyncEngine,
+    session: AsyncSession,
+):
+    team = Team(name="team-race")
+    users = [
+        User(id=f"u{i}", username=f"u{i}", is_active=True, team_name="team-race")
+        for i in range(6)
+    ]
+    session.add_all([team, *users])
+    await session.commit()
+
+    pr = await PullRequestRepository(session).create_pull_request("pr-1", "PR", "u0")
+    old_reviewer_ids = [r.reviewer_id for r in pr.reviewers]
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def reassign(old_reviewer_id: str) -> str:
+        async with session_maker() as other_session:
+            repo = PullRequestRepository(other_session)
+            try:
+                await repo.reassign_reviewer("pr-1", old_reviewer_id)
+            except ReviewerNotAssignedError:
+                return "not_assigned"
+            return "ok"
+
+    # каждый текущий ревьюер переназначается несколькими запросами сразу
+    outcomes = await asyncio.gather(
+        *(reassign(rid) for rid in old_reviewer_ids for _ in range(5))
+    )
+
+    # гонки заканчиваются обычным 409, а не IntegrityError/deadlock;
+    # замена может вернуть ранее снятого ревьюера, поэтому "ok" бывает больше
+    assert set(outcomes) <= {"ok", "not_assigned"}
+    assert outcomes.count("ok") >= len(old_reviewer_ids)
+
+    session.expire_all()
+    stmt = select(PRReviewer.reviewer_id).where(PRReviewer.pr_id == "pr-1")
+    reviewer_ids = list(await session.scalars(stmt))
+    assert len(reviewer_ids) == len(set(reviewer_ids)) == 2
+    assert "u0" not in reviewer_ids
+
+    loads = await _open_reviews(session)
+    assert {uid for uid, load in loads.items() if load} == set(reviewer_ids)
+    assert sum(loads.values()) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", list(AssignmentStrategy))
+async def test_concurrent_create_and_merge_on_same_team_do_not_deadlock(
+    engine: AsyncEngine,
+    session: AsyncSession,
+    strategy: AssignmentStrategy,
+):
+    team = Team(name="team-race")
+    users = [
+        User(id=f"u{i}", username=f"u{i}", is_active=True, team_name="team-race")
+        for i in range(4)
+    ]
+    session.add_all([team, *users])
+    await session.commit()
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def create(worker: int, prefix: str) -> None:
+        async with session_maker() as other_session:
+            repo = PullRequestRepository(other_session, assignment_strategy=strategy)
+            for i in range(5):
+                await repo.create_pull_request(
+                    f"{prefix}-{worker}-{i}", "PR", f"u{(worker + i) % 4}"
+                )
+
+    async def merge(worker: int) -> None:
+        async with session_maker() as other_session:
+            repo = PullRequestRepository(other_session, assignment_strategy=strategy)
+            for i in range(5):
+                await repo.merge_pull_request(f"pr-{worker}-{i}")
+
+    # все PR делят одних и тех же ревьюеров: счётчики каждого create и
+    # merge блокируют общие строки users, и без общего порядка это 40P01
+    outcomes = await asyncio.gather(
+        *(create(worker, "pr") for worker in range(8)), return_exceptions=True
+    )
+    assert [repr(o) for o in outcomes if o is not None] == []
+
+    outcomes = await asyncio.gather(
+        *(merge(worker) for worker in range(8)),
+        *(create(worker, "next") for worker in range(8)),
+        return_exceptions=True,
+    )
+    assert [repr(o) for o in outcomes if o is not None] == []
+
+    session.expire_all()
+    stmt = (
+        select(PRReviewer.reviewer_id)
+        .join(PullRequest, PullRequest.id == PRReviewer.pr_id)
+        .where(PullRequest.status == PRStatus.OPEN)
+    )
+    open_assignments = list(await session.scalars(stmt))
+    assert len(open_assignments) == 8 * 5 * 2
+
+    loads = await _open_reviews(session)
+    assert loads == {uid: open_assignments.count(uid) for uid in loads}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_deactivation_create_and_merge_do_not_deadlock(
+    engine: AsyncEngine,
+    session: AsyncSession,
+):
+    team = Team(name="team-race")
+    users = [
+        User(id=f"u{i}", username=f"u{i}", is_active=True, team_name="team-race")
+        for i in range(8)
+    ]
+    session.add_all([team, *users])
+    await session.commit()
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def create(worker: int, prefix: str) -> None:
+        async with session_maker() as other_session:
+            repo = PullRequestRepository(other_session)
+            for i in range(5):
+                await repo.create_pull_request(
+                    f"{prefix}-{worker}-{i}", "PR", f"u{(worker + i) % 8}"
+                )
+
+    async def merge(worker: int) -> None:
+        async with session_maker() as other_session:
+            repo = PullRequestRepository(other_session)
+            for i in range(5):
+                await repo.merge_pull_request(f"pr-{worker}-{i}")
+
+    async def deactivate(user_ids: list[str]) -> None:
+        async with session_maker() as other_session:
+            repo = PullRequestRepository(other_session)
+            await repo.bulk_deactivate_team_users_and_reassign("team-race", user_ids)
+
+    outcomes = await asyncio.gather(
+        *(create(worker, "pr") for worker in range(8)), return_exceptions=True
+    )
+    assert [repr(o) for o in outcomes if o is not None] == []
+
+    # Деактивация меняет счётчики и назначения тех же пользователей и PR,
+    # что параллельные create и merge
+    outcomes = await asyncio.gather(
+        *(deactivate([f"u{i}", f"u{i + 4}"]) for i in range(4)),
+        *(merge(worker) for worker in range(4)),
+        *(create(worker, "next") for worker in range(4)),
+        return_exceptions=True,
+    )
+    assert [repr(o) for o in outcomes if o is not None] == []
+
+    session.expire_all()
+    stmt = (
+        select(PRReviewer.reviewer_id)
+        .join(PullRequest, PullRequest.id == PRReviewer.pr_id)
+        .where(PullRequest.status == PRStatus.OPEN)
+    )
+    open_assignments = list(await session.scalars(stmt))
+    loads = await _open_reviews(session)
+    assert loads == {uid: open_assignments.count(uid) for uid in loads}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_create_and_merge_batches_do_not_deadlock(
+    engine: AsyncEngine,
+    session: AsyncSession,
+):
+    team = Team(name="team-race")
+    users = [
+        User(id=f"u{i}", username=f"u{i}", is_active=True, team_name="team-race")
+        for i in range(4)
+    ]
+    session.add_all([team, *users])
+    await session.commit()
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    pr_ids = [f"pr-{i}" for i in range(640)]
+
+    async def create_batch(worker: int, ids: list[str]) -> None:
+        async with session_maker() as other_session:
+            repo = PullRequestRepository(other_session)
+            items = [
+                PullRequestCreatePayload(
+                    pull_request_id=pr_id,
+                    pull_request_name="PR",
+                    author_id=f"u{(worker + i) % 4}",
+                )
+                for i, pr_id in enumerate(ids)
+            ]
+            for start in range(0, len(items), 20):
+                await repo.create_pull_requests_batch(items[start : start + 20])
+
+    async def merge_batch(worker: int) -> None:
+        async with session_maker() as other_session:
+            repo = PullRequestRepository(other_session)
+            rng = random.Random(worker)
+            for _ in range(10):
+                # Пакеты пересекаются, а строки PR план UPDATE обходит либо
+                # по индексу (в порядке id), либо в физическом порядке —
+                # половине воркеров достаётся первый план, остальным второй
+                if worker % 2:
+                    await other_session.execute(text("SET LOCAL enable_seqscan = off"))
+                    await other_session.execute(
+                        text("SET LOCAL enable_bitmapscan = off")
+                    )
+                await repo.merge_pull_requests_batch(rng.sample(pr_ids, 40))
+
+    outcomes = await asyncio.gather(
+        *(create_batch(worker, pr_ids[worker::8]) for worker in range(8)),
+        return_exceptions=True,
+    )
+    assert [repr(o) for o in outcomes if o is not None] == []
+
+    outcomes = await asyncio.gather(
+        *(merge_batch(worker) for worker in range(8)),
+        *(
+            create_batch(worker, [f"next-{worker}-{i}" for i in range(200)])
+            for worker in range(8)
+        ),
+        return_exceptions=True,
+    )
+    assert [repr(o) for o in outcomes if o is not None] == []
+
+    session.expire_all()
+    stmt = (
+        select(PRReviewer.reviewer_id)
+        .join(PullRequest, PullRequest.id == PRReviewer.pr_id)
+        .where(PullRequest.status == PRStatus.OPEN)
+    )
+    open_assignments = list(await session.scalars(stmt))
+    loads = await _open_reviews(session)
+    assert loads == {uid: open_assignments.count(uid) for uid in loads}
+
+
+@pytest.mark.asyncio
+async def test_reassign_reviewer_sees_deactivation_through_roster_cache(
+    pr_repo: PullRequestRepository,
+    session: AsyncSession,
+):
+    team = Team(name="team-cache")
+    author = User(
+        id="author-1", username="author", is_active=True, team_name="team-cache"
+    )
+    r1 = User(id="rev-1", username="rev1", is_active=True, team_name="team-cache")
+    r2 = User(id="rev-2", username="rev2", is_active=True, team_name="team-cache")
+    pr = PullRequest(id="pr-1", title="PR", author_id="author-1")
+    pr_rev = PRReviewer(pr_id="pr-1", reviewer_id="rev-1")
+    session.add_all([team, author, r1, r2, pr, pr_rev])
+    await session.commit()
+
+    # Первое переназначение прогревает кэш состава команды
+    _, new_reviewer_id = await pr_repo.reassign_reviewer("pr-1", "rev-1")
+    assert new_reviewer_id == "rev-2"
+    assert team_roster_cache.get("team-cache", 0) is not None
+
+    # Деактивация через репозиторий пользователей сбрасывает кэш команды
+    await UserRepository(session).set_is_active("rev-1", False)
+    assert team_roster_cache.get("team-cache", 0) is None
+
+    with pytest.raises(NoReplacementCandidateError):
+        await pr_repo.reassign_reviewer("pr-1", "rev-2")
+
+
+@pytest.mark.asyncio
+async def test_reassign_reviewer_sees_deactivation_from_another_worker(
+    session: AsyncSession,
+):
+    session.add(Team(name="team-cache"))
+    session.add_all(
+        [
+            User(id="author-1", username="a", is_active=True, team_name="team-cache"),
+            User(id="rev-1", username="r1", is_active=True, team_name="team-cache"),
+            User(id="rev-2", username="r2", is_active=True, team_name="team-cache"),
+        ]
+    )
+    session.add(PullRequest(id="pr-1", title="PR", author_id="author-1"))
+    session.add(PRReviewer(pr_id="pr-1", reviewer_id="rev-1"))
+    await session.commit()
+
+    # Свой кэш у каждого воркера: инвалидация в одном не видна другому
+    cache_a = TeamRosterCache(max_size=16)
+    cache_b = TeamRosterCache(max_size=16)
+    repo_a = PullRequestRepository(session, roster_cache=cache_a)
+
+    _, new_reviewer_id = await repo_a.reassign_reviewer("pr-1", "rev-1")
+    assert new_reviewer_id == "rev-2"
+    assert len(cache_a) == 1
+
+    await UserRepository(session, roster_cache=cache_b).set_is_active("rev-1", False)
+
+    # Кэш воркера A ещё хранит rev-1, но версия команды в БД уже другая
+    assert len(cache_a) == 1
+    with pytest.raises(NoReplacementCandidateError):
+        await repo_a.reassign_reviewer("pr-1", "rev-2")
+
+
 @pytest.mark.asyncio
 async def test_reassign_reviewer_raises_if_pr_not_found(
     pr_repo: PullRequestRepository,
@@ -518,6 +895,10 @@ async def test_get_review_stats_by_pr_returns_counts_grouped_by_pr(
 
     await session.commit()
 
+    # Назначения вставлены в обход репозитория: счётчики строим с нуля
+    drift = await pr_repo.reconcile_review_counters()
+    assert drift["pull_requests.reviewers_count"] == [("pr-1", 0, 2), ("pr-2", 0, 1)]
+
     stats = await pr_repo.get_review_stats_by_pr()
     stats_dict = {pr_id: count for pr_id, count in stats}
 
@@ -650,3 +1031,728 @@ async def test_bulk_deactivate_team_users_and_reassign_raises_if_team_not_found(
             team_name="unknown-team",
             user_ids=["u1", "u2"],
         )
+
+
+async def _open_reviews(session: AsyncSession) -> dict[str, int]:
+    session.expire_all()
+    result = await session.execute(select(User.id, User.open_reviews))
+    return dict(result.tuples().all())
+
+
+@pytest.mark.asyncio
+async def test_open_reviews_counter_follows_create_reassign_and_merge(
+    pr_repo: PullRequestRepository,
+    session: AsyncSession,
+):
+    team = Team(name="team-load")
+    author = User(id="author-1", username="a", is_active=True, team_name="team-load")
+    r1 = User(id="rev-1", username="r1", is_active=True, team_name="team-load")
+    r2 = User(id="rev-2", username="r2", is_active=True, team_name="team-load")
+    r3 = User(id="rev-3", username="r3", is_active=True, team_name="team-load")
+    session.add_all([team, author, r1, r2, r3])
+    await session.commit()
+
+    pr = await pr_repo.create_pull_request("pr-1", "PR", "author-1")
+    assigned = {r.reviewer_id for r in pr.reviewers}
+
+    loads = await _open_reviews(session)
+    assert sum(loads.values()) == 2
+    assert all(loads[uid] == 1 for uid in assigned)
+    assert loads["author-1"] == 0
+
+    old_reviewer_id = next(iter(assigned))
+    _, new_reviewer_id = await pr_repo.reassign_reviewer("pr-1", old_reviewer_id)
+
+    loads = await _open_reviews(session)
+    assert loads[old_reviewer_id] == 0
+    assert loads[new_reviewer_id] == 1
+    assert sum(loads.values()) == 2
+
+    await pr_repo.merge_pull_request("pr-1")
+    await pr_repo.merge_pull_request("pr-1")
+
+    loads = await _open_reviews(session)
+    assert set(loads.values()) == {0}
+
+
+async def _review_versions(session: AsyncSession) -> dict[str, int]:
+    session.expire_all()
+    result = await session.execute(select(User.id, User.review_version))
+    return dict(result.tuples().all())
+
+
+@pytest.mark.asyncio
+async def test_review_version_follows_create_reassign_and_merge(
+    pr_repo: PullRequestRepository,
+    user_repo: UserRepository,
+    session: AsyncSession,
+):
+    team = Team(name="team-etag")
+    author = User(id="author-1", username="a", is_active=True, team_name="team-etag")
+    r1 = User(id="rev-1", username="r1", is_active=True, team_name="team-etag")
+    r2 = User(id="rev-2", username="r2", is_active=True, team_name="team-etag")
+    r3 = User(id="rev-3", username="r3", is_active=True, team_name="team-etag")
+    session.add_all([team, author, r1, r2, r3])
+    await session.commit()
+
+    pr = await pr_repo.create_pull_request("pr-1", "PR", "author-1")
+    assigned = {r.reviewer_id for r in pr.reviewers}
+
+    versions = await _review_versions(session)
+    assert {uid for uid, v in versions.items() if v} == assigned
+    assert await user_repo.get_review_version("author-1") == 0
+
+    old_reviewer_id = next(iter(assigned))
+    _, new_reviewer_id = await pr_repo.reassign_reviewer("pr-1", old_reviewer_id)
+
+    before = versions
+    versions = await _review_versions(session)
+    assert versions[old_reviewer_id] == before[old_reviewer_id] + 1
+    assert versions[new_reviewer_id] == before[new_reviewer_id] + 1
+
+    before = versions
+    await pr_repo.merge_pull_request("pr-1")
+    versions = await _review_versions(session)
+    for uid in (assigned - {old_reviewer_id}) | {new_reviewer_id}:
+        assert versions[uid] == before[uid] + 1
+
+    # Повторный merge ничего не меняет
+    await pr_repo.merge_pull_request("pr-1")
+    assert await _review_versions(session) == versions
+
+    assert await user_repo.get_review_version("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_review_stats_counters_follow_writes_and_reconcile(
+    pr_repo: PullRequestRepository,
+    user_repo: UserRepository,
+    session: AsyncSession,
+):
+    team = Team(name="team-stats")
+    author = User(id="author-1", username="a", is_active=True, team_name="team-stats")
+    reviewers = [
+        User(id=f"rev-{i}", username=f"r{i}", is_active=True, team_name="team-stats")
+        for i in range(4)
+    ]
+    session.add_all([team, author, *reviewers])
+    await session.commit()
+
+    pr = await pr_repo.create_pull_request("pr-1", "PR", "author-1")
+    await pr_repo.create_pull_requests_batch(
+        [
+            PullRequestCreatePayload(
+                pull_request_id=f"pr-{i}",
+                pull_request_name="PR",
+                author_id="author-1",
+            )
+            for i in (2, 3)
+        ]
+    )
+    await pr_repo.reassign_reviewer("pr-1", pr.reviewers[0].reviewer_id)
+    await pr_repo.merge_pull_request("pr-2")
+
+    async def actual_stats() -> tuple[dict, dict]:
+        rows = (await session.execute(select(PRReviewer))).scalars().all()
+        by_user: dict[str, int] = {}
+        by_pr: dict[str, int] = {}
+        for row in rows:
+            by_user[row.reviewer_id] = by_user.get(row.reviewer_id, 0) + 1
+            by_pr[row.pr_id] = by_pr.get(row.pr_id, 0) + 1
+        return by_user, by_pr
+
+    by_user, by_pr = await actual_stats()
+    assert dict(await user_repo.get_review_stats_by_user()) == by_user
+    assert dict(await pr_repo.get_review_stats_by_pr()) == by_pr
+    assert by_pr == {"pr-1": 2, "pr-2": 2, "pr-3": 2}
+
+    # Замены некем: ревьюеры снимаются, счётчики PR уменьшаются
+    await pr_repo.bulk_deactivate_team_users_and_reassign(
+        "team-stats", [r.id for r in reviewers]
+    )
+    session.expire_all()
+
+    by_user, by_pr = await actual_stats()
+    assert dict(await user_repo.get_review_stats_by_user()) == by_user
+    assert dict(await pr_repo.get_review_stats_by_pr()) == by_pr
+    assert by_pr == {"pr-2": 2}
+
+    drift = await pr_repo.reconcile_review_counters(fix=False)
+    assert all(rows == [] for rows in drift.values())
+
+    # Порча счётчика: dry-run только сообщает, fix исправляет
+    reviewer_id = next(iter(by_user))
+    await session.execute(
+        update(User).where(User.id == reviewer_id).values(reviews_assigned=99)
+    )
+    await session.commit()
+
+    expected = [(reviewer_id, 99, by_user[reviewer_id])]
+    drift = await pr_repo.reconcile_review_counters(fix=False)
+    assert drift["users.reviews_assigned"] == expected
+    drift = await pr_repo.reconcile_review_counters()
+    assert drift["users.reviews_assigned"] == expected
+    drift = await pr_repo.reconcile_review_counters(fix=False)
+    assert drift["users.reviews_assigned"] == []
+
+
+@pytest.mark.asyncio
+async def test_least_loaded_strategy_picks_least_loaded_reviewers(
+    session: AsyncSession,
+):
+    repo = PullRequestRepository(
+        session, assignment_strategy=AssignmentStrategy.LEAST_LOADED
+    )
+
+    team = Team(name="team-ll")
+    author = User(id="author-1", username="a", is_active=True, team_name="team-ll")
+    busy = User(
+        id="busy", username="b", is_active=True, team_name="team-ll", open_reviews=5
+    )
+    idle_1 = User(id="idle-1", username="i1", is_active=True, team_name="team-ll")
+    idle_2 = User(
+        id="idle-2", username="i2", is_active=True, team_name="team-ll", open_reviews=1
+    )
+    session.add_all([team, author, busy, idle_1, idle_2])
+    await session.commit()
+
+    pr = await repo.create_pull_request("pr-1", "PR", "author-1")
+    assert {r.reviewer_id for r in pr.reviewers} == {"idle-1", "idle-2"}
+
+    # idle-1 уже назначен на этот PR, поэтому на замену остаётся только busy
+    _, new_reviewer_id = await repo.reassign_reviewer("pr-1", "idle-2")
+    assert new_reviewer_id == "busy"
+
+    loads = await _open_reviews(session)
+    assert loads == {"author-1": 0, "busy": 6, "idle-1": 1, "idle-2": 1}
+
+
+@pytest.mark.asyncio
+async def test_bulk_deactivate_moves_open_reviews_to_replacements(
+    pr_repo: PullRequestRepository,
+    session: AsyncSession,
+):
+    team = Team(name="team-bulk-load")
+    author = User(
+        id="author-1", username="a", is_active=True, team_name="team-bulk-load"
+    )
+    r1 = User(id="rev-1", username="r1", is_active=True, team_name="team-bulk-load")
+    r2 = User(id="rev-2", username="r2", is_active=True, team_name="team-bulk-load")
+    session.add_all([team, author, r1, r2])
+    await session.commit()
+
+    await pr_repo.create_pull_request("pr-1", "PR", "author-1")
+
+    await pr_repo.bulk_deactivate_team_users_and_reassign(
+        team_name="team-bulk-load",
+        user_ids=["rev-1", "rev-2"],
+    )
+
+    loads = await _open_reviews(session)
+    assert loads["rev-1"] == 0
+    assert loads["rev-2"] == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_deactivate_spreads_replacements_across_team(
+    pr_repo: PullRequestRepository,
+    session: AsyncSession,
+):
+    team = Team(name="team-spread")
+    other_team = Team(name="team-authors")
+    author = User(id="author-1", username="a", is_active=True, team_name="team-authors")
+    members = [
+        User(id=uid, username=uid, is_active=True, team_name="team-spread")
+        for uid in ["rev-1", "rev-2", "c1", "c2", "c3", "c4"]
+    ]
+    session.add_all([team, other_team, author, *members])
+    await session.flush()
+
+    pr_ids = [f"pr-{i}" for i in range(4)]
+    for pr_id in pr_ids:
+        session.add(
+            PullRequest(
+                id=pr_id,
+                title=pr_id,
+                author_id="author-1",
+                status=PRStatus.OPEN,
+                reviewers=[
+                    PRReviewer(reviewer_id="rev-1"),
+                    PRReviewer(reviewer_id="rev-2"),
+                ],
+            )
+        )
+    await session.execute(
+        update(User)
+        .where(User.id.in_(["rev-1", "rev-2"]))
+        .values(open_reviews=len(pr_ids))
+    )
+    await session.commit()
+
+    deactivated, reassigned, affected = (
+        await pr_repo.bulk_deactivate_team_users_and_reassign(
+            team_name="team-spread",
+            user_ids=["rev-1", "rev-2"],
+        )
+    )
+
+    assert (deactivated, reassigned, affected) == (2, 8, 4)
+
+    session.expire_all()
+    rows = (
+        await session.execute(select(PRReviewer.pr_id, PRReviewer.reviewer_id))
+    ).all()
+    by_pr: dict[str, set[str]] = {}
+    for pr_id, reviewer_id in rows:
+        by_pr.setdefault(pr_id, set()).add(reviewer_id)
+
+    assert all(len(reviewers) == 2 for reviewers in by_pr.values())
+    assert set().union(*by_pr.values()) <= {"c1", "c2", "c3", "c4"}
+
+    # 8 замен на 4 кандидатов расходятся по кругу — по две на каждого
+    loads = await _open_reviews(session)
+    assert [loads[uid] for uid in ["c1", "c2", "c3", "c4"]] == [2, 2, 2, 2]
+    assert loads["rev-1"] == loads["rev-2"] == 0
+
+
+@pytest.mark.asyncio
+async def test_create_pull_requests_batch_reports_status_per_item(
+    pr_repo: PullRequestRepository,
+    session: AsyncSession,
+):
+    team = Team(name="team-batch")
+    author = User(id="author-1", username="a", is_active=True, team_name="team-batch")
+    r1 = User(id="rev-1", username="r1", is_active=True, team_name="team-batch")
+    r2 = User(id="rev-2", username="r2", is_active=True, team_name="team-batch")
+    lonely_team = Team(name="team-lonely")
+    lonely = User(id="lonely", username="l", is_active=True, team_name="team-lonely")
+    existing = PullRequest(id="pr-existing", title="Old", author_id="author-1")
+    session.add_all([team, lonely_team, author, r1, r2, lonely, existing])
+    await session.commit()
+
+    def item(pr_id: str, author_id: str) -> PullRequestCreatePayload:
+        return PullRequestCreatePayload(
+            pull_request_id=pr_id,
+            pull_request_name=f"PR {pr_id}",
+            author_id=author_id,
+        )
+
+    results = await pr_repo.create_pull_requests_batch(
+        [
+            item("pr-1", "author-1"),
+            item("pr-existing", "author-1"),
+            item("pr-2", "unknown"),
+            item("pr-3", "lonely"),
+            item("pr-1", "author-1"),
+        ]
+    )
+
+    statuses = [status for status, _ in results]
+    assert statuses == [
+        PullRequestBatchItemStatus.CREATED,
+        PullRequestBatchItemStatus.PR_EXISTS,
+        PullRequestBatchItemStatus.NOT_FOUND,
+        PullRequestBatchItemStatus.CREATED,
+        PullRequestBatchItemStatus.PR_EXISTS,
+    ]
+
+    pr_1 = results[0][1]
+    assert pr_1.id == "pr-1"
+    assert pr_1.status == PRStatus.OPEN
+    assert {r.reviewer_id for r in pr_1.reviewers} == {"rev-1", "rev-2"}
+    assert results[3][1].reviewers == []
+
+    stmt = select(PRReviewer.pr_id, PRReviewer.reviewer_id).order_by(
+        PRReviewer.reviewer_id
+    )
+    rows = (await session.execute(stmt)).tuples().all()
+    assert rows == [("pr-1", "rev-1"), ("pr-1", "rev-2")]
+
+    loads = await _open_reviews(session)
+    assert loads["rev-1"] == 1
+    assert loads["rev-2"] == 1
+
+
+@pytest.mark.asyncio
+async def test_create_pull_requests_batch_least_loaded_spreads_reviews(
+    session: AsyncSession,
+):
+    repo = PullRequestRepository(
+        session, assignment_strategy=AssignmentStrategy.LEAST_LOADED
+    )
+    team = Team(name="team-spread")
+    users = [
+        User(id=f"u{i}", username=f"u{i}", is_active=True, team_name="team-spread")
+        for i in range(5)
+    ]
+    session.add_all([team, *users])
+    await session.commit()
+
+    items = [
+        PullRequestCreatePayload(
+            pull_request_id=f"pr-{i}", pull_request_name="PR", author_id="u0"
+        )
+        for i in range(4)
+    ]
+    await repo.create_pull_requests_batch(items)
+
+    loads = await _open_reviews(session)
+    assert loads["u0"] == 0
+    assert [loads[f"u{i}"] for i in range(1, 5)] == [2, 2, 2, 2]
+
+
+@pytest.mark.asyncio
+async def test_merge_pull_requests_batch_splits_merged_already_merged_and_missing(
+    pr_repo: PullRequestRepository,
+    session: AsyncSession,
+):
+    team = Team(name="team-merge-batch")
+    author = User(
+        id="author-1", username="a", is_active=True, team_name="team-merge-batch"
+    )
+    reviewer = User(
+        id="rev-1",
+        username="r",
+        is_active=True,
+        team_name="team-merge-batch",
+        open_reviews=2,
+    )
+    pr_1 = PullRequest(id="pr-1", title="PR 1", author_id="author-1")
+    pr_2 = PullRequest(id="pr-2", title="PR 2", author_id="author-1")
+    pr_old = PullRequest(
+        id="pr-old",
+        title="Old",
+        author_id="author-1",
+        status=PRStatus.MERGED,
+        merged_at=datetime(2025, 1, 1, 12, 0, 0),
+    )
+    session.add_all([team, author, reviewer, pr_1, pr_2, pr_old])
+    session.add_all(
+        [
+            PRReviewer(pr_id="pr-1", reviewer_id="rev-1"),
+            PRReviewer(pr_id="pr-2", reviewer_id="rev-1"),
+            PRReviewer(pr_id="pr-old", reviewer_id="rev-1"),
+        ]
+    )
+    await session.commit()
+
+    merged, already_merged, not_found = await pr_repo.merge_pull_requests_batch(
+        ["pr-2", "pr-old", "pr-missing", "pr-1", "pr-2"]
+    )
+
+    assert [pr.id for pr in merged] == ["pr-2", "pr-1"]
+    assert all(pr.status == PRStatus.MERGED for pr in merged)
+    assert all(pr.merged_at is not None for pr in merged)
+    assert all([r.reviewer_id for r in pr.reviewers] == ["rev-1"] for pr in merged)
+
+    assert [pr.id for pr in already_merged] == ["pr-old"]
+    assert already_merged[0].merged_at == datetime(2025, 1, 1, 12, 0, 0)
+
+    assert not_found == ["pr-missing"]
+
+    # Оба открытых ревью rev-1 закрыты одним UPDATE
+    loads = await _open_reviews(session)
+    assert loads["rev-1"] == 0
+
+    merged, already_merged, _ = await pr_repo.merge_pull_requests_batch(["pr-1"])
+    assert merged == []
+    assert [pr.id for pr in already_merged] == ["pr-1"]
+
+
+async def _seed_deactivation_team(session: AsyncSession, pr_count: int) -> None:
+    team = Team(name="team-job")
+    members = [
+        User(id=uid, username=uid, is_active=True, team_name="team-job")
+        for uid in ["author-1", "rev-1", "rev-2", "rev-3"]
+    ]
+    session.add_all([team, *members])
+    await session.flush()
+
+    for i in range(pr_count):
+        session.add(
+            PullRequest(
+                id=f"pr-{i}",
+                title=f"PR {i}",
+                author_id="author-1",
+                status=PRStatus.OPEN,
+                reviewers=[
+                    PRReviewer(reviewer_id="rev-1"),
+                    PRReviewer(reviewer_id="rev-2"),
+                ],
+            )
+        )
+    await session.execute(
+        update(User)
+        .where(User.id.in_(["rev-1", "rev-2"]))
+        .values(open_reviews=pr_count)
+    )
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_deactivation_job_processes_chunks_and_resumes(
+    engine: AsyncEngine,
+    session: AsyncSession,
+    pr_repo: PullRequestRepository,
+):
+    await _seed_deactivation_team(session, pr_count=3)
+
+    job = await pr_repo.create_deactivation_job(
+        team_name="team-job",
+        user_ids=["rev-1", "rev-2"],
+        chunk_size=2,
+    )
+
+    assert job.status == JobStatus.PENDING
+    assert job.deactivated_users == 2
+    assert (await session.get(User, "rev-1")).is_active is False
+
+    job = await pr_repo.run_deactivation_job_chunk(job.id)
+    assert job.status == JobStatus.RUNNING
+    assert job.prs_scanned == 2
+    assert job.last_pr_id == "pr-1"
+
+    # «Рестарт»: новая сессия продолжает с последнего закоммиченного PR
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_maker() as other_session:
+        repo = PullRequestRepository(other_session)
+        job = await repo.run_deactivation_job_chunk(job.id)
+        assert job.prs_scanned == 3
+
+        job = await repo.run_deactivation_job_chunk(job.id)
+        assert job.status == JobStatus.DONE
+        assert job.finished_at is not None
+
+        # rev-3 заменяет одного из двух, второго снимаем без замены
+        assert job.reassigned_reviewers == 3
+        assert job.removed_reviewers == 3
+        assert job.affected_pull_requests == 3
+
+        assert await repo.run_deactivation_job_chunk(job.id) is None
+
+    loads = await _open_reviews(session)
+    assert loads == {"author-1": 0, "rev-1": 0, "rev-2": 0, "rev-3": 3}
+
+
+@pytest.mark.asyncio
+async def test_deactivation_job_worker_finishes_unfinished_jobs(
+    engine: AsyncEngine,
+    session: AsyncSession,
+    pr_repo: PullRequestRepository,
+):
+    await _seed_deactivation_team(session, pr_count=5)
+
+    job = await pr_repo.create_deactivation_job(
+        team_name="team-job",
+        user_ids=["rev-1"],
+        chunk_size=2,
+    )
+
+    worker = DeactivationJobWorker(
+        session_factory=async_sessionmaker(engine, expire_on_commit=False),
+    )
+    await worker.run_pending()
+
+    job = await pr_repo.get_deactivation_job(job.id)
+    await session.refresh(job)
+    assert job.status == JobStatus.DONE
+    assert job.prs_scanned == 5
+    assert job.reassigned_reviewers == 5
+    assert await pr_repo.get_unfinished_deactivation_job_ids() == []
+
+
+@pytest.mark.asyncio
+async def test_retry_conflicts_backs_off_and_raises_concurrent_update_error(
+    engine: AsyncEngine,
+    session: AsyncSession,
+    pr_repo: PullRequestRepository,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    session.add(Team(name="t"))
+    session.add(User(id="u1", username="u1", is_active=True, team_name="t"))
+    await session.commit()
+
+    backoffs: list[float] = []
+    uniform = random.uniform
+
+    def record_backoff(low: float, high: float) -> float:
+        backoffs.append(high)
+        return uniform(low, high)
+
+    monkeypatch.setattr(pr_module.random, "uniform", record_backoff)
+
+    attempts = 0
+
+    async def lock_user_nowait():
+        nonlocal attempts
+        attempts += 1
+        await session.execute(
+            select(User.id).where(User.id == "u1").with_for_update(nowait=True)
+        )
+        await session.commit()
+        return attempts
+
+    # Строку держит другая транзакция: каждая попытка получает 55P03
+    async with engine.connect() as holder:
+        await holder.execute(text("SELECT 1 FROM users WHERE id = 'u1' FOR UPDATE"))
+
+        with pytest.raises(ConcurrentUpdateError):
+            await pr_repo._retry_conflicts(lock_user_nowait)
+
+        await holder.rollback()
+
+    assert attempts == pr_module.CONFLICT_MAX_ATTEMPTS
+    assert backoffs == [
+        pr_module.CONFLICT_BACKOFF * 2**i
+        for i in range(pr_module.CONFLICT_MAX_ATTEMPTS - 1)
+    ]
+
+    # Блокировку отпустили: следующая попытка проходит
+    attempts = 0
+    assert await pr_repo._retry_conflicts(lock_user_nowait) == 1
+
+
+@pytest.mark.asyncio
+async def test_deactivation_job_worker_fails_job_on_non_db_error(
+    engine: AsyncEngine,
+    session: AsyncSession,
+    pr_repo: PullRequestRepository,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    await _seed_deactivation_team(session, pr_count=3)
+
+    broken = await pr_repo.create_deactivation_job(
+        team_name="team-job",
+        user_ids=["rev-1"],
+        chunk_size=2,
+    )
+    queued = await pr_repo.create_deactivation_job(
+        team_name="team-job",
+        user_ids=["rev-2"],
+        chunk_size=2,
+    )
+
+    run_chunk = PullRequestRepository.run_deactivation_job_chunk
+
+    async def run_chunk_or_fail(self, job_id):
+        if job_id == broken.id:
+            raise RuntimeError("boom")
+        return await run_chunk(self, job_id)
+
+    monkeypatch.setattr(
+        PullRequestRepository, "run_deactivation_job_chunk", run_chunk_or_fail
+    )
+
+    worker = DeactivationJobWorker(
+        session_factory=async_sessionmaker(engine, expire_on_commit=False),
+    )
+    await worker.run_pending()
+
+    broken = await pr_repo.get_deactivation_job(broken.id)
+    await session.refresh(broken)
+    assert broken.status == JobStatus.FAILED
+    assert "boom" in broken.error
+
+    # Упавшее задание не держит очередь
+    queued = await pr_repo.get_deactivation_job(queued.id)
+    await session.refresh(queued)
+    assert queued.status == JobStatus.DONE
+    assert await pr_repo.get_unfinished_deactivation_job_ids() == []
+
+
+@pytest.mark.asyncio
+async def test_create_deactivation_job_raises_if_users_not_in_team(
+    pr_repo: PullRequestRepository,
+    session: AsyncSession,
+):
+    await _seed_deactivation_team(session, pr_count=1)
+
+    with pytest.raises(NotFoundError):
+        await pr_repo.create_deactivation_job(
+            team_name="team-job",
+            user_ids=["rev-1", "unknown"],
+            chunk_size=10,
+        )
+
+    with pytest.raises(NotFoundError):
+        await pr_repo.get_deactivation_job("missing")
+
+
+@pytest.mark.asyncio
+async def test_set_is_active_batch_reassigns_across_teams(
+    pr_repo: PullRequestRepository,
+    session: AsyncSession,
+):
+    session.add_all([Team(name="alpha"), Team(name="beta")])
+    session.add_all(
+        [
+            User(id="a-author", username="a", is_active=True, team_name="alpha"),
+            User(id="a-rev", username="a-rev", is_active=True, team_name="alpha"),
+            User(id="a-spare", username="a-spare", is_active=True, team_name="alpha"),
+            User(id="b-author", username="b", is_active=True, team_name="beta"),
+            User(id="b-rev", username="b-rev", is_active=True, team_name="beta"),
+            User(id="idle", username="idle", is_active=False, team_name="beta"),
+        ]
+    )
+    session.add_all(
+        [
+            PullRequest(
+                id="pr-a", title="A", author_id="a-author", status=PRStatus.OPEN
+            ),
+            PullRequest(
+                id="pr-b", title="B", author_id="b-author", status=PRStatus.OPEN
+            ),
+            PRReviewer(pr_id="pr-a", reviewer_id="a-rev"),
+            PRReviewer(pr_id="pr-b", reviewer_id="b-rev"),
+        ]
+    )
+    await session.commit()
+    await pr_repo.reconcile_review_counters()
+
+    users, reviews = await pr_repo.set_is_active_batch(
+        {"a-rev": False, "b-rev": False, "idle": False, "ghost": True},
+        reassign=True,
+    )
+
+    assert {(u.id, u.is_active, u.changed) for u in users} == {
+        ("a-rev", False, True),
+        ("b-rev", False, True),
+        ("idle", False, False),
+    }
+    # В alpha есть замена, в beta — некем заменить
+    assert reviews == {"a-rev": (1, 0), "b-rev": (0, 1)}
+
+    reviewers = await session.execute(select(PRReviewer.pr_id, PRReviewer.reviewer_id))
+    assert reviewers.tuples().all() == [("pr-a", "a-spare")]
+
+    versions = dict(
+        (await session.execute(select(Team.name, Team.version))).tuples().all()
+    )
+    assert versions == {"alpha": 1, "beta": 1}
+
+    # Счётчики ревью сходятся с pr_reviewers
+    drift = await pr_repo.reconcile_review_counters(fix=False)
+    assert not any(drift.values())
+
+
+@pytest.mark.asyncio
+async def test_set_is_active_batch_without_reassign_keeps_reviews(
+    pr_repo: PullRequestRepository,
+    session: AsyncSession,
+):
+    session.add(Team(name="alpha"))
+    session.add_all(
+        [
+            User(id="author", username="a", is_active=True, team_name="alpha"),
+            User(id="rev", username="r", is_active=True, team_name="alpha"),
+            PullRequest(id="pr", title="PR", author_id="author", status=PRStatus.OPEN),
+            PRReviewer(pr_id="pr", reviewer_id="rev"),
+        ]
+    )
+    await session.commit()
+
+    users, reviews = await pr_repo.set_is_active_batch({"rev": False})
+
+    assert [(u.id, u.is_active) for u in users] == [("rev", False)]
+    assert reviews == {}
+    assert (await session.scalars(select(PRReviewer.reviewer_id))).all() == ["rev"]
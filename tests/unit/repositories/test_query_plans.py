@@ -0,0 +1,184 @@
+"""
+Регрессия планов запросов на горячих путях.
+
+Заполняем БД объёмом, близким к боевому, прогоняем методы репозиториев,
+записываем каждый выполненный SQL и проверяем его EXPLAIN: ни одного
+Seq Scan по users, pull_requests и pr_reviewers.
+"""
+
+import json
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.config import AssignmentStrategy
+from app.models.pull_requests import PRStatus
+from app.repositories import PullRequestRepository, TeamRepository, UserRepository
+from app.schemas import PullRequestCreatePayload
+
+HOT_TABLES = {"users", "pull_requests", "pr_reviewers"}
+
+TEAMS = 200
+USERS_PER_TEAM = 50
+PRS_PER_USER = 5
+OPEN_SHARE_PERCENT = 20
+
+
+async def _seed(engine: AsyncEngine) -> None:
+    users = TEAMS * USERS_PER_TEAM
+    prs = users * PRS_PER_USER
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                "INSERT INTO teams (name) "
+                "SELECT 't' || g FROM generate_series(0, :teams - 1) AS g"
+            ),
+            {"teams": TEAMS},
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO users (id, username, is_active, team_name) "
+                "SELECT 'u' || g, 'user ' || g, g % 10 <> 0, 't' || (g % :teams) "
+                "FROM generate_series(0, :users - 1) AS g"
+            ),
+            {"teams": TEAMS, "users": users},
+        )
+        # Автор и ревьюеры — из одной команды (u{g}, u{g+teams}, u{g+2*teams})
+        await conn.execute(
+            text(
+                "INSERT INTO pull_requests (id, title, author_id, status) "
+                "SELECT 'pr' || g, 'PR ' || g, 'u' || (g % :users), "
+                "CASE WHEN g % 100 < :open THEN 'OPEN' ELSE 'MERGED' "
+                "END::pr_status_enum "
+                "FROM generate_series(0, :prs - 1) AS g"
+            ),
+            {"users": users, "prs": prs, "open": OPEN_SHARE_PERCENT},
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO pr_reviewers (pr_id, reviewer_id) "
+                "SELECT 'pr' || g, 'u' || ((g + k * :teams) % :users) "
+                "FROM generate_series(0, :prs - 1) AS g, (VALUES (1), (2)) AS v(k)"
+            ),
+            {"teams": TEAMS, "users": users, "prs": prs},
+        )
+        await conn.execute(
+            text(
+                "UPDATE users AS u SET open_reviews = s.cnt FROM ("
+                "  SELECT r.reviewer_id, count(*) AS cnt FROM pr_reviewers AS r"
+                "  JOIN pull_requests AS p ON p.id = r.pr_id"
+                "  WHERE p.status = 'OPEN' GROUP BY r.reviewer_id"
+                ") AS s WHERE s.reviewer_id = u.id"
+            )
+        )
+
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("ANALYZE"))
+
+
+def _seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan["Relation Name"] in HOT_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found += _seq_scans(child)
+    return found
+
+
+@pytest.mark.asyncio
+async def test_hot_path_queries_do_not_seq_scan(engine: AsyncEngine):
+    await _seed(engine)
+
+    statements: list[tuple[str, tuple]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        async with session_maker() as session:
+            await _exercise_repositories(session)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    offenders = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            if (
+                not statement.lstrip()
+                .upper()
+                .startswith(("SELECT", "WITH", "UPDATE", "DELETE", "INSERT"))
+            ):
+                continue
+
+            result = await conn.exec_driver_sql(
+                "EXPLAIN (FORMAT JSON) " + statement, parameters
+            )
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            tables = _seq_scans(plan[0]["Plan"])
+            if tables:
+                offenders.append(f"{sorted(set(tables))}: {statement}")
+
+    assert statements
+    assert not offenders, "Seq Scan on hot tables:\n\n" + "\n\n".join(offenders)
+
+
+async def _exercise_repositories(session: AsyncSession) -> None:
+    """
+    Горячие пути всех репозиториев. Полные агрегаты статистики
+    (get_review_stats_*) сюда не входят: они читают всю таблицу по построению.
+    """
+    pr_repo = PullRequestRepository(session)
+    least_loaded_repo = PullRequestRepository(
+        session, assignment_strategy=AssignmentStrategy.LEAST_LOADED
+    )
+    user_repo = UserRepository(session)
+    team_repo = TeamRepository(session)
+
+    # u1 и u201 — активные участники команды t1
+    pr = await pr_repo.create_pull_request("plan-pr-1", "PR", "u1")
+    await least_loaded_repo.create_pull_request("plan-pr-2", "PR", "u201")
+
+    await least_loaded_repo.create_pull_requests_batch(
+        [
+            PullRequestCreatePayload(
+                pull_request_id=f"plan-batch-{i}",
+                pull_request_name="PR",
+                author_id=f"u{i * TEAMS + 3}",
+            )
+            for i in range(5)
+        ]
+    )
+
+    await pr_repo.reassign_reviewer("plan-pr-1", pr.reviewers[0].reviewer_id)
+    await least_loaded_repo.reassign_reviewer("pr1", "u201")
+
+    await pr_repo.merge_pull_request("plan-pr-1")
+    await pr_repo.merge_pull_requests_batch(["plan-pr-2", "pr7", "missing"])
+
+    await user_repo.get_user_review_pull_requests("u5")
+    await user_repo.get_user_review_pull_requests(
+        "u5", status=PRStatus.OPEN, limit=20, after_pr_id="pr1"
+    )
+    await user_repo.set_is_active("u7", False)
+    await pr_repo.set_is_active_batch(
+        {"u11": False, "u211": False, "u17": True, "missing": False}, reassign=True
+    )
+
+    await team_repo.get_team_with_members("t9")
+    await team_repo.get_team_with_members(
+        "t9", active_only=True, limit=20, after_user_id="u1009"
+    )
+    await team_repo.count_team_members("t9", active_only=True)
+
+    await pr_repo.bulk_deactivate_team_users_and_reassign("t2", ["u202", "u402"])
+
+    job = await pr_repo.create_deactivation_job("t4", ["u204", "u404"], 50)
+    await pr_repo.run_deactivation_job_chunk(job.id)
@@ -0,0 +1,192 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import NotFoundError
+from app.models import DailyReviewerStats, DailyTeamStats, StatsRollupState
+from app.repositories import PullRequestRepository, StatsRepository
+from app.repositories.stats_repository import ROLLUP_NAME
+
+
+async def _seed_team(session: AsyncSession) -> None:
+    await session.execute(text("INSERT INTO teams (name) VALUES ('backend')"))
+    await session.execute(
+        text(
+            "INSERT INTO users (id, username, is_active, team_name) VALUES "
+            "('author', 'Author', true, 'backend'), "
+            "('r1', 'Reviewer 1', true, 'backend'), "
+            "('r2', 'Reviewer 2', true, 'backend')"
+        )
+    )
+
+
+async def _add_pr(
+    session: AsyncSession,
+    pr_id: str,
+    created_at: datetime,
+    merged_at: datetime | None = None,
+    reviewers: tuple[str, ...] = (),
+) -> None:
+    # merged_at хранится без пояса, в TimeZone сессии — как пишет now()
+    await session.execute(
+        text(
+            "INSERT INTO pull_requests (id, title, author_id, status, "
+            "created_at, merged_at) VALUES (:id, 'PR', 'author', "
+            "CAST(:status AS pr_status_enum), :created_at, "
+            "timezone(current_setting('TimeZone'), "
+            "CAST(:merged_at AS timestamptz)))"
+        ),
+        {
+            "id": pr_id,
+            "status": "MERGED" if merged_at else "OPEN",
+            "created_at": created_at,
+            "merged_at": merged_at,
+        },
+    )
+    for reviewer_id in reviewers:
+        await session.execute(
+            text(
+                "INSERT INTO pr_reviewers (pr_id, reviewer_id, created_at, updated_at) "
+                "VALUES (:pr_id, :reviewer_id, :at, :at)"
+            ),
+            {"pr_id": pr_id, "reviewer_id": reviewer_id, "at": created_at},
+        )
+
+
+@pytest.mark.asyncio
+async def test_refresh_daily_stats_builds_team_and_reviewer_rollups(
+    session: AsyncSession,
+):
+    repo = StatsRepository(session)
+    day1 = datetime(2026, 3, 1, 10, tzinfo=timezone.utc)
+    day2 = day1 + timedelta(days=1)
+
+    await _seed_team(session)
+    await _add_pr(session, "pr1", day1, reviewers=("r1", "r2"))
+    await _add_pr(session, "pr2", day1, day2 + timedelta(hours=1), ("r1",))
+    await _add_pr(session, "pr3", day1, day2 + timedelta(hours=3), ("r2",))
+    await session.commit()
+
+    assert await repo.refresh_daily_stats() == date(2026, 3, 1)
+
+    days, reviewers = await repo.get_daily_stats("backend", date(2026, 3, 1))
+
+    assert [tuple(row) for row in days] == [
+        (date(2026, 3, 1), 3, 0, None, None, 4),
+        # merge через 25 ч и 27 ч: p50 = 26 ч, p90 = 26.8 ч
+        (date(2026, 3, 2), 0, 2, 26 * 3600.0, 26.8 * 3600.0, 0),
+    ]
+    assert [tuple(row) for row in reviewers] == [
+        (date(2026, 3, 1), "r1", 2),
+        (date(2026, 3, 1), "r2", 2),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_refresh_daily_stats_recomputes_only_days_since_last_run(
+    session: AsyncSession,
+):
+    repo = StatsRepository(session)
+    old_day = datetime(2026, 1, 10, 12, tzinfo=timezone.utc)
+    new_day = datetime(2026, 3, 5, 12, tzinfo=timezone.utc)
+
+    await _seed_team(session)
+    await _add_pr(session, "pr-old", old_day, reviewers=("r1",))
+    await session.commit()
+    await repo.refresh_daily_stats()
+
+    # Старый срез портим: пересчёт с новой отметки его не трогает
+    await session.execute(
+        update(DailyTeamStats)
+        .where(DailyTeamStats.day == old_day.date())
+        .values(prs_opened=100)
+    )
+    await session.execute(
+        update(StatsRollupState)
+        .where(StatsRollupState.name == ROLLUP_NAME)
+        .values(refreshed_at=new_day)
+    )
+    await _add_pr(session, "pr-new", new_day, reviewers=("r2",))
+    await session.commit()
+
+    assert await repo.refresh_daily_stats() == new_day.date()
+
+    opened = dict(
+        (await session.execute(select(DailyTeamStats.day, DailyTeamStats.prs_opened)))
+        .tuples()
+        .all()
+    )
+    assert opened == {old_day.date(): 100, new_day.date(): 1}
+
+    reviewer_days = set(
+        (
+            await session.execute(
+                select(DailyReviewerStats.reviewer_id, DailyReviewerStats.day)
+            )
+        )
+        .tuples()
+        .all()
+    )
+    assert reviewer_days == {("r1", old_day.date()), ("r2", new_day.date())}
+
+    state = await session.get(StatsRollupState, ROLLUP_NAME, populate_existing=True)
+    assert state.refreshed_at > new_day
+
+
+@pytest.mark.asyncio
+async def test_refresh_daily_stats_keeps_assignment_day_after_reassign(
+    session: AsyncSession,
+):
+    repo = StatsRepository(session)
+    day = datetime(2026, 3, 1, 10, tzinfo=timezone.utc)
+
+    await _seed_team(session)
+    await _add_pr(session, "pr1", day, reviewers=("r1",))
+    await session.commit()
+    await repo.refresh_daily_stats()
+
+    # Reassign на следующий день и позже: день назначения уже вне окна
+    # пересчёта, а строка pr_reviewers получает новый updated_at
+    await PullRequestRepository(session).reassign_reviewer("pr1", "r1")
+
+    async def snapshot():
+        teams = await session.execute(
+            select(DailyTeamStats.day, DailyTeamStats.reviews_assigned).where(
+                DailyTeamStats.reviews_assigned > 0
+            )
+        )
+        reviewers = await session.execute(
+            select(
+                DailyReviewerStats.day,
+                DailyReviewerStats.reviewer_id,
+                DailyReviewerStats.reviews_assigned,
+            )
+        )
+        return set(teams.tuples().all()), set(reviewers.tuples().all())
+
+    assert await repo.refresh_daily_stats() == day.date()
+    incremental = await snapshot()
+    assert incremental == ({(day.date(), 1)}, {(day.date(), "r2", 1)})
+
+    # Полная пересборка даёт ту же историю
+    await session.execute(delete(StatsRollupState))
+    await session.commit()
+    await repo.refresh_daily_stats()
+    assert await snapshot() == incremental
+
+
+@pytest.mark.asyncio
+async def test_refresh_daily_stats_without_pull_requests_is_noop(
+    session: AsyncSession,
+):
+    assert await StatsRepository(session).refresh_daily_stats() is None
+
+
+@pytest.mark.asyncio
+async def test_get_daily_stats_raises_not_found_for_unknown_team(
+    session: AsyncSession,
+):
+    with pytest.raises(NotFoundError):
+        await StatsRepository(session).get_daily_stats("missing", date(2026, 1, 1))
@@ -1,11 +1,12 @@
 import pytest
-from sqlalchemy import select
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import AlreadyExistsError, NotFoundError
 from app.models import Team, User
-from app.repositories import TeamRepository
-from app.schemas import TeamMember, TeamWithMembers
+from app.repositories import TeamRepository, UserRepository
+from app.repositories.team_repository import TeamMembers
+from app.schemas import TeamMember, TeamMemberField, TeamWithMembers
 
 
 @pytest.mark.asyncio
@@ -22,8 +23,12 @@ async def test_create_team_with_members_creates_team_and_users(
 
     team = await team_repo.create_team_with_members(team_in)
 
-    assert isinstance(team, Team)
+    assert isinstance(team, TeamMembers)
     assert team.name == "team-alpha"
+    assert [(u.id, u.username, u.is_active) for u in team.users] == [
+        ("1", "alice", True),
+        ("2", "bob", False),
+    ]
 
     db_team = await session.get(Team, "team-alpha")
     assert db_team is not None
@@ -106,16 +111,240 @@ async def test_get_team_with_members_returns_team_and_users(
 
     team = await team_repo.get_team_with_members("team-with-members")
 
-    assert isinstance(team, Team)
+    assert isinstance(team, TeamMembers)
     assert team.name == "team-with-members"
 
-    assert hasattr(team, "users")
-    assert len(team.users) == 2
-    usernames = {u.username for u in team.users}
-    assert usernames == {"alice", "bob"}
+    assert [(u.id, u.username, u.is_active) for u in team.users] == [
+        ("1", "alice", True),
+        ("2", "bob", False),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_team_with_members_returns_empty_team(
+    team_repo: TeamRepository, session: AsyncSession
+):
+    session.add(Team(name="empty-team"))
+    await session.commit()
+
+    team = await team_repo.get_team_with_members("empty-team")
+
+    assert team.name == "empty-team"
+    assert team.users == []
 
 
 @pytest.mark.asyncio
 async def test_get_team_with_members_raises_if_not_found(team_repo: TeamRepository):
     with pytest.raises(NotFoundError):
         await team_repo.get_team_with_members("non-existing-team")
+
+
+@pytest.mark.asyncio
+async def test_team_version_changes_with_members(
+    team_repo: TeamRepository, user_repo: UserRepository
+):
+    await team_repo.create_team_with_members(
+        TeamWithMembers(
+            team_name="team-a",
+            members=[
+                TeamMember(user_id="1", username="alice", is_active=True),
+                TeamMember(user_id="2", username="bob", is_active=True),
+            ],
+        )
+    )
+    assert await team_repo.get_team_version("team-a") == 0
+
+    # Перевод участника в другую команду меняет состав прежней
+    await team_repo.create_team_with_members(
+        TeamWithMembers(
+            team_name="team-b",
+            members=[TeamMember(user_id="2", username="bob", is_active=True)],
+        )
+    )
+    assert await team_repo.get_team_version("team-a") == 1
+    assert await team_repo.get_team_version("team-b") == 0
+
+    await user_repo.set_is_active("2", False)
+    assert await team_repo.get_team_version("team-b") == 1
+
+    # Повторная установка того же флага версию не меняет
+    await user_repo.set_is_active("2", False)
+    assert await team_repo.get_team_version("team-b") == 1
+
+    assert await team_repo.get_team_version("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_create_team_with_members_upserts_members_in_one_statement(
+    team_repo: TeamRepository, session: AsyncSession, engine
+):
+    session.add_all([Team(name="old-team"), Team(name="other-team")])
+    session.add_all(
+        [
+            User(id="u1", username="old-1", is_active=True, team_name="old-team"),
+            User(id="u2", username="old-2", is_active=True, team_name="other-team"),
+        ]
+    )
+    await session.commit()
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    members = [
+        TeamMember(user_id=f"n{i:03}", username=f"new-{i}", is_active=True)
+        for i in range(200)
+    ]
+    # Повторы в payload: последний побеждает
+    members += [
+        TeamMember(user_id="u2", username="first", is_active=True),
+        TeamMember(user_id="u1", username="moved", is_active=False),
+        TeamMember(user_id="u2", username="last", is_active=False),
+    ]
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        team = await team_repo.create_team_with_members(
+            TeamWithMembers(team_name="big-team", members=members)
+        )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    upserts = [s for s in statements if s.lstrip().startswith("INSERT INTO users")]
+    assert len(upserts) == 1
+    assert sum(s.startswith("SELECT") for s in statements) == 1
+
+    assert len(team.users) == 202
+    assert team.users[-2:] == [("u1", "moved", False), ("u2", "last", False)]
+
+    rows = await session.execute(
+        select(User.id, User.team_name).where(User.id.in_(["u1", "u2"]))
+    )
+    assert dict(rows.tuples().all()) == {"u1": "big-team", "u2": "big-team"}
+
+    versions = await session.execute(select(Team.name, Team.version))
+    assert dict(versions.tuples().all()) == {
+        "old-team": 1,
+        "other-team": 1,
+        "big-team": 0,
+    }
+
+
+async def _batches(*batches):
+    for batch in batches:
+        yield batch
+
+
+@pytest.mark.asyncio
+async def test_import_teams_copies_batches_and_merges(
+    team_repo: TeamRepository, session: AsyncSession
+):
+    session.add_all([Team(name="existing"), Team(name="old-team")])
+    session.add(User(id="u1", username="old", is_active=True, team_name="old-team"))
+    await session.commit()
+
+    result = await team_repo.import_teams(
+        _batches(
+            [
+                (1, "existing", "u1", "moved", False),
+                (2, "new-team", "u2", "Bob", True),
+            ],
+            [
+                (3, "new-team", "u3", "Carol", True),
+                (4, "empty-team", None, None, None),
+                # Повтор user_id: побеждает последняя строка
+                (5, "new-team", "u2", "Bobby", False),
+            ],
+        )
+    )
+
+    assert result == [
+        ("empty-team", True, 0),
+        ("existing", False, 1),
+        ("new-team", True, 2),
+    ]
+
+    users = await session.execute(
+        select(User.id, User.username, User.is_active, User.team_name).order_by(User.id)
+    )
+    assert users.tuples().all() == [
+        ("u1", "moved", False, "existing"),
+        ("u2", "Bobby", False, "new-team"),
+        ("u3", "Carol", True, "new-team"),
+    ]
+
+    versions = await session.execute(select(Team.name, Team.version))
+    assert dict(versions.tuples().all()) == {
+        "existing": 1,
+        "old-team": 1,
+        "new-team": 0,
+        "empty-team": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_import_teams_rolls_back_on_error(
+    team_repo: TeamRepository, session: AsyncSession
+):
+    async def failing_batches():
+        yield [(1, "t1", "u1", "A", True)]
+        raise RuntimeError("client went away")
+
+    with pytest.raises(RuntimeError):
+        await team_repo.import_teams(failing_batches())
+
+    assert (await session.scalars(select(Team.name))).all() == []
+
+    # staging удаляется вместе с транзакцией, повторный импорт проходит
+    assert await team_repo.import_teams(_batches([(1, "t1", "u1", "A", True)])) == [
+        ("t1", True, 1)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_team_with_members_filters_pages_and_projects(
+    team_repo: TeamRepository, session: AsyncSession
+):
+    await team_repo.create_team_with_members(
+        TeamWithMembers(
+            team_name="pool",
+            members=[
+                TeamMember(user_id=f"u{i}", username=f"User {i}", is_active=i % 2 == 0)
+                for i in range(6)
+            ],
+        )
+    )
+
+    page = await team_repo.get_team_with_members(
+        "pool",
+        active_only=True,
+        limit=2,
+        after_user_id="u0",
+        fields=[TeamMemberField.USERNAME],
+    )
+
+    assert page.name == "pool"
+    assert [tuple(row) for row in page.users] == [
+        ("pool", "u2", "User 2"),
+        ("pool", "u4", "User 4"),
+    ]
+
+    # Страница за последним участником пуста, но команда найдена
+    empty = await team_repo.get_team_with_members("pool", after_user_id="u5")
+    assert empty.users == []
+
+    assert await team_repo.count_team_members("pool") == 6
+    assert await team_repo.count_team_members("pool", active_only=True) == 3
+
+
+@pytest.mark.asyncio
+async def test_count_team_members_for_empty_and_missing_team(
+    team_repo: TeamRepository, session: AsyncSession
+):
+    session.add(Team(name="empty"))
+    await session.commit()
+
+    assert await team_repo.count_team_members("empty") == 0
+    with pytest.raises(NotFoundError):
+        await team_repo.count_team_members("missing")
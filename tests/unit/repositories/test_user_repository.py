@@ -1,6 +1,8 @@
 import pytest
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.db.metrics import CompiledCacheStats
 from app.core.exceptions import NotFoundError
 from app.models import PRReviewer, PullRequest, Team, User
 from app.models.pull_requests import PRStatus
@@ -27,8 +29,9 @@ async def test_set_is_active_updates_user_flag(
 
     updated_user = await user_repo.set_is_active(user_id="u1", is_active=False)
 
-    assert isinstance(updated_user, User)
     assert updated_user.id == "u1"
+    assert updated_user.username == "Alice"
+    assert updated_user.team_name == "backend"
     assert updated_user.is_active is False
 
     user_from_db = await session.get(User, "u1")
@@ -36,6 +39,34 @@ async def test_set_is_active_updates_user_flag(
     assert user_from_db.is_active is False
 
 
+@pytest.mark.asyncio
+async def test_set_is_active_is_one_statement_and_bumps_version_on_change(
+    user_repo: UserRepository,
+    session: AsyncSession,
+    engine,
+):
+    session.add(Team(name="backend"))
+    session.add(User(id="u1", username="Alice", team_name="backend", is_active=True))
+    await session.commit()
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        await user_repo.set_is_active(user_id="u1", is_active=False)
+        await user_repo.set_is_active(user_id="u1", is_active=False)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert len(statements) == 2
+
+    # Второй вызов ничего не меняет — версия команды растёт один раз
+    assert await session.scalar(select(Team.version)) == 1
+
+
 @pytest.mark.asyncio
 async def test_set_is_active_raises_not_found_for_unknown_user(
     user_repo: UserRepository,
@@ -100,7 +131,11 @@ async def test_get_user_review_pull_requests_returns_only_assigned_prs(
 
     # проверка
     assert isinstance(prs, list)
-    assert all(isinstance(pr, PullRequest) for pr in prs)
+    # Только нужные колонки, без сущностей
+    assert not any(isinstance(pr, PullRequest) for pr in prs)
+    assert [tuple(pr._mapping) for pr in prs] == [
+        ("id", "title", "author_id", "status")
+    ] * 2
 
     pr_ids = {pr.id for pr in prs}
     assert pr_ids == {"pr-1", "pr-2"}
@@ -136,3 +171,100 @@ async def test_get_user_review_pull_requests_raises_not_found_for_unknown_user(
 ):
     with pytest.raises(NotFoundError):
         await user_repo.get_user_review_pull_requests(user_id="unknown")
+
+
+@pytest.mark.asyncio
+async def test_get_user_review_pull_requests_filters_and_paginates_by_pr_id(
+    user_repo: UserRepository,
+    session: AsyncSession,
+):
+    team = Team(name="backend")
+    reviewer = User(id="u1", username="Reviewer", is_active=True, team_name="backend")
+    author = User(id="u2", username="Author", is_active=True, team_name="backend")
+    session.add_all([team, reviewer, author])
+    await session.flush()
+
+    for i, status in enumerate(["OPEN", "MERGED", "OPEN", "OPEN", "OPEN"]):
+        session.add(
+            PullRequest(
+                id=f"pr-{i}",
+                author_id="u2",
+                title=f"PR {i}",
+                status=PRStatus(status),
+                reviewers=[PRReviewer(reviewer_id="u1")],
+            )
+        )
+    await session.commit()
+
+    page = await user_repo.get_user_review_pull_requests(
+        user_id="u1", status=PRStatus.OPEN, limit=2
+    )
+    assert [pr.id for pr in page] == ["pr-0", "pr-2"]
+
+    page = await user_repo.get_user_review_pull_requests(
+        user_id="u1", status=PRStatus.OPEN, limit=2, after_pr_id="pr-2"
+    )
+    assert [pr.id for pr in page] == ["pr-3", "pr-4"]
+
+    page = await user_repo.get_user_review_pull_requests(
+        user_id="u1", status=PRStatus.OPEN, limit=2, after_pr_id="pr-4"
+    )
+    assert page == []
+
+    merged = await user_repo.get_user_review_pull_requests(
+        user_id="u1", status=PRStatus.MERGED
+    )
+    assert [(pr.id, pr.title) for pr in merged] == [("pr-1", "PR 1")]
+
+
+@pytest.mark.asyncio
+async def test_iter_review_stats_by_user_reads_in_chunks(
+    user_repo: UserRepository,
+    session: AsyncSession,
+):
+    session.add(Team(name="backend"))
+    session.add_all(
+        User(
+            id=f"u{i}",
+            username=f"User {i}",
+            is_active=True,
+            team_name="backend",
+            reviews_assigned=i,
+        )
+        for i in range(6)
+    )
+    await session.commit()
+
+    chunks = [chunk async for chunk in user_repo.iter_review_stats_by_user(2)]
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert sorted(row for chunk in chunks for row in chunk) == sorted(
+        await user_repo.get_review_stats_by_user()
+    )
+    assert ("u0", 0) not in {row for chunk in chunks for row in chunk}
+
+
+@pytest.mark.asyncio
+async def test_review_pull_requests_statement_is_compiled_once(
+    user_repo: UserRepository,
+    session: AsyncSession,
+    engine,
+):
+    session.add(Team(name="backend"))
+    session.add_all(
+        User(id=f"u{i}", username=f"User {i}", is_active=True, team_name="backend")
+        for i in range(3)
+    )
+    await session.commit()
+
+    stats = CompiledCacheStats()
+    stats.track(engine)
+
+    for i in range(3):
+        await user_repo.get_user_review_pull_requests(
+            user_id=f"u{i}", status=PRStatus.OPEN
+        )
+
+    # Один и тот же объект запроса: ключ кэша не строится заново,
+    # SQL компилируется только для первого вызова
+    assert (stats.misses, stats.hits) == (1, 2)
@@ -3,10 +3,17 @@ from unittest.mock import AsyncMock
 
 import pytest
 
+from app.models.deactivation_jobs import JobStatus
 from app.models.pull_requests import PRStatus
 from app.schemas import (
+    DeactivationJobInfo,
+    PullRequestBatchCreatePayload,
+    PullRequestBatchCreateResult,
+    PullRequestBatchItemStatus,
     PullRequestCreatePayload,
     PullRequestFull,
+    PullRequestMergeBatchPayload,
+    PullRequestMergeBatchResult,
     PullRequestMergePayload,
     PullRequestReassignPayload,
     TeamBulkDeactivatePayload,
@@ -200,3 +207,150 @@ async def test_bulk_deactivate_team_users_and_reassign_uses_repo_and_maps_result
     assert result.deactivated_users == 2
     assert result.reassigned_reviewers == 3
     assert result.affected_pull_requests == 1
+
+
+@pytest.mark.asyncio
+async def test_create_pull_requests_batch_maps_statuses(
+    repo_mock_pull_request: AsyncMock,
+):
+    service = PullRequestService(repo_mock_pull_request)
+
+    payload = PullRequestBatchCreatePayload(
+        items=[
+            PullRequestCreatePayload(
+                pull_request_id="pr-1", pull_request_name="A", author_id="u1"
+            ),
+            PullRequestCreatePayload(
+                pull_request_id="pr-2", pull_request_name="B", author_id="u404"
+            ),
+        ]
+    )
+
+    pr_model = DummyPullRequest(
+        id="pr-1",
+        title="A",
+        author_id="u1",
+        status=PRStatus.OPEN,
+        reviewers=[DummyReviewer("u2")],
+    )
+    repo_mock_pull_request.create_pull_requests_batch.return_value = [
+        (PullRequestBatchItemStatus.CREATED, pr_model),
+        (PullRequestBatchItemStatus.NOT_FOUND, None),
+    ]
+
+    result = await service.create_pull_requests_batch(payload)
+
+    repo_mock_pull_request.create_pull_requests_batch.assert_awaited_once_with(
+        payload.items
+    )
+
+    assert isinstance(result, PullRequestBatchCreateResult)
+    first, second = result.results
+    assert first.pull_request_id == "pr-1"
+    assert first.status == PullRequestBatchItemStatus.CREATED
+    assert first.pr.assigned_reviewers == ["u2"]
+    assert second.pull_request_id == "pr-2"
+    assert second.status == PullRequestBatchItemStatus.NOT_FOUND
+    assert second.pr is None
+
+
+@pytest.mark.asyncio
+async def test_merge_pull_requests_batch_uses_repo_and_maps_result(
+    repo_mock_pull_request: AsyncMock,
+):
+    service = PullRequestService(repo_mock_pull_request)
+
+    merged_at = datetime(2025, 1, 1, 12, 0, 0)
+    merged_pr = DummyPullRequest(
+        id="pr-1",
+        title="A",
+        author_id="u1",
+        status=PRStatus.MERGED,
+        reviewers=[DummyReviewer("u2")],
+        merged_at=merged_at,
+    )
+    old_pr = DummyPullRequest(
+        id="pr-2",
+        title="B",
+        author_id="u1",
+        status=PRStatus.MERGED,
+        merged_at=merged_at,
+    )
+    repo_mock_pull_request.merge_pull_requests_batch.return_value = (
+        [merged_pr],
+        [old_pr],
+        ["pr-3"],
+    )
+
+    result = await service.merge_pull_requests_batch(
+        PullRequestMergeBatchPayload(pull_request_ids=["pr-1", "pr-2", "pr-3"])
+    )
+
+    repo_mock_pull_request.merge_pull_requests_batch.assert_awaited_once_with(
+        ["pr-1", "pr-2", "pr-3"]
+    )
+
+    assert isinstance(result, PullRequestMergeBatchResult)
+    assert [pr.pull_request_id for pr in result.merged] == ["pr-1"]
+    assert result.merged[0].assigned_reviewers == ["u2"]
+    assert [pr.pull_request_id for pr in result.already_merged] == ["pr-2"]
+    assert result.not_found == ["pr-3"]
+
+
+class DummyDeactivationJob:
+    def __init__(self, status: JobStatus):
+        self.id = "job-1"
+        self.team_name = "team-1"
+        self.status = status
+        self.chunk_size = 100
+        self.deactivated_users = 2
+        self.prs_scanned = 10
+        self.reassigned_reviewers = 7
+        self.removed_reviewers = 1
+        self.affected_pull_requests = 8
+        self.error = None
+
+
+@pytest.mark.asyncio
+async def test_start_bulk_deactivation_job_passes_chunk_size(
+    repo_mock_pull_request: AsyncMock,
+):
+    service = PullRequestService(repo_mock_pull_request)
+    repo_mock_pull_request.create_deactivation_job.return_value = DummyDeactivationJob(
+        JobStatus.PENDING
+    )
+
+    payload = TeamBulkDeactivatePayload(team_name="team-1", user_ids=["u1", "u2"])
+    job = await service.start_bulk_deactivation_job(payload, chunk_size=100)
+
+    repo_mock_pull_request.create_deactivation_job.assert_awaited_once_with(
+        team_name="team-1",
+        user_ids=["u1", "u2"],
+        chunk_size=100,
+    )
+    assert isinstance(job, DeactivationJobInfo)
+    assert job.job_id == "job-1"
+    assert job.status == JobStatus.PENDING
+    assert job.result is None
+
+
+@pytest.mark.asyncio
+async def test_get_deactivation_job_maps_result_when_done(
+    repo_mock_pull_request: AsyncMock,
+):
+    service = PullRequestService(repo_mock_pull_request)
+    repo_mock_pull_request.get_deactivation_job.return_value = DummyDeactivationJob(
+        JobStatus.DONE
+    )
+
+    job = await service.get_deactivation_job("job-1")
+
+    repo_mock_pull_request.get_deactivation_job.assert_awaited_once_with("job-1")
+    assert job.prs_scanned == 10
+    assert job.removed_reviewers == 1
+    assert job.result == TeamBulkDeactivateResult(
+        team_name="team-1",
+        deactivated_users=2,
+        reassigned_reviewers=7,
+        affected_pull_requests=8,
+    )
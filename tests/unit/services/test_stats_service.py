@@ -0,0 +1,48 @@
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.schemas import DailyReviewerStat, DailyStats, DailyTeamStat
+from app.services import StatsService
+
+
+@pytest.mark.asyncio
+async def test_get_daily_stats_maps_rows_and_window():
+    repo = AsyncMock()
+    repo.get_daily_stats.return_value = (
+        [
+            SimpleNamespace(
+                day=date(2026, 3, 1),
+                prs_opened=3,
+                prs_merged=1,
+                time_to_merge_p50=60.0,
+                time_to_merge_p90=90.0,
+                reviews_assigned=4,
+            )
+        ],
+        [SimpleNamespace(day=date(2026, 3, 1), reviewer_id="r1", reviews_assigned=2)],
+    )
+    service = StatsService(repo)
+
+    result = await service.get_daily_stats("backend", days=90)
+
+    today = datetime.now(timezone.utc).date()
+    repo.get_daily_stats.assert_awaited_once_with("backend", today - timedelta(days=89))
+    assert result == DailyStats(
+        team_name="backend",
+        days=[
+            DailyTeamStat(
+                day=date(2026, 3, 1),
+                prs_opened=3,
+                prs_merged=1,
+                time_to_merge_p50_seconds=60.0,
+                time_to_merge_p90_seconds=90.0,
+                reviews_assigned=4,
+            )
+        ],
+        reviewers=[
+            DailyReviewerStat(day=date(2026, 3, 1), user_id="r1", reviews_assigned=2)
+        ],
+    )
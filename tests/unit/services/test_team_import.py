@@ -0,0 +1,119 @@
+import pytest
+
+from app.core.exceptions import InvalidImportError
+from app.services.team_import import (
+    MAX_LINE_BYTES,
+    ImportFormat,
+    RejectedRows,
+    iter_lines,
+    iter_record_batches,
+)
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def _collect(body: list[bytes], fmt: ImportFormat, batch_size: int = 100):
+    rejected = RejectedRows(limit=10)
+    batches = [
+        batch
+        async for batch in iter_record_batches(
+            _chunks(*body), fmt, batch_size, rejected
+        )
+    ]
+    return batches, rejected
+
+
+def test_import_format_from_content_type():
+    assert (
+        ImportFormat.from_content_type("application/x-ndjson; charset=utf-8")
+        == ImportFormat.NDJSON
+    )
+    assert ImportFormat.from_content_type("Text/CSV") == ImportFormat.CSV
+    assert ImportFormat.from_content_type("application/json") is None
+    assert ImportFormat.from_content_type(None) is None
+
+
+async def test_iter_lines_joins_lines_split_across_chunks():
+    lines = [line async for line in iter_lines(_chunks(b"ab", b"c\nd", b"e\n", b"f"))]
+
+    assert lines == [(1, b"abc"), (2, b"de"), (3, b"f")]
+
+
+async def test_iter_lines_drops_oversized_line():
+    huge = b"x" * (MAX_LINE_BYTES + 1)
+
+    lines = [line async for line in iter_lines(_chunks(b"a\n", huge, huge, b"\nb"))]
+
+    assert lines == [(1, b"a"), (2, None), (3, b"b")]
+
+
+async def test_ndjson_records_and_rejections():
+    body = [
+        b'{"team_name": "t1", "user_id": "u1", "username": "A", "is_active": true}\n',
+        b'{"team_name": "t2", "members": [{"user_id": "u2", "username": "B", '
+        b'"is_active": false}, {"user_id": "u3", "username": "C", "is_active": true}]}\n',
+        b'{"team_name": "t3"}\n',
+        b"\n",
+        b"not json\n",
+        b'{"team_name": "t1", "user_id": "u4", "username": "D", "is_active": "yes"}\n',
+        b'{"team_name": "t1", "members": [{"user_id": "u5"}]}\n',
+    ]
+
+    batches, rejected = await _collect(body, ImportFormat.NDJSON, batch_size=2)
+
+    assert batches == [
+        [
+            (1, "t1", "u1", "A", True),
+            (2, "t2", "u2", "B", False),
+            (2, "t2", "u3", "C", True),
+        ],
+        [(3, "t3", None, None, None)],
+    ]
+    assert rejected.total == 3
+    assert rejected.rows == [
+        (5, "invalid json"),
+        (6, "is_active must be a boolean"),
+        (7, "username must be a non-empty string"),
+    ]
+
+
+async def test_csv_records_use_header_order():
+    body = [
+        b"user_id,team_name,is_active,username\n",
+        b"u1,t1,true,Alice\n",
+        b'u2,t1,0,"Smith, Bob"\n',
+        b",t2,,\n",
+        b"u3,t1,maybe,Carol\n",
+        b"u4\n",
+    ]
+
+    batches, rejected = await _collect(body, ImportFormat.CSV)
+
+    assert batches == [
+        [
+            (2, "t1", "u1", "Alice", True),
+            (3, "t1", "u2", "Smith, Bob", False),
+            (4, "t2", None, None, None),
+        ]
+    ]
+    assert rejected.rows == [
+        (5, "is_active must be a boolean"),
+        (6, "not enough columns"),
+    ]
+
+
+async def test_csv_without_required_header_is_invalid():
+    with pytest.raises(InvalidImportError):
+        await _collect([b"team,user\n", b"t1,u1\n"], ImportFormat.CSV)
+
+
+def test_rejected_rows_are_counted_beyond_limit():
+    rejected = RejectedRows(limit=2)
+    for line in range(5):
+        rejected.add(line, "bad")
+
+    assert rejected.total == 5
+    assert len(rejected.rows) == 2
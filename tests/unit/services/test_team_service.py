@@ -2,7 +2,13 @@ from unittest.mock import AsyncMock
 
 import pytest
 
-from app.schemas import TeamMember, TeamWithMembers
+from app.schemas import (
+    TeamMember,
+    TeamMemberField,
+    TeamMemberView,
+    TeamView,
+    TeamWithMembers,
+)
 from app.services import TeamService
 
 
@@ -86,6 +92,8 @@ async def test_create_team_with_members_uses_repo_and_maps_result(repo_mock: Asy
     result = await service.create_team_with_members(input_schema)
 
     repo_mock.create_team_with_members.assert_awaited_once_with(input_schema)
+    # Ответ строится из RETURNING upsert'а, без повторного чтения команды
+    repo_mock.get_team_with_members.assert_not_awaited()
 
     assert isinstance(result, TeamWithMembers)
     assert result.team_name == "backend"
@@ -95,24 +103,63 @@ async def test_create_team_with_members_uses_repo_and_maps_result(repo_mock: Asy
 
 
 @pytest.mark.asyncio
-async def test_get_team_with_members_uses_repo_and_maps_result(repo_mock: AsyncMock):
+async def test_get_team_view_pages_and_projects_fields(repo_mock: AsyncMock):
     service = TeamService(repo_mock)
-    team_name = "backend"
+    repo_mock.get_team_with_members.return_value = DummyTeam(
+        name="backend",
+        users=[DummyUser(id=f"u{i}", username=f"User {i}") for i in range(3)],
+    )
 
-    team_model = DummyTeam(
-        name=team_name,
-        users=[DummyUser(id="u1", username="Alice", is_active=True)],
+    result = await service.get_team_view(
+        "backend",
+        active_only=True,
+        limit=2,
+        cursor="u0",
+        fields=[TeamMemberField.USERNAME],
     )
 
-    repo_mock.get_team_with_members.return_value = team_model
+    # Запрашиваем на одну запись больше, чтобы узнать о следующей странице
+    repo_mock.get_team_with_members.assert_awaited_once_with(
+        "backend",
+        active_only=True,
+        limit=3,
+        after_user_id="u0",
+        fields=[TeamMemberField.USERNAME],
+    )
+    assert result == TeamView(
+        team_name="backend",
+        members=[
+            TeamMemberView(username="User 0"),
+            TeamMemberView(username="User 1"),
+        ],
+        next_cursor="u1",
+    )
 
-    result = await service.get_team_with_members(team_name)
 
-    repo_mock.get_team_with_members.assert_awaited_once_with(team_name)
+@pytest.mark.asyncio
+async def test_get_team_view_defaults_match_full_team(repo_mock: AsyncMock):
+    service = TeamService(repo_mock)
+    repo_mock.get_team_with_members.return_value = DummyTeam(
+        name="backend", users=[DummyUser(id="u1", username="Alice", is_active=False)]
+    )
 
-    assert isinstance(result, TeamWithMembers)
-    assert result.team_name == team_name
-    assert len(result.members) == 1
-    assert result.members[0].user_id == "u1"
-    assert result.members[0].username == "Alice"
-    assert result.members[0].is_active is True
+    result = await service.get_team_view("backend")
+
+    assert result.model_dump(exclude_none=True) == {
+        "team_name": "backend",
+        "members": [{"user_id": "u1", "username": "Alice", "is_active": False}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_team_summary_returns_only_count(repo_mock: AsyncMock):
+    service = TeamService(repo_mock)
+    repo_mock.count_team_members.return_value = 42
+
+    result = await service.get_team_summary("backend", active_only=True)
+
+    repo_mock.count_team_members.assert_awaited_once_with("backend", active_only=True)
+    assert result.model_dump(exclude_none=True) == {
+        "team_name": "backend",
+        "member_count": 42,
+    }
@@ -1,9 +1,17 @@
-from unittest.mock import AsyncMock
+import json
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
 from app.models.pull_requests import PRStatus
-from app.schemas import PullRequestShort, UserFull, UserReviewPRs
+from app.schemas import (
+    PullRequestShort,
+    SetIsActiveBatchItemStatus,
+    SetIsActiveBatchRequest,
+    SetIsActiveRequest,
+    UserFull,
+    UserReviewPRs,
+)
 from app.services import UserService
 
 
@@ -122,7 +130,9 @@ async def test_get_review_pull_requests_uses_repo_and_maps_result(
 
     result = await service.get_review_pull_requests(user_id="u2")
 
-    repo_mock_user.get_user_review_pull_requests.assert_awaited_once_with("u2")
+    repo_mock_user.get_user_review_pull_requests.assert_awaited_once_with(
+        "u2", status=None, limit=None, after_pr_id=None
+    )
 
     assert isinstance(result, UserReviewPRs)
     assert result.user_id == "u2"
@@ -151,7 +161,129 @@ async def test_get_review_pull_requests_empty_list(
 
     result = await service.get_review_pull_requests(user_id="u2")
 
-    repo_mock_user.get_user_review_pull_requests.assert_awaited_once_with("u2")
+    repo_mock_user.get_user_review_pull_requests.assert_awaited_once_with(
+        "u2", status=None, limit=None, after_pr_id=None
+    )
     assert isinstance(result, UserReviewPRs)
     assert result.user_id == "u2"
     assert result.pull_requests == []
+
+
+@pytest.mark.asyncio
+async def test_get_review_pull_requests_returns_next_cursor_for_full_page(
+    repo_mock_user: AsyncMock, repo_mock_pull_request: AsyncMock
+):
+    service = UserService(repo_mock_user, repo_mock_pull_request)
+
+    repo_mock_user.get_user_review_pull_requests.return_value = [
+        DummyPullRequest(id=f"pr-{i}", title="PR", author_id="u1", status=PRStatus.OPEN)
+        for i in range(3)
+    ]
+
+    result = await service.get_review_pull_requests(
+        user_id="u2",
+        status=PRStatus.OPEN,
+        limit=2,
+        cursor="pr-0000",
+    )
+
+    repo_mock_user.get_user_review_pull_requests.assert_awaited_once_with(
+        "u2", status=PRStatus.OPEN, limit=3, after_pr_id="pr-0000"
+    )
+    assert [pr.pull_request_id for pr in result.pull_requests] == ["pr-0", "pr-1"]
+    assert result.next_cursor == "pr-1"
+
+
+@pytest.mark.asyncio
+async def test_get_review_pull_requests_last_page_has_no_cursor(
+    repo_mock_user: AsyncMock, repo_mock_pull_request: AsyncMock
+):
+    service = UserService(repo_mock_user, repo_mock_pull_request)
+
+    repo_mock_user.get_user_review_pull_requests.return_value = [
+        DummyPullRequest(id="pr-0", title="PR", author_id="u1", status=PRStatus.OPEN)
+    ]
+
+    result = await service.get_review_pull_requests(user_id="u2", limit=2)
+
+    assert len(result.pull_requests) == 1
+    assert result.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_stream_review_stats_yields_ndjson_per_chunk(
+    repo_mock_user: AsyncMock, repo_mock_pull_request: AsyncMock
+):
+    async def chunks(*parts):
+        for part in parts:
+            yield part
+
+    repo_mock_user.iter_review_stats_by_user = MagicMock(
+        return_value=chunks([("u1", 3), ("u2", 1)], [("u3", 2)])
+    )
+    repo_mock_pull_request.iter_review_stats_by_pr = MagicMock(
+        return_value=chunks([("pr-1", 2)])
+    )
+    service = UserService(repo_mock_user, repo_mock_pull_request)
+
+    result = [chunk async for chunk in service.stream_review_stats(chunk_size=2)]
+
+    repo_mock_user.iter_review_stats_by_user.assert_called_once_with(2)
+    repo_mock_pull_request.iter_review_stats_by_pr.assert_called_once_with(2)
+
+    # По куску на порцию, по объекту на строку
+    assert len(result) == 3
+    lines = [json.loads(line) for line in b"".join(result).decode().splitlines()]
+    assert lines == [
+        {"type": "user", "user_id": "u1", "reviews_assigned": 3},
+        {"type": "user", "user_id": "u2", "reviews_assigned": 1},
+        {"type": "user", "user_id": "u3", "reviews_assigned": 2},
+        {"type": "pull_request", "pull_request_id": "pr-1", "reviewers_assigned": 2},
+    ]
+
+
+class DummyBatchUser(DummyUser):
+    def __init__(self, id: str, is_active: bool, changed: bool):
+        super().__init__(id=id, username=id, team_name="backend", is_active=is_active)
+        self.changed = changed
+
+
+@pytest.mark.asyncio
+async def test_set_is_active_batch_maps_statuses_and_review_counts(
+    repo_mock_user: AsyncMock, repo_mock_pull_request: AsyncMock
+):
+    service = UserService(repo_mock_user, repo_mock_pull_request)
+    repo_mock_pull_request.set_is_active_batch.return_value = (
+        [
+            DummyBatchUser("u1", is_active=False, changed=True),
+            DummyBatchUser("u2", is_active=True, changed=False),
+        ],
+        {"u1": (2, 1)},
+    )
+
+    result = await service.set_is_active_batch(
+        SetIsActiveBatchRequest(
+            items=[
+                SetIsActiveRequest(user_id="u1", is_active=True),
+                SetIsActiveRequest(user_id="u2", is_active=True),
+                SetIsActiveRequest(user_id="ghost", is_active=False),
+                SetIsActiveRequest(user_id="u1", is_active=False),
+            ],
+            reassign_open_reviews=True,
+        )
+    )
+
+    # Повтор user_id: последнее значение, порядок — по первому упоминанию
+    repo_mock_pull_request.set_is_active_batch.assert_awaited_once_with(
+        {"u1": False, "u2": True, "ghost": False}, reassign=True
+    )
+    assert [
+        (r.user_id, r.status, r.reassigned_reviews, r.removed_reviews)
+        for r in result.results
+    ] == [
+        ("u1", SetIsActiveBatchItemStatus.UPDATED, 2, 1),
+        ("u2", SetIsActiveBatchItemStatus.UNCHANGED, 0, 0),
+        ("ghost", SetIsActiveBatchItemStatus.NOT_FOUND, 0, 0),
+    ]
+    assert result.results[0].user.is_active is False
+    assert result.results[2].user is None